@@ -3,6 +3,7 @@ from typing import Any, Dict, Mapping, Optional
 from fastapi import HTTPException
 
 from core.jobs import JobRequest
+from core.redis_queue import normalize_priority
 
 
 def _resolve_model_id(model: Optional[str], model_id: Optional[str], settings: Any) -> str:
@@ -24,6 +25,7 @@ def build_job_request(
     voice_id: Optional[str],
     reading_profile: Optional[Dict[str, Any]],
     settings: Any,
+    priority: Optional[str] = None,
 ) -> JobRequest:
     reading_profile = reading_profile or settings.reading_profile
     resolved_model_id = _resolve_model_id(model, model_id, settings)
@@ -38,12 +40,18 @@ def build_job_request(
             ),
         )
 
+    try:
+        resolved_priority = normalize_priority(priority)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
     return JobRequest(
         text=text,
         model_id=resolved_model_id,
         voice_id=voice_id,
         reading_profile=reading_profile,
         prefer_phonemes=prefer_phonemes,
+        priority=resolved_priority,
     )
 
 
@@ -130,7 +130,7 @@ def override_dict(payload: OverridePayload) -> Dict[str, Any]:
 
     output_path = settings.dict_dir / f"{payload.pack}_v{pack_payload['version']}.json"
     output_path.write_text(json.dumps(pack_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    resolver.refresh()
+    resolver.set_entry(payload.pack, key, phonemes, pack_payload["version"])
     return {"key": key, "phonemes": phonemes, "source_pack": payload.pack}
 
 
@@ -191,7 +191,7 @@ def promote_dict(payload: PromotePayload) -> Dict[str, Any]:
 
     output_path = settings.dict_dir / f"{payload.target_pack}_v{pack_payload['version']}.json"
     output_path.write_text(json.dumps(pack_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    resolver.refresh()
+    resolver.set_entry(payload.target_pack, normalized_key, phonemes, pack_payload["version"])
     return {
         "key": key,
         "phonemes": phonemes,
@@ -220,4 +220,5 @@ def compile_dicts() -> Dict[str, Any]:
         settings.model_id,
         settings.compiler_version,
     )
+    resolver.refresh()
     return {"compiled": [str(path) for path in compiled_paths]}
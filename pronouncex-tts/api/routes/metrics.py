@@ -12,6 +12,7 @@ router = APIRouter(prefix="/v1", tags=["metrics"])
 def get_metrics() -> Dict[str, Any]:
     job_manager = get_job_manager()
     metrics = job_manager.metrics.snapshot()
+    word_memo = job_manager.resolver.memo_stats()
     return {
         "total_jobs": metrics.total_jobs,
         "total_segments": metrics.total_segments,
@@ -19,6 +20,7 @@ def get_metrics() -> Dict[str, Any]:
         "cache_hit_rate": round(metrics.cache_hit_rate, 3),
         "error_rate": round(metrics.error_rate, 3),
         "queue_len": job_manager.queue_length(),
+        "segment_queue_len": job_manager.segment_queue_length(),
         "workers_online": job_manager.workers_online(),
         "active_jobs": job_manager.active_jobs(),
         "segment_retries": metrics.segment_retries,
@@ -27,5 +29,34 @@ def get_metrics() -> Dict[str, Any]:
         "merge_lock_waits": metrics.merge_lock_waits,
         "merge_lock_wait_ms": round(metrics.merge_lock_wait_ms, 3),
         "merge_lock_wait_max_ms": round(metrics.merge_lock_wait_max_ms, 3),
+        "coalesced_segments": metrics.coalesced_segments,
+        "coalesced_wait_ms": round(metrics.coalesced_wait_ms, 3),
         "stale_queued_cancels": metrics.stale_queued_cancels,
+        "cache_keys_churned": metrics.cache_keys_churned,
+        "cache_key_churn_rate": round(metrics.cache_key_churn_rate, 3),
+        "encode_segments": metrics.encode_counts,
+        "encode_avg_ms": {
+            encoder: round(metrics.encode_avg_ms(encoder), 3) for encoder in metrics.encode_counts
+        },
+        "ffmpeg_spawned": metrics.ffmpeg_spawned,
+        "ffmpeg_spare_hits": metrics.ffmpeg_spare_hits,
+        "ffmpeg_spare_misses": metrics.ffmpeg_spare_misses,
+        "ffmpeg_restarts": metrics.ffmpeg_restarts,
+        "ttfa_ms": {
+            priority: {
+                "count": len(samples),
+                "p50": round(metrics.ttfa_percentile(priority, 50), 3),
+                "p95": round(metrics.ttfa_percentile(priority, 95), 3),
+            }
+            for priority, samples in metrics.ttfa_ms.items()
+        },
+        "espeak_backends": metrics.espeak_backends,
+        "espeak_pool_hit_rate": round(metrics.espeak_pool_hit_rate, 3),
+        "espeak_calls": metrics.espeak_calls,
+        "espeak_avg_call_ms": round(metrics.espeak_avg_call_ms, 3),
+        "espeak_init_ms": round(metrics.espeak_init_ms, 3),
+        "word_memo_size": word_memo.size,
+        "word_memo_capacity": word_memo.capacity,
+        "word_memo_hit_rate": round(word_memo.hit_rate, 3),
+        "word_memo_evictions": word_memo.evictions,
     }
@@ -20,6 +20,7 @@ class ReaderRequest(BaseModel):
     model_id: Optional[str] = None
     voice_id: Optional[str] = None
     reading_profile: Dict[str, Any] = Field(default_factory=dict)
+    priority: Optional[str] = None
 
 
 @router.post("/synthesize")
@@ -40,6 +41,7 @@ def synthesize_reader(payload: ReaderRequest, request: Request) -> Dict[str, Any
                 voice_id=payload.voice_id,
                 reading_profile=payload.reading_profile,
                 settings=settings,
+                priority=payload.priority,
             )
         )
     except JobLimitError as exc:
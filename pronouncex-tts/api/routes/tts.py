@@ -3,17 +3,21 @@ import json
 import os
 import subprocess
 import time
+import uuid
+from collections import Counter
 from contextlib import contextmanager
 from hashlib import sha256
 from pathlib import Path
-from typing import Any, Dict, Iterator, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi import APIRouter, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.websockets import WebSocketState
 
 from core.config import load_settings
 from core.jobs import JobLimitError, get_job_manager
+from core.ogg import OggConcatError, OpusConcat, OpusStreamBuilder
 from core.redis_client import get_redis, safe_ping
 from core.redis_locks import file_lock, merge_lock
 from api.routes._builders import build_job_request, prefer_proxy_from_headers, select_best_url
@@ -26,6 +30,11 @@ settings = load_settings()
 # (The file can still be OGG/Opus; the type does not need codecs=opus.)
 OGG_MEDIA_TYPE = "audio/ogg"
 
+TERMINAL_JOB_STATUSES = {"complete", "complete_with_errors", "canceled", "error"}
+EVENTS_KEEPALIVE_SECONDS = 15.0
+STREAM_FALLBACK_POLL_SECONDS = 2.0
+PROGRESSIVE_SEGMENT_WAIT_SECONDS = 120.0
+
 
 class TTSJobRequest(BaseModel):
     text: str
@@ -34,6 +43,7 @@ class TTSJobRequest(BaseModel):
     voice_id: Optional[str] = None
     reading_profile: Dict[str, Any] = Field(default_factory=dict)
     prefer_phonemes: bool = True
+    priority: Optional[str] = None
 
 
 @router.post("/jobs")
@@ -56,6 +66,7 @@ def submit_job(payload: TTSJobRequest) -> Dict[str, Any]:
                 voice_id=payload.voice_id,
                 reading_profile=payload.reading_profile,
                 settings=settings,
+                priority=payload.priority,
             )
         )
     except JobLimitError as exc:
@@ -105,49 +116,210 @@ def cancel_job(job_id: str) -> Dict[str, Any]:
     return {"job_id": job_id, "status": job.get("status", "canceled")}
 
 
-@router.get("/jobs/{job_id}/segments/{segment_id}")
-def get_segment(job_id: str, segment_id: str) -> FileResponse:
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _segment_urls(job_id: str, seg: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    segment_id = seg.get("segment_id")
+    url_backend = seg.get("url_backend") or (
+        f"/v1/tts/jobs/{job_id}/segments/{segment_id}" if segment_id else None
+    )
+    url_proxy = seg.get("url_proxy") or (
+        f"/api/tts/jobs/{job_id}/segments/{segment_id}" if segment_id else None
+    )
+    return url_proxy, url_backend
+
+
+def _segment_delta(job_id: str, seg: Dict[str, Any], prefer_proxy: bool) -> Dict[str, Any]:
+    delta = {
+        "segment_id": seg.get("segment_id"),
+        "index": seg.get("index"),
+        "status": seg.get("status"),
+    }
+    if seg.get("status") == "ready":
+        delta["url"] = select_best_url(*_segment_urls(job_id, seg), prefer_proxy)
+    if seg.get("duration_ms") is not None:
+        delta["duration_ms"] = seg["duration_ms"]
+    return delta
+
+
+async def _job_event_messages(
+    job_id: str,
+    prefer_proxy: bool,
+    is_disconnected: Callable[[], Awaitable[bool]],
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
     """
-    Return a single segment as OGG (Opus inside).
-    - 404 if job/segment doesn't exist
-    - 202 if segment exists but isn't ready yet
+    Yield ``(event, data)`` pairs for a job: one ``snapshot`` with every
+    segment's compact state, then a ``segment`` or ``job`` delta per change,
+    and ``keepalive`` while idle. Progress counts in segment deltas are kept
+    from the deltas themselves; the manifest is read for the snapshot and on
+    each idle timeout, when segments whose status moved without an event
+    reaching us get their deltas sent then.
     """
     job_manager = get_job_manager()
-    job = job_manager.jobs.get(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="job not found")
+    # Subscribe before the snapshot so no change falls between the two.
+    async with job_manager.events.subscribe(job_id) as subscription:
+        job = job_manager.jobs.get(job_id)
+        if not job:
+            return
+        segments = sorted(job.get("segments", []), key=lambda seg: seg.get("index", 0))
+        statuses = {seg.get("segment_id"): seg.get("status") for seg in segments}
+        tally = Counter(statuses.values())
+        status = job.get("status")
+        yield "snapshot", {
+            "job_id": job_id,
+            "status": status,
+            **_progress_payload(job),
+            "segments": [_segment_delta(job_id, seg, prefer_proxy) for seg in segments],
+        }
 
-    for segment in job.get("segments", []):
-        if segment.get("segment_id") == segment_id:
-            path = segment.get("path")
-            if not path:
-                # Segment is known but not ready: semantically 202.
-                raise HTTPException(
-                    status_code=202,
-                    detail="segment not ready",
-                    headers={"Retry-After": "1"},
+        def segment_message(seg: Dict[str, Any]) -> Dict[str, Any]:
+            segment_id = seg.get("segment_id")
+            tally[statuses[segment_id]] -= 1
+            statuses[segment_id] = seg.get("status")
+            tally[statuses[segment_id]] += 1
+            total = len(statuses)
+            return {
+                **_segment_delta(job_id, seg, prefer_proxy),
+                "segments_ready": tally["ready"],
+                "segments_error": tally["error"],
+                "progress_pct": round(tally["ready"] / total * 100.0, 3) if total else 0.0,
+            }
+
+        while status not in TERMINAL_JOB_STATUSES:
+            event = await subscription.next(timeout=EVENTS_KEEPALIVE_SECONDS)
+            if event is None:
+                if await is_disconnected():
+                    return
+                # Catch up on events the subscription dropped or never got.
+                latest = job_manager.jobs.get(job_id)
+                if not latest:
+                    return
+                latest_segments = sorted(
+                    latest.get("segments", []), key=lambda seg: seg.get("index", 0)
                 )
+                missed = [
+                    seg
+                    for seg in latest_segments
+                    if seg.get("segment_id") in statuses
+                    and seg.get("status") != statuses[seg.get("segment_id")]
+                ]
+                for seg in missed:
+                    yield "segment", segment_message(seg)
+                if latest.get("status") != status:
+                    event = {"type": "job", "status": latest.get("status")}
+                elif missed:
+                    continue
+                else:
+                    yield "keepalive", {}
+                    continue
+            if event.get("type") == "segment":
+                segment_id = event.get("segment_id")
+                if segment_id not in statuses or event.get("status") == statuses[segment_id]:
+                    continue
+                yield "segment", segment_message(event)
+            elif event.get("type") == "job":
+                status = event.get("status")
+                yield "job", {"job_id": job_id, "status": status}
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request) -> StreamingResponse:
+    """
+    Server-Sent Events stream of job progress.
 
-            headers = {
-                "Cache-Control": "no-store",
-                "X-Job-Id": job_id,
-                "X-Content-Type-Options": "nosniff",
-            }
-            cache_key = segment.get("cache_key")
-            if cache_key:
-                headers["ETag"] = f"\"{cache_key}\""
-                headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    Sends ``snapshot`` on connect, then ``segment`` deltas (segment_id,
+    status, url once ready, duration_ms) and ``job`` status changes, and
+    closes once the job reaches a terminal status. Idle connections get a
+    comment line every ``EVENTS_KEEPALIVE_SECONDS``.
+    """
+    job_manager = get_job_manager()
+    if not job_manager.jobs.exists(job_id):
+        raise HTTPException(status_code=404, detail="job not found")
+    prefer_proxy = prefer_proxy_from_headers(request.headers)
 
-            return FileResponse(
-                path=path,
-                media_type=OGG_MEDIA_TYPE,
-                filename=f"{segment_id}.ogg",
-                headers=headers,
-            )
+    async def event_iter() -> AsyncIterator[str]:
+        async for event, data in _job_event_messages(job_id, prefer_proxy, request.is_disconnected):
+            if event == "keepalive":
+                yield ": keepalive\n\n"
+            else:
+                yield _sse(event, data)
+
+    headers = {
+        "Cache-Control": "no-store",
+        "X-Job-Id": job_id,
+        "X-Accel-Buffering": "no",
+    }
+    return StreamingResponse(event_iter(), media_type="text/event-stream", headers=headers)
 
+
+@router.websocket("/jobs/{job_id}/ws")
+async def job_events_ws(websocket: WebSocket, job_id: str) -> None:
+    """WebSocket variant of ``/events``: each message is ``{"event": ..., "data": ...}``."""
+    job_manager = get_job_manager()
+    if not job_manager.jobs.exists(job_id):
+        await websocket.close(code=4404, reason="job not found")
+        return
+    await websocket.accept()
+    prefer_proxy = prefer_proxy_from_headers(websocket.headers)
+
+    async def is_disconnected() -> bool:
+        return websocket.client_state != WebSocketState.CONNECTED
+
+    try:
+        async for event, data in _job_event_messages(job_id, prefer_proxy, is_disconnected):
+            await websocket.send_json({"event": event, "data": data})
+    except WebSocketDisconnect:
+        return
+    await websocket.close()
+
+
+def _lookup_segment(job_id: str, segment_id: str) -> Dict[str, Any]:
+    job_manager = get_job_manager()
+    segment = job_manager.get_segment(job_id, segment_id)
+    if segment is not None:
+        return segment
+    if not job_manager.jobs.exists(job_id):
+        raise HTTPException(status_code=404, detail="job not found")
     raise HTTPException(status_code=404, detail="segment not found")
 
 
+@router.get("/jobs/{job_id}/segments/{segment_id}")
+def get_segment(job_id: str, segment_id: str) -> FileResponse:
+    """
+    Return a single segment as OGG (Opus inside).
+    - 404 if job/segment doesn't exist
+    - 202 if segment exists but isn't ready yet
+    """
+    segment = _lookup_segment(job_id, segment_id)
+    path = segment.get("path")
+    if not path:
+        # Segment is known but not ready: semantically 202.
+        raise HTTPException(
+            status_code=202,
+            detail="segment not ready",
+            headers={"Retry-After": "1"},
+        )
+
+    headers = {
+        "Cache-Control": "no-store",
+        "X-Job-Id": job_id,
+        "X-Content-Type-Options": "nosniff",
+    }
+    cache_key = segment.get("cache_key")
+    if cache_key:
+        headers["ETag"] = f"\"{cache_key}\""
+        headers["Cache-Control"] = "public, max-age=31536000, immutable"
+
+    return FileResponse(
+        path=path,
+        media_type=OGG_MEDIA_TYPE,
+        filename=f"{segment_id}.ogg",
+        headers=headers,
+    )
+
+
 @router.head("/jobs/{job_id}/segments/{segment_id}", include_in_schema=False)
 def head_segment(job_id: str, segment_id: str) -> Response:
     """
@@ -155,43 +327,35 @@ def head_segment(job_id: str, segment_id: str) -> Response:
     - 404 if job/segment doesn't exist
     - 202 if segment exists but isn't ready yet
     """
-    job_manager = get_job_manager()
-    job = job_manager.jobs.get(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="job not found")
-
-    for segment in job.get("segments", []):
-        if segment.get("segment_id") == segment_id:
-            path = segment.get("path")
-            if not path:
-                raise HTTPException(
-                    status_code=202,
-                    detail="segment not ready",
-                    headers={"Retry-After": "1"},
-                )
-
-            if not os.path.exists(path):
-                raise HTTPException(status_code=404, detail="segment not found")
+    segment = _lookup_segment(job_id, segment_id)
+    path = segment.get("path")
+    if not path:
+        raise HTTPException(
+            status_code=202,
+            detail="segment not ready",
+            headers={"Retry-After": "1"},
+        )
 
-            headers = {
-                "Cache-Control": "no-store",
-                "X-Job-Id": job_id,
-                "X-Content-Type-Options": "nosniff",
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(os.path.getsize(path)),
-            }
-            cache_key = segment.get("cache_key")
-            if cache_key:
-                headers["ETag"] = f"\"{cache_key}\""
-                headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="segment not found")
 
-            return Response(
-                status_code=200,
-                headers=headers,
-                media_type=OGG_MEDIA_TYPE,
-            )
+    headers = {
+        "Cache-Control": "no-store",
+        "X-Job-Id": job_id,
+        "X-Content-Type-Options": "nosniff",
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(os.path.getsize(path)),
+    }
+    cache_key = segment.get("cache_key")
+    if cache_key:
+        headers["ETag"] = f"\"{cache_key}\""
+        headers["Cache-Control"] = "public, max-age=31536000, immutable"
 
-    raise HTTPException(status_code=404, detail="segment not found")
+    return Response(
+        status_code=200,
+        headers=headers,
+        media_type=OGG_MEDIA_TYPE,
+    )
 
 
 def _build_concat_list(paths: list[str], list_path: Path) -> None:
@@ -261,6 +425,196 @@ def _merge_fingerprint(job: Dict[str, Any], segments: list[Dict[str, Any]]) -> s
     return sha256(raw).hexdigest()
 
 
+def _merged_path(job_id: str, fingerprint: str) -> Path:
+    job_dir = settings.segments_dir / job_id
+    job_dir.mkdir(parents=True, exist_ok=True)
+    return job_dir / f"merged-{fingerprint[:32]}.ogg"
+
+
+def _seek_index_path(merged_path: Path) -> Path:
+    return merged_path.with_suffix(".index.json")
+
+
+def _prune_merged(current: Path) -> None:
+    """Drop merged files and seek indexes cached under older fingerprints."""
+    keep = {current, _seek_index_path(current)}
+    for pattern in ("merged-*.ogg", "merged-*.index.json"):
+        for path in current.parent.glob(pattern):
+            if path not in keep:
+                path.unlink(missing_ok=True)
+
+
+def _write_seek_index(
+    concat: OpusConcat, segments: list[Dict[str, Any]], merged_path: Path
+) -> None:
+    """Persist segment start time -> byte offset for ``?t=`` seeks."""
+    boundaries = concat.builder.boundaries
+    index = {
+        "header_bytes": boundaries[0][1],
+        "segments": [
+            {
+                "segment_id": seg.get("segment_id"),
+                "index": seg.get("index"),
+                "start_ms": start_ms,
+                "byte_offset": byte_offset,
+            }
+            for seg, (start_ms, byte_offset) in zip(segments, boundaries)
+        ],
+    }
+    index_path = _seek_index_path(merged_path)
+    tmp_path = index_path.with_name(f"{index_path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_text(json.dumps(index), encoding="utf-8")
+    tmp_path.replace(index_path)
+
+
+def _load_seek_index(merged_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(_seek_index_path(merged_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        # ffmpeg merges have no index; they are served from the start.
+        return None
+
+
+def _read_file_ranges(path: Path, ranges: list[Tuple[int, int]]) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        for start, end in ranges:
+            handle.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = handle.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+
+def _parse_byte_range(range_header: Optional[str], length: int) -> Optional[Tuple[int, int]]:
+    """
+    Resolve a single ``bytes=`` range against ``length`` as ``(start, end)``,
+    end exclusive. Returns None when the header is absent or not a single
+    byte range, which callers answer with the full body; raises 416 when the
+    range lies outside the body.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.strip().partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    try:
+        if not sep:
+            return None
+        if not first:
+            start, end = max(length - int(last), 0), length
+        else:
+            start = int(first)
+            end = min(int(last) + 1, length) if last else length
+    except ValueError:
+        return None
+    if start >= length or start >= end:
+        raise HTTPException(
+            status_code=416,
+            detail="range not satisfiable",
+            headers={"Content-Range": f"bytes */{length}"},
+        )
+    return start, end
+
+
+def _slice_file_ranges(
+    ranges: list[Tuple[int, int]], start: int, end: int
+) -> list[Tuple[int, int]]:
+    """Map ``[start, end)`` of the body ``ranges`` describes back onto the file."""
+    sliced = []
+    position = 0
+    for range_start, range_end in ranges:
+        size = range_end - range_start
+        lo, hi = max(start - position, 0), min(end - position, size)
+        if lo < hi:
+            sliced.append((range_start + lo, range_start + hi))
+        position += size
+    return sliced
+
+
+def _merged_file_response(
+    job_id: str,
+    merged_path: Path,
+    seek_seconds: Optional[float] = None,
+    range_header: Optional[str] = None,
+) -> Response:
+    """
+    Serve the cached merge. Plain requests go through ``FileResponse``, which
+    answers Range requests and hands the file to the server's pathsend
+    extension when it offers one. ``seek_seconds`` starts playback at the
+    last segment boundary at or before that time: the stream's header pages
+    followed by the file from that segment's first audio page. Ranges on a
+    seek address that spliced body.
+    """
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"inline; filename=\"job_{job_id}.ogg\"",
+    }
+    index = _load_seek_index(merged_path) if seek_seconds else None
+    if index:
+        target_ms = seek_seconds * 1000.0
+        entry = None
+        for candidate in index.get("segments", []):
+            if candidate["start_ms"] > target_ms:
+                break
+            entry = candidate
+        header_bytes = index["header_bytes"]
+        if entry and entry["byte_offset"] > header_bytes:
+            size = merged_path.stat().st_size
+            ranges = [(0, header_bytes), (entry["byte_offset"], size)]
+            length = header_bytes + size - entry["byte_offset"]
+            seek_headers = {
+                **headers,
+                "Content-Length": str(length),
+                "X-Seek-Start-Ms": str(entry["start_ms"]),
+                "X-Seek-Segment-Id": str(entry["segment_id"]),
+            }
+            status_code = 200
+            byte_range = _parse_byte_range(range_header, length)
+            if byte_range:
+                start, end = byte_range
+                ranges = _slice_file_ranges(ranges, start, end)
+                seek_headers["Content-Length"] = str(end - start)
+                seek_headers["Content-Range"] = f"bytes {start}-{end - 1}/{length}"
+                status_code = 206
+            return StreamingResponse(
+                _read_file_ranges(merged_path, ranges),
+                status_code=status_code,
+                media_type=OGG_MEDIA_TYPE,
+                headers=seek_headers,
+            )
+    return FileResponse(
+        path=merged_path,
+        media_type=OGG_MEDIA_TYPE,
+        filename=f"job_{job_id}.ogg",
+        headers=headers,
+    )
+
+
+def _stream_and_cache(
+    concat: OpusConcat, segments: list[Dict[str, Any]], merged_path: Path
+) -> Iterator[bytes]:
+    """Yield the merged stream while writing it and its seek index to the cache."""
+    tmp_path = merged_path.with_name(f"{merged_path.stem}.{uuid.uuid4().hex}.tmp")
+    cached = False
+    try:
+        with open(tmp_path, "wb") as handle:
+            for chunk in concat.chunks():
+                handle.write(chunk)
+                yield chunk
+        # Index first, so a cached merge from this path always has one.
+        _write_seek_index(concat, segments, merged_path)
+        tmp_path.replace(merged_path)
+        cached = True
+        _prune_merged(merged_path)
+    finally:
+        if not cached:
+            tmp_path.unlink(missing_ok=True)
+
+
 @contextmanager
 def _merge_lock_context(job_id: str) -> Iterator[bool]:
     job_manager = get_job_manager()
@@ -287,14 +641,91 @@ def _merge_lock_context(job_id: str) -> Iterator[bool]:
         yield acquired
 
 
+def _append_segment(builder: OpusStreamBuilder, path: Path) -> bytes:
+    return b"".join(builder.append(path))
+
+
+async def _progressive_audio(
+    job_id: str, segments: list[Dict[str, Any]], deadline: Optional[float] = None
+) -> AsyncIterator[bytes]:
+    """
+    Yield one Ogg/Opus bitstream built from the job's segments in index order.
+
+    Each segment is appended as soon as it is ready, waking on job events, so
+    the response stays open while later segments synthesize. Failed or
+    canceled segments are skipped; the stream is closed after the last
+    segment, or early when a segment is not ready within
+    ``PROGRESSIVE_SEGMENT_WAIT_SECONDS`` or ``deadline`` passes.
+    """
+    job_manager = get_job_manager()
+    builder = OpusStreamBuilder()
+    async with job_manager.events.subscribe(job_id) as subscription:
+        for seg in sorted(segments, key=lambda item: item.get("index", 0)):
+            segment_id = seg.get("segment_id")
+            if not segment_id:
+                continue
+            wait_until = time.time() + PROGRESSIVE_SEGMENT_WAIT_SECONDS
+            if deadline is not None:
+                wait_until = min(wait_until, deadline)
+
+            while True:
+                latest = job_manager.get_segment(job_id, segment_id) or {}
+                path = latest.get("path")
+                status = latest.get("status")
+                if path or status in {"error", "canceled"} or time.time() >= wait_until:
+                    break
+                # The timeout only covers a lost notification.
+                await subscription.next(
+                    timeout=min(STREAM_FALLBACK_POLL_SECONDS, wait_until - time.time())
+                )
+
+            if not path and status in {"error", "canceled"}:
+                continue
+            if not path:
+                break
+            try:
+                data = await asyncio.to_thread(_append_segment, builder, Path(path))
+            except (OggConcatError, OSError):
+                break
+            if data:
+                yield data
+
+    tail = b"".join(builder.finish())
+    if tail:
+        yield tail
+
+
 @router.get("/jobs/{job_id}/audio.ogg")
-def get_job_audio(job_id: str) -> Response:
+def get_job_audio(
+    job_id: str, request: Request, stream: bool = False, t: Optional[float] = None
+) -> Response:
+    """
+    Return the whole job as one Ogg/Opus file.
+
+    Until the job completes this answers 202 with progress, unless
+    ``stream=true``: then the response starts right away and grows as
+    segments finish (chunked, no Content-Length), ending with the job.
+
+    Once merged, Range requests are honored and ``t`` (seconds) starts the
+    file at the nearest segment boundary at or before that time.
+    """
     job_manager = get_job_manager()
     job = job_manager.jobs.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="job not found")
 
     status = job.get("status", "")
+    if stream and status not in TERMINAL_JOB_STATUSES:
+        headers = {
+            "Cache-Control": "no-store",
+            "X-Job-Id": job_id,
+            "X-Content-Type-Options": "nosniff",
+        }
+        return StreamingResponse(
+            _progressive_audio(job_id, job.get("segments", [])),
+            media_type=OGG_MEDIA_TYPE,
+            headers=headers,
+        )
     if status not in {"complete", "complete_with_errors"}:
         progress = _progress_payload(job)
         headers = {"Retry-After": "1"}
@@ -318,10 +749,37 @@ def get_job_audio(job_id: str) -> Response:
     if status == "complete":
         ready_segments = segments
 
-    job_dir = settings.segments_dir / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
-    merged_path = job_dir / "merged.ogg"
-    meta_path = job_dir / "merged_meta.json"
+    fingerprint = _merge_fingerprint(job, ready_segments)
+    merged_path = _merged_path(job_id, fingerprint)
+    if merged_path.exists():
+        return _merged_file_response(job_id, merged_path, t, request.headers.get("range"))
+
+    try:
+        concat = OpusConcat([Path(seg["path"]) for seg in ready_segments])
+    except (OggConcatError, OSError):
+        concat = None
+    if concat is not None and (t or "range" in request.headers):
+        # Ranges and seeks address the finished file, so build the cache
+        # first; the native merge only copies pages.
+        try:
+            for _ in _stream_and_cache(concat, ready_segments, merged_path):
+                pass
+        except (OggConcatError, OSError):
+            concat = None
+        else:
+            return _merged_file_response(job_id, merged_path, t, request.headers.get("range"))
+    if concat is not None:
+        # No lock: concurrent first requests each stream their own copy and
+        # the last finished one lands in the cache.
+        headers = {
+            "Content-Length": str(concat.content_length),
+            "Content-Disposition": f"inline; filename=\"job_{job_id}.ogg\"",
+        }
+        return StreamingResponse(
+            _stream_and_cache(concat, ready_segments, merged_path),
+            media_type=OGG_MEDIA_TYPE,
+            headers=headers,
+        )
 
     with _merge_lock_context(job_id) as acquired:
         if not acquired:
@@ -340,39 +798,13 @@ def get_job_audio(job_id: str) -> Response:
                 headers=headers,
             )
 
-        fingerprint = _merge_fingerprint(job, ready_segments)
-        if merged_path.exists() and meta_path.exists():
-            try:
-                meta = json.loads(meta_path.read_text(encoding="utf-8"))
-                if meta.get("fingerprint") == fingerprint:
-                    headers = {
-                        "Accept-Ranges": "bytes",
-                        "Content-Disposition": f"inline; filename=\"job_{job_id}.ogg\"",
-                    }
-                    return FileResponse(
-                        path=merged_path,
-                        media_type=OGG_MEDIA_TYPE,
-                        filename=f"job_{job_id}.ogg",
-                        headers=headers,
-                    )
-            except json.JSONDecodeError:
-                pass
+        if not merged_path.exists():
+            tmp_output = merged_path.with_suffix(".tmp.ogg")
+            _merge_segments([seg["path"] for seg in ready_segments], tmp_output)
+            tmp_output.replace(merged_path)
+            _prune_merged(merged_path)
 
-        tmp_output = merged_path.with_suffix(".tmp.ogg")
-        _merge_segments([seg["path"] for seg in ready_segments], tmp_output)
-        tmp_output.replace(merged_path)
-        meta_path.write_text(json.dumps({"fingerprint": fingerprint}), encoding="utf-8")
-
-    headers = {
-        "Accept-Ranges": "bytes",
-        "Content-Disposition": f"inline; filename=\"job_{job_id}.ogg\"",
-    }
-    return FileResponse(
-        path=merged_path,
-        media_type=OGG_MEDIA_TYPE,
-        filename=f"job_{job_id}.ogg",
-        headers=headers,
-    )
+    return _merged_file_response(job_id, merged_path, t, request.headers.get("range"))
 
 
 @router.get("/jobs/{job_id}/playlist.json")
@@ -388,12 +820,7 @@ def get_playlist(job_id: str, request: Request) -> Dict[str, Any]:
     playlist = []
     for seg in segments:
         segment_id = seg.get("segment_id")
-        url_backend = seg.get("url_backend") or (
-            f"/v1/tts/jobs/{job_id}/segments/{segment_id}" if segment_id else None
-        )
-        url_proxy = seg.get("url_proxy") or (
-            f"/api/tts/jobs/{job_id}/segments/{segment_id}" if segment_id else None
-        )
+        url_proxy, url_backend = _segment_urls(job_id, seg)
         url_best = select_best_url(url_proxy, url_backend, prefer_proxy)
         entry = {
             "index": seg.get("index"),
@@ -416,13 +843,10 @@ def get_playlist(job_id: str, request: Request) -> Dict[str, Any]:
 @router.post("/stream")
 async def stream_tts(payload: TTSJobRequest) -> StreamingResponse:
     """
-    Stream audio as it becomes available.
+    Submit a job and stream its audio as segments become available.
 
-    IMPORTANT:
-    - Concatenating multiple OGG files into one HTTP response is not guaranteed
-      to play in all browsers.
-    - For web, prefer job+segments playback.
-    - This endpoint is still useful for some clients and debugging.
+    The response is a single Ogg/Opus bitstream (see ``_progressive_audio``),
+    so browsers can play it as it arrives.
     """
     job_manager = get_job_manager()
     try:
@@ -435,53 +859,20 @@ async def stream_tts(payload: TTSJobRequest) -> StreamingResponse:
                 voice_id=payload.voice_id,
                 reading_profile=payload.reading_profile,
                 settings=settings,
+                priority=payload.priority,
             )
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     job_id = job["job_id"]
 
-    async def audio_iter() -> Iterator[bytes]:
-        overall_deadline = time.time() + 300  # 5 minutes max
-        segments = job.get("segments", [])
-        if not segments:
-            return
-
-        for seg in segments:
-            segment_id = seg.get("segment_id")
-            if not segment_id:
-                continue
-
-            deadline = time.time() + 120  # per segment max
-            path = seg.get("path")
-
-            # Wait for segment to become ready without blocking threads.
-            while (not path) and (time.time() < deadline) and (time.time() < overall_deadline):
-                latest = job_manager.jobs.get(job_id) or {}
-                for s2 in latest.get("segments", []):
-                    if s2.get("segment_id") == segment_id:
-                        path = s2.get("path")
-                        break
-                if path:
-                    break
-                await asyncio.sleep(0.1)
-
-            if not path:
-                break
-
-            try:
-                with open(path, "rb") as f:
-                    while True:
-                        chunk = f.read(1024 * 64)
-                        if not chunk:
-                            break
-                        yield chunk
-            except FileNotFoundError:
-                break
+    audio_iter = _progressive_audio(
+        job_id, job.get("segments", []), deadline=time.time() + 300  # 5 minutes max
+    )
 
     headers = {
         "X-Job-Id": job_id,
         "Cache-Control": "no-store",
         "X-Content-Type-Options": "nosniff",
     }
-    return StreamingResponse(audio_iter(), media_type=OGG_MEDIA_TYPE, headers=headers)
+    return StreamingResponse(audio_iter, media_type=OGG_MEDIA_TYPE, headers=headers)
@@ -1,11 +1,15 @@
 import hashlib
 import json
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 
 from diskcache import Cache
 
 
+# Lineage entries only feed the key churn metric; unused ones age out.
+LINEAGE_TTL_SECONDS = 30 * 24 * 3600
+
+
 class SegmentCache:
     def __init__(self, cache_dir: Path, segments_dir: Path):
         self.cache = Cache(str(cache_dir / "metadata"))
@@ -30,6 +34,33 @@ class SegmentCache:
         blob = json.dumps(payload, sort_keys=True).encode("utf-8")
         return hashlib.sha256(blob).hexdigest()
 
+    @staticmethod
+    def build_lineage_key(
+        normalized_text: str,
+        model_id: str,
+        voice_id: Optional[str],
+        compiler_version: str,
+    ) -> str:
+        """Identifies a segment independently of the dictionaries used for it."""
+        payload = {
+            "text": normalized_text,
+            "model_id": model_id,
+            "voice_id": voice_id or "",
+            "compiler_version": compiler_version,
+        }
+        blob = json.dumps(payload, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+
+    def swap_lineage(self, lineage_key: str, cache_key: str) -> bool:
+        """Record the current cache key for a segment; True if it replaced another."""
+        key = f"lineage:{lineage_key}"
+        previous = self.cache.get(key)
+        if previous != cache_key:
+            self.cache.set(key, cache_key, expire=LINEAGE_TTL_SECONDS)
+        else:
+            self.cache.touch(key, expire=LINEAGE_TTL_SECONDS)
+        return previous is not None and previous != cache_key
+
     def get_segment_path(self, cache_key: str) -> Path:
         return self.segments_dir / f"{cache_key}.ogg"
 
@@ -42,5 +73,19 @@ class SegmentCache:
             return None
         return path
 
-    def set(self, cache_key: str, path: Path) -> None:
+    def get_many(self, cache_keys: Iterable[str]) -> Dict[str, Path]:
+        """Look up several keys, each once; misses are left out."""
+        hits: Dict[str, Path] = {}
+        for cache_key in dict.fromkeys(cache_keys):
+            path = self.get(cache_key)
+            if path:
+                hits[cache_key] = path
+        return hits
+
+    def set(self, cache_key: str, path: Path, duration_ms: Optional[float] = None) -> None:
         self.cache.set(cache_key, str(path))
+        if duration_ms is not None:
+            self.cache.set(f"duration:{cache_key}", duration_ms)
+
+    def get_duration_ms(self, cache_key: str) -> Optional[float]:
+        return self.cache.get(f"duration:{cache_key}")
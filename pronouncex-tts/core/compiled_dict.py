@@ -0,0 +1,242 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"PXDICT1\0"
+SUFFIX = ".pxdict"
+
+
+def normalize_entries(entries: object) -> Dict[str, str]:
+    """Lowercase keys and reduce values to phoneme strings, dropping empties."""
+    if not isinstance(entries, dict):
+        return {}
+    normalized: Dict[str, str] = {}
+    for key, value in entries.items():
+        if not key:
+            continue
+        phonemes = None
+        if isinstance(value, str):
+            phonemes = value.strip()
+        elif isinstance(value, dict):
+            phonemes = str(value.get("phonemes", "")).strip()
+        if phonemes:
+            normalized[str(key).lower()] = phonemes
+    return normalized
+
+
+def compiled_path_for(source_path: Path, compiled_dir: Path) -> Path:
+    return compiled_dir / f"{source_path.stem}{SUFFIX}"
+
+
+def write_compiled_pack(
+    output_path: Path,
+    *,
+    name: str,
+    version: str,
+    entries: Dict[str, str],
+    source_path: Optional[Path] = None,
+    compiler_version: str = "",
+) -> Path:
+    """
+    Write a pack as a sorted key table that readers can mmap.
+
+    Layout: magic, u32 metadata length, JSON metadata, padding to 4 bytes, then
+    u32 key offsets, u32 value offsets and u32 phrase indices, followed by the
+    UTF-8 key blob and value blob. Keys are sorted by their UTF-8 bytes.
+    """
+    items = sorted(
+        ((key.encode("utf-8"), value.encode("utf-8")) for key, value in entries.items()),
+        key=lambda item: item[0],
+    )
+    key_offsets = array("I", [0])
+    value_offsets = array("I", [0])
+    phrase_indices = array("I")
+    for idx, (key, value) in enumerate(items):
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(value))
+        if b" " in key:
+            phrase_indices.append(idx)
+
+    meta: Dict[str, object] = {
+        "name": name,
+        "version": version,
+        "compiler_version": compiler_version,
+        "count": len(items),
+        "phrase_count": len(phrase_indices),
+        "byteorder": sys.byteorder,
+    }
+    if source_path is not None:
+        stat = source_path.stat()
+        meta["source_name"] = source_path.name
+        meta["source_size"] = stat.st_size
+        meta["source_mtime_ns"] = stat.st_mtime_ns
+    meta_blob = json.dumps(meta, sort_keys=True).encode("utf-8")
+    header_len = len(MAGIC) + 4 + len(meta_blob)
+    padding = (-header_len) % 4
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(".tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack("=I", len(meta_blob)))
+        handle.write(meta_blob)
+        handle.write(b"\0" * padding)
+        handle.write(key_offsets.tobytes())
+        handle.write(value_offsets.tobytes())
+        handle.write(phrase_indices.tobytes())
+        for key, _ in items:
+            handle.write(key)
+        for _, value in items:
+            handle.write(value)
+    # Replace rather than rewrite so processes with the old file mapped keep
+    # reading a consistent copy.
+    tmp_path.replace(output_path)
+    return output_path
+
+
+class CompiledPack:
+    """
+    Read-only, mmap-backed view of a compiled pack.
+
+    Behaves like a ``Dict[str, str]`` for lookups. Writes land in a small
+    in-memory overlay so overrides can be applied without recompiling.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as handle:
+            self._mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._parse()
+        self._overlay: Dict[str, str] = {}
+
+    def _parse(self) -> None:
+        mm = self._mm
+        if mm[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"not a compiled pack: {self.path}")
+        pos = len(MAGIC)
+        (meta_len,) = struct.unpack_from("=I", mm, pos)
+        pos += 4
+        self.meta = json.loads(mm[pos : pos + meta_len].decode("utf-8"))
+        if self.meta.get("byteorder") != sys.byteorder:
+            raise ValueError(f"compiled pack byte order mismatch: {self.path}")
+        pos += meta_len
+        pos += (-pos) % 4
+        count = int(self.meta["count"])
+        phrase_count = int(self.meta.get("phrase_count", 0))
+        view = memoryview(mm)
+        table_len = (count + 1) * 4
+        self._key_offsets = view[pos : pos + table_len].cast("I")
+        pos += table_len
+        self._value_offsets = view[pos : pos + table_len].cast("I")
+        pos += table_len
+        self._phrase_indices = view[pos : pos + phrase_count * 4].cast("I")
+        pos += phrase_count * 4
+        self._keys_start = pos
+        self._values_start = pos + self._key_offsets[count]
+        self._count = count
+
+    @property
+    def name(self) -> str:
+        return str(self.meta.get("name") or "")
+
+    @property
+    def version(self) -> str:
+        return str(self.meta.get("version") or "0.0.0")
+
+    def matches_source(self, source_path: Path) -> bool:
+        try:
+            stat = source_path.stat()
+        except OSError:
+            return False
+        return (
+            self.meta.get("source_name") == source_path.name
+            and self.meta.get("source_size") == stat.st_size
+            and self.meta.get("source_mtime_ns") == stat.st_mtime_ns
+        )
+
+    def _key_at(self, idx: int) -> bytes:
+        start = self._keys_start + self._key_offsets[idx]
+        end = self._keys_start + self._key_offsets[idx + 1]
+        return self._mm[start:end]
+
+    def _value_at(self, idx: int) -> str:
+        start = self._values_start + self._value_offsets[idx]
+        end = self._values_start + self._value_offsets[idx + 1]
+        return self._mm[start:end].decode("utf-8")
+
+    def _find(self, key: str) -> int:
+        target = key.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key_at(lo) == target:
+            return lo
+        return -1
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        if key in self._overlay:
+            return self._overlay[key]
+        idx = self._find(key)
+        if idx < 0:
+            return default
+        return self._value_at(idx)
+
+    def __getitem__(self, key: str) -> str:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: str) -> None:
+        self._overlay[key] = value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key) is not None
+
+    def __len__(self) -> int:
+        return self._count + sum(1 for key in self._overlay if self._find(key) < 0)
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self.items():
+            yield key
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        for idx in range(self._count):
+            key = self._key_at(idx).decode("utf-8")
+            if key in self._overlay:
+                continue
+            yield key, self._value_at(idx)
+        yield from self._overlay.items()
+
+    def phrase_items(self) -> List[Tuple[str, str]]:
+        """Multi-word entries only, without scanning the whole table."""
+        phrases = [
+            (self._key_at(idx).decode("utf-8"), self._value_at(idx))
+            for idx in self._phrase_indices
+        ]
+        phrases = [(key, value) for key, value in phrases if key not in self._overlay]
+        phrases.extend((key, value) for key, value in self._overlay.items() if " " in key)
+        return phrases
+
+
+def load_compiled_pack(source_path: Path, compiled_dir: Path) -> Optional[CompiledPack]:
+    """Return the compiled artifact for ``source_path`` if it is still current."""
+    path = compiled_path_for(source_path, compiled_dir)
+    if not path.exists() or os.path.getsize(path) == 0:
+        return None
+    try:
+        pack = CompiledPack(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    if not pack.matches_source(source_path):
+        return None
+    return pack
@@ -12,13 +12,20 @@ class Settings:
     model_id_quality: str
     model_allowlist: list[str]
     phoneme_mode: str
+    resolve_batch_scope: str
+    resolve_memo_size: int
     role: str
     redis_url: str | None
+    work_unit: str
+    queue_backend: str
+    job_store_layout: str
+    priority_head_segments: int
     enable_autolearn: bool
     autolearn_on_miss: bool
     autolearn_path: Path
     autolearn_flush_seconds: int
     autolearn_min_len: int
+    cache_key_dict_scope: str
     dict_dir: Path
     compiled_dir: Path
     cache_dir: Path
@@ -29,12 +36,18 @@ class Settings:
     compiler_version: str
     public_segment_base_url: str
     parallel_encode: bool
+    audio_encoder: str
+    encode_workers: int
     max_workers: int
     per_job_workers: int
     max_text_chars: int
     max_segments: int
     max_active_jobs: int
     max_concurrent_segments: int
+    synth_concurrency: str
+    synth_threads: int
+    synth_executor: str
+    synth_coalesce_seconds: float
     min_segment_chars: int
     require_workers: bool
     jobs_ttl_seconds: int
@@ -54,6 +67,16 @@ def load_settings() -> Settings:
     if role not in {"all", "api", "worker"}:
         role = "all"
     redis_url = os.getenv("PRONOUNCEX_TTS_REDIS_URL", "").strip() or None
+    work_unit = os.getenv("PRONOUNCEX_TTS_WORK_UNIT", "job").strip().lower() or "job"
+    if work_unit not in {"job", "segment"}:
+        work_unit = "job"
+    queue_backend = os.getenv("PRONOUNCEX_TTS_QUEUE_BACKEND", "list").strip().lower() or "list"
+    if queue_backend not in {"list", "stream"}:
+        queue_backend = "list"
+    job_store_layout = os.getenv("PRONOUNCEX_TTS_JOB_STORE_LAYOUT", "json").strip().lower() or "json"
+    if job_store_layout not in {"json", "hash"}:
+        job_store_layout = "json"
+    priority_head_segments = max(int(os.getenv("PRONOUNCEX_TTS_PRIORITY_HEAD_SEGMENTS", "2")), 0)
 
     model_id = os.getenv(
         "PRONOUNCEX_TTS_MODEL_ID", "tts_models/en/ljspeech/tacotron2-DDC_ph"
@@ -80,6 +103,12 @@ def load_settings() -> Settings:
         model_id_default = model_id_quality
 
     phoneme_mode = os.getenv("PRONOUNCEX_TTS_PHONEME_MODE", "espeak").strip() or "espeak"
+    resolve_batch_scope = (
+        os.getenv("PRONOUNCEX_TTS_RESOLVE_BATCH", "segment").strip().lower() or "segment"
+    )
+    if resolve_batch_scope not in {"word", "segment", "job"}:
+        resolve_batch_scope = "segment"
+    resolve_memo_size = int(os.getenv("PRONOUNCEX_TTS_RESOLVE_MEMO_SIZE", "50000"))
     enable_autolearn = _env_bool(os.getenv("PRONOUNCEX_TTS_AUTOLEARN", "1"))
     autolearn_on_miss = _env_bool(os.getenv("PRONOUNCEX_TTS_AUTOLEARN_ON_MISS", "0"))
     autolearn_path = Path(
@@ -90,6 +119,11 @@ def load_settings() -> Settings:
     )
     autolearn_flush_seconds = int(os.getenv("PRONOUNCEX_TTS_AUTOLEARN_FLUSH_SECONDS", "5"))
     autolearn_min_len = int(os.getenv("PRONOUNCEX_TTS_AUTOLEARN_MIN_LEN", "3"))
+    cache_key_dict_scope = (
+        os.getenv("PRONOUNCEX_TTS_CACHE_KEY_DICT_SCOPE", "segment").strip().lower() or "segment"
+    )
+    if cache_key_dict_scope not in {"versions", "segment"}:
+        cache_key_dict_scope = "segment"
     dict_dir = Path(os.getenv("PRONOUNCEX_TTS_DICT_DIR", SERVICE_ROOT / "dicts" / "packs"))
     compiled_dir = Path(
         os.getenv("PRONOUNCEX_TTS_COMPILED_DIR", SERVICE_ROOT / "dicts" / "compiled")
@@ -107,6 +141,10 @@ def load_settings() -> Settings:
         os.getenv("PRONOUNCEX_TTS_PUBLIC_SEGMENT_BASE_URL", "/api/tts")
     )
     parallel_encode = _env_bool(os.getenv("PRONOUNCEX_TTS_PARALLEL_ENCODE", "1"))
+    audio_encoder = os.getenv("PRONOUNCEX_TTS_AUDIO_ENCODER", "auto").strip().lower() or "auto"
+    if audio_encoder not in {"auto", "soundfile", "ffmpeg"}:
+        audio_encoder = "auto"
+    encode_workers = max(int(os.getenv("PRONOUNCEX_TTS_ENCODE_WORKERS", "2")), 1)
     cpu_count = os.cpu_count() or 2
     max_workers_default = min(4, cpu_count)
     max_workers = int(os.getenv("PRONOUNCEX_TTS_WORKERS", str(max_workers_default)))
@@ -114,6 +152,16 @@ def load_settings() -> Settings:
     per_job_workers = int(
         os.getenv("PRONOUNCEX_TTS_JOB_WORKERS", str(max_concurrent_segments))
     )
+    synth_concurrency = (
+        os.getenv("PRONOUNCEX_TTS_SYNTH_CONCURRENCY", "instance").strip().lower() or "instance"
+    )
+    if synth_concurrency not in {"global", "model", "instance"}:
+        synth_concurrency = "instance"
+    synth_threads = int(os.getenv("PRONOUNCEX_TTS_SYNTH_THREADS", "0"))
+    synth_executor = os.getenv("PRONOUNCEX_TTS_SYNTH_EXECUTOR", "thread").strip().lower() or "thread"
+    if synth_executor not in {"thread", "process"}:
+        synth_executor = "thread"
+    synth_coalesce_seconds = float(os.getenv("PRONOUNCEX_TTS_SYNTH_COALESCE_SECONDS", "60"))
     max_text_chars = int(os.getenv("PRONOUNCEX_TTS_MAX_TEXT_CHARS", "20000"))
     max_segments = int(os.getenv("PRONOUNCEX_TTS_MAX_SEGMENTS", "120"))
     max_active_jobs = int(os.getenv("PRONOUNCEX_TTS_MAX_ACTIVE_JOBS", "20"))
@@ -149,6 +197,10 @@ def load_settings() -> Settings:
         max_concurrent_segments = 1
     if per_job_workers > max_concurrent_segments:
         per_job_workers = max_concurrent_segments
+    if synth_threads < 0:
+        synth_threads = 0
+    if synth_coalesce_seconds < 0:
+        synth_coalesce_seconds = 0.0
     if max_text_chars < 1:
         max_text_chars = 1
     if max_segments < 1:
@@ -165,6 +217,8 @@ def load_settings() -> Settings:
         stale_queued_seconds = 0
     if stale_queued_abandoned_seconds < 0:
         stale_queued_abandoned_seconds = 0
+    if resolve_memo_size < 0:
+        resolve_memo_size = 0
     if chunk_target_chars < 1:
         chunk_target_chars = 1
     if chunk_max_chars < chunk_target_chars:
@@ -176,13 +230,20 @@ def load_settings() -> Settings:
         model_id_quality=model_id_quality,
         model_allowlist=model_allowlist,
         phoneme_mode=phoneme_mode,
+        resolve_batch_scope=resolve_batch_scope,
+        resolve_memo_size=resolve_memo_size,
         role=role,
         redis_url=redis_url,
+        work_unit=work_unit,
+        queue_backend=queue_backend,
+        job_store_layout=job_store_layout,
+        priority_head_segments=priority_head_segments,
         enable_autolearn=enable_autolearn,
         autolearn_on_miss=autolearn_on_miss,
         autolearn_path=autolearn_path,
         autolearn_flush_seconds=autolearn_flush_seconds,
         autolearn_min_len=autolearn_min_len,
+        cache_key_dict_scope=cache_key_dict_scope,
         dict_dir=dict_dir,
         compiled_dir=compiled_dir,
         cache_dir=cache_dir,
@@ -193,12 +254,18 @@ def load_settings() -> Settings:
         compiler_version=compiler_version,
         public_segment_base_url=public_segment_base_url,
         parallel_encode=parallel_encode,
+        audio_encoder=audio_encoder,
+        encode_workers=encode_workers,
         max_workers=max_workers,
         per_job_workers=per_job_workers,
         max_text_chars=max_text_chars,
         max_segments=max_segments,
         max_active_jobs=max_active_jobs,
         max_concurrent_segments=max_concurrent_segments,
+        synth_concurrency=synth_concurrency,
+        synth_threads=synth_threads,
+        synth_executor=synth_executor,
+        synth_coalesce_seconds=synth_coalesce_seconds,
         min_segment_chars=min_segment_chars,
         require_workers=require_workers,
         jobs_ttl_seconds=jobs_ttl_seconds,
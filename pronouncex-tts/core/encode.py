@@ -1,43 +1,293 @@
 import subprocess
-import uuid
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Sequence
+from typing import Dict, List, Optional, Sequence, Set
 
+import numpy as np
 
 try:
     import soundfile as sf
 except Exception:  # pragma: no cover
     sf = None
 
+try:
+    from scipy.signal import resample_poly
+except Exception:  # pragma: no cover
+    resample_poly = None
+
+
+# libopus only runs at these rates; ffmpeg resamples implicitly, libsndfile
+# refuses anything else.
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+OPUS_BITRATE_KBPS = 48
+# libsndfile maps compression_level 0..1 linearly onto this bitrate range.
+_SNDFILE_OPUS_MAX_KBPS = 256
+_SNDFILE_OPUS_MIN_KBPS = 6
+
+_sndfile_opus: Optional[bool] = None
+
 
 class AudioEncodingError(RuntimeError):
     pass
 
 
-def encode_to_ogg_opus(audio: Sequence[float], sample_rate: int, output_path: Path, tmp_dir: Path) -> None:
-    if sf is None:
-        raise AudioEncodingError("soundfile is required for encoding")
-    tmp_dir.mkdir(parents=True, exist_ok=True)
+def soundfile_opus_available() -> bool:
+    """True when the linked libsndfile can write OGG/Opus (1.0.29 and later)."""
+    global _sndfile_opus
+    if _sndfile_opus is None:
+        try:
+            _sndfile_opus = sf is not None and "OPUS" in sf.available_subtypes("OGG")
+        except Exception:
+            _sndfile_opus = False
+    return _sndfile_opus
+
+
+def _opus_rate(sample_rate: int) -> int:
+    for rate in OPUS_SAMPLE_RATES:
+        if rate >= sample_rate:
+            return rate
+    return OPUS_SAMPLE_RATES[-1]
+
+
+def _resample(audio: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    if source_rate == target_rate or audio.size == 0:
+        return audio
+    if resample_poly is not None:
+        divisor = np.gcd(source_rate, target_rate)
+        return resample_poly(audio, target_rate // divisor, source_rate // divisor).astype(np.float32)
+    count = int(round(audio.size * target_rate / source_rate))
+    positions = np.arange(count, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+
+
+def encode_ogg_opus_soundfile(audio: Sequence[float], sample_rate: int, output_path: Path) -> None:
+    """Encode in memory with libsndfile and write the OGG straight to ``output_path``."""
+    if not soundfile_opus_available():
+        raise AudioEncodingError("libsndfile was built without OGG/Opus support")
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_wav = tmp_dir / f"segment_{uuid.uuid4().hex}.wav"
-    sf.write(str(tmp_wav), audio, sample_rate)
+    samples = np.asarray(audio, dtype=np.float32).ravel()
+    rate = _opus_rate(sample_rate)
+    samples = _resample(samples, sample_rate, rate)
+    level = (_SNDFILE_OPUS_MAX_KBPS - OPUS_BITRATE_KBPS) / (
+        _SNDFILE_OPUS_MAX_KBPS - _SNDFILE_OPUS_MIN_KBPS
+    )
     try:
-        command = [
+        sf.write(
+            str(output_path),
+            samples,
+            rate,
+            format="OGG",
+            subtype="OPUS",
+            compression_level=level,
+        )
+    except Exception as exc:
+        output_path.unlink(missing_ok=True)
+        raise AudioEncodingError(f"libsndfile failed: {exc}") from exc
+
+
+@dataclass
+class FfmpegPoolStats:
+    spawned: int
+    spare_hits: int
+    spare_misses: int
+    restarts: int
+    idle: int
+
+
+class FfmpegEncoderPool:
+    """
+    Pre-started ffmpeg encoders fed raw PCM over stdin.
+
+    An ffmpeg process writes one OGG container, so a process cannot be reused
+    across segments. The pool instead keeps ``size`` idle processes per sample
+    rate already exec'd and waiting on stdin; a segment takes one, streams
+    float32 PCM in, reads the OGG back from stdout, and a replacement is
+    started in its place on a background thread, so the segment never waits
+    on a spawn it does not use. Spares that died while idle are replaced and
+    the encode retried once.
+    """
+
+    def __init__(self, size: int = 2, bitrate_kbps: int = OPUS_BITRATE_KBPS) -> None:
+        self.size = max(size, 0)
+        self.bitrate_kbps = bitrate_kbps
+        self._lock = threading.Lock()
+        self._idle: Dict[int, List[subprocess.Popen]] = {}
+        self._replenishing: Set[int] = set()
+        self._spawned = 0
+        self._spare_hits = 0
+        self._spare_misses = 0
+        self._restarts = 0
+
+    def _command(self, sample_rate: int) -> List[str]:
+        return [
             "ffmpeg",
-            "-y",
+            "-hide_banner",
             "-loglevel",
             "error",
+            "-f",
+            "f32le",
+            "-ar",
+            str(sample_rate),
+            "-ac",
+            "1",
             "-i",
-            str(tmp_wav),
+            "pipe:0",
             "-c:a",
             "libopus",
             "-b:a",
-            "48k",
-            str(output_path),
+            f"{self.bitrate_kbps}k",
+            "-f",
+            "ogg",
+            "pipe:1",
         ]
-        result = subprocess.run(command, capture_output=True, check=False)
-        if result.returncode != 0:
-            stderr = result.stderr.decode("utf-8", errors="ignore")
-            raise AudioEncodingError(f"ffmpeg failed: {stderr}")
-    finally:
-        tmp_wav.unlink(missing_ok=True)
+
+    def _spawn(self, sample_rate: int) -> subprocess.Popen:
+        process = subprocess.Popen(
+            self._command(sample_rate),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        with self._lock:
+            self._spawned += 1
+        return process
+
+    def _replenish(self, sample_rate: int) -> None:
+        with self._lock:
+            missing = self.size - len(self._idle.get(sample_rate, []))
+        for _ in range(max(missing, 0)):
+            try:
+                process = self._spawn(sample_rate)
+            except OSError:
+                return
+            with self._lock:
+                self._idle.setdefault(sample_rate, []).append(process)
+
+    def _replenish_in_background(self, sample_rate: int) -> None:
+        with self._lock:
+            if sample_rate in self._replenishing:
+                return
+            self._replenishing.add(sample_rate)
+
+        def run() -> None:
+            try:
+                while True:
+                    with self._lock:
+                        # Decided under the lock so an acquire racing the
+                        # last check still finds a replenisher running.
+                        if len(self._idle.get(sample_rate, [])) >= self.size:
+                            self._replenishing.discard(sample_rate)
+                            return
+                    process = self._spawn(sample_rate)
+                    with self._lock:
+                        self._idle.setdefault(sample_rate, []).append(process)
+            except Exception:
+                # No spare this time; the next acquire tries again.
+                with self._lock:
+                    self._replenishing.discard(sample_rate)
+
+        threading.Thread(target=run, name="px-ffmpeg-spares", daemon=True).start()
+
+    def _acquire(self, sample_rate: int) -> subprocess.Popen:
+        process = None
+        with self._lock:
+            idle = self._idle.get(sample_rate, [])
+            while idle:
+                candidate = idle.pop()
+                if candidate.poll() is None:
+                    process = candidate
+                    self._spare_hits += 1
+                    break
+                self._restarts += 1
+            if process is None:
+                self._spare_misses += 1
+        if process is None:
+            process = self._spawn(sample_rate)
+        self._replenish_in_background(sample_rate)
+        return process
+
+    def warm(self, sample_rate: int) -> None:
+        self._replenish(sample_rate)
+
+    def encode(self, audio: Sequence[float], sample_rate: int) -> bytes:
+        pcm = np.asarray(audio, dtype="<f4").ravel().tobytes()
+        for attempt in range(2):
+            process = self._acquire(sample_rate)
+            try:
+                stdout, stderr = process.communicate(input=pcm)
+            except (BrokenPipeError, OSError) as exc:
+                process.kill()
+                process.wait()
+                stdout, stderr = b"", str(exc).encode("utf-8")
+            if process.returncode == 0 and stdout:
+                return stdout
+            # A process killed from outside while idle is not the input's fault.
+            if process.returncode is not None and process.returncode < 0 and attempt == 0:
+                with self._lock:
+                    self._restarts += 1
+                continue
+            break
+        raise AudioEncodingError(
+            f"ffmpeg failed: {stderr.decode('utf-8', errors='ignore')}"
+        )
+
+    def stats(self) -> FfmpegPoolStats:
+        with self._lock:
+            return FfmpegPoolStats(
+                spawned=self._spawned,
+                spare_hits=self._spare_hits,
+                spare_misses=self._spare_misses,
+                restarts=self._restarts,
+                idle=sum(len(idle) for idle in self._idle.values()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            processes = [process for idle in self._idle.values() for process in idle]
+            self._idle.clear()
+        for process in processes:
+            process.kill()
+            process.wait()
+
+
+_ffmpeg_pool = FfmpegEncoderPool()
+
+
+def get_ffmpeg_pool() -> FfmpegEncoderPool:
+    return _ffmpeg_pool
+
+
+def encode_ogg_opus_ffmpeg(audio: Sequence[float], sample_rate: int, output_path: Path, tmp_dir: Path) -> None:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        data = _ffmpeg_pool.encode(audio, sample_rate)
+    except OSError as exc:
+        raise AudioEncodingError(f"ffmpeg unavailable: {exc}") from exc
+    output_path.write_bytes(data)
+
+
+def encode_to_ogg_opus(
+    audio: Sequence[float],
+    sample_rate: int,
+    output_path: Path,
+    tmp_dir: Path,
+    encoder: str = "auto",
+) -> str:
+    """
+    Encode ``audio`` to OGG/Opus at ``output_path`` and return the backend used.
+
+    ``auto`` prefers the in-process libsndfile encoder and falls back to
+    ffmpeg when libsndfile lacks Opus or fails; ``soundfile`` and ``ffmpeg``
+    force one backend.
+    """
+    if encoder in {"auto", "soundfile"}:
+        if soundfile_opus_available() or encoder == "soundfile":
+            try:
+                encode_ogg_opus_soundfile(audio, sample_rate, output_path)
+                return "soundfile"
+            except AudioEncodingError:
+                if encoder == "soundfile":
+                    raise
+    encode_ogg_opus_ffmpeg(audio, sample_rate, output_path, tmp_dir)
+    return "ffmpeg"
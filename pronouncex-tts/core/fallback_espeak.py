@@ -1,26 +1,188 @@
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from phonemizer import phonemize
+from phonemizer.backend import EspeakBackend
+from phonemizer.separator import default_separator
 
+DEFAULT_LANGUAGE = "en-us"
 
-def phonemize_espeak(text: str, language: str = "en-us") -> Optional[str]:
-    if not text:
-        return None
-    try:
-        phonemes = phonemize(
-            text,
-            language=language,
-            backend="espeak",
-            strip=True,
-            preserve_punctuation=True,
-            with_stress=True,
+BackendKey = Tuple[str, bool, bool]
+
+
+@dataclass
+class EspeakPoolStats:
+    backends: int
+    hits: int
+    misses: int
+    calls: int
+    call_ms: float
+    init_ms: float
+
+    @property
+    def hit_rate(self) -> float:
+        denom = self.hits + self.misses
+        return (self.hits / denom) if denom else 0.0
+
+    @property
+    def avg_call_ms(self) -> float:
+        return (self.call_ms / self.calls) if self.calls else 0.0
+
+
+class EspeakBackendPool:
+    """
+    Process-wide pool of initialized espeak backends.
+
+    Building an EspeakBackend loads the espeak library and voice data, so idle
+    backends are kept per (language, preserve_punctuation, with_stress) and
+    handed out to one caller at a time. Each backend wraps its own copy of the
+    library, which lets the per-job worker threads phonemize concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._idle: Dict[BackendKey, List[EspeakBackend]] = {}
+        self._backends = 0
+        self._hits = 0
+        self._misses = 0
+        self._calls = 0
+        self._call_ms = 0.0
+        self._init_ms = 0.0
+
+    def _create(self, key: BackendKey) -> EspeakBackend:
+        language, preserve_punctuation, with_stress = key
+        start = time.perf_counter()
+        backend = EspeakBackend(
+            language,
+            preserve_punctuation=preserve_punctuation,
+            with_stress=with_stress,
         )
-    except Exception:
-        return None
+        init_ms = (time.perf_counter() - start) * 1000.0
+        with self._lock:
+            self._backends += 1
+            self._init_ms += init_ms
+        return backend
+
+    def _acquire(self, key: BackendKey) -> EspeakBackend:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._hits += 1
+                return idle.pop()
+            self._misses += 1
+        return self._create(key)
+
+    def _release(self, key: BackendKey, backend: EspeakBackend) -> None:
+        with self._lock:
+            self._idle.setdefault(key, []).append(backend)
+
+    def warm(
+        self,
+        language: str = DEFAULT_LANGUAGE,
+        *,
+        count: int = 1,
+        preserve_punctuation: bool = True,
+        with_stress: bool = True,
+    ) -> int:
+        """Make sure at least ``count`` idle backends exist for the given flags."""
+        key = (language, preserve_punctuation, with_stress)
+        with self._lock:
+            missing = max(count - len(self._idle.get(key, [])), 0)
+        for _ in range(missing):
+            self._release(key, self._create(key))
+        return missing
+
+    def phonemize(
+        self,
+        lines: List[str],
+        language: str = DEFAULT_LANGUAGE,
+        *,
+        preserve_punctuation: bool = True,
+        with_stress: bool = True,
+    ) -> List[str]:
+        key = (language, preserve_punctuation, with_stress)
+        backend = self._acquire(key)
+        start = time.perf_counter()
+        try:
+            return backend.phonemize(lines, separator=default_separator, strip=True)
+        finally:
+            call_ms = (time.perf_counter() - start) * 1000.0
+            with self._lock:
+                self._calls += 1
+                self._call_ms += call_ms
+            self._release(key, backend)
+
+    def stats(self) -> EspeakPoolStats:
+        with self._lock:
+            return EspeakPoolStats(
+                backends=self._backends,
+                hits=self._hits,
+                misses=self._misses,
+                calls=self._calls,
+                call_ms=self._call_ms,
+                init_ms=self._init_ms,
+            )
+
+
+_pool = EspeakBackendPool()
+
+
+def get_espeak_pool() -> EspeakBackendPool:
+    return _pool
+
+
+def _normalize(phonemes: Optional[str]) -> Optional[str]:
     if not phonemes:
         return None
     # Normalize whitespace for stable output.
-    return " ".join(phonemes.split())
+    normalized = " ".join(phonemes.split())
+    return normalized or None
+
+
+class EspeakError(RuntimeError):
+    """The espeak backend failed; unlike a ``None`` result, retrying may help."""
+
+
+def phonemize_espeak(
+    text: str, language: str = DEFAULT_LANGUAGE, strict: bool = False
+) -> Optional[str]:
+    """Phonemize one utterance; backend failures raise only when ``strict``."""
+    if not text:
+        return None
+    try:
+        return phonemize_espeak_batch([text], language=language)[0]
+    except EspeakError:
+        if strict:
+            raise
+        return None
+
+
+def phonemize_espeak_batch(
+    texts: Sequence[str], language: str = DEFAULT_LANGUAGE
+) -> List[Optional[str]]:
+    """Phonemize many utterances with a single backend call.
+
+    Results are aligned with ``texts``; entries that are empty or that espeak
+    cannot phonemize come back as ``None``. A failed backend call raises
+    ``EspeakError`` so callers do not mistake it for words without phonemes.
+    """
+    results: List[Optional[str]] = [None] * len(texts)
+    # The backend drops empty lines, so only send non-empty single-line inputs
+    # and remember where each one came from.
+    positions = [idx for idx, text in enumerate(texts) if text and text.strip()]
+    if not positions:
+        return results
+    lines = [" ".join(texts[idx].split()) for idx in positions]
+    try:
+        phonemized = _pool.phonemize(lines, language=language)
+    except Exception as exc:
+        raise EspeakError(f"espeak phonemize failed: {exc}") from exc
+    if len(phonemized) != len(lines):
+        raise EspeakError(f"espeak returned {len(phonemized)} lines for {len(lines)} inputs")
+    for idx, phonemes in zip(positions, phonemized):
+        results[idx] = _normalize(phonemes)
+    return results
 
 
 def lookup_espeak(word: str) -> Optional[str]:
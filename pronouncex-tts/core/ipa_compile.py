@@ -3,6 +3,7 @@ import re
 from pathlib import Path
 from typing import List
 
+from .compiled_dict import compiled_path_for, normalize_entries, write_compiled_pack
 from .config import load_settings
 
 
@@ -35,6 +36,18 @@ def compile_packs(dict_dir: Path, compiled_dir: Path, model_id: str, compiler_ve
         with compiled_path.open("w", encoding="utf-8") as handle:
             json.dump(compiled, handle, ensure_ascii=False, indent=2)
         compiled_paths.append(compiled_path)
+        # Binary twin of the source pack that the resolver mmaps instead of
+        # parsing the JSON; it is keyed to the source file's size and mtime.
+        compiled_paths.append(
+            write_compiled_pack(
+                compiled_path_for(path, compiled_dir),
+                name=name,
+                version=version,
+                entries=normalize_entries(entries),
+                source_path=path,
+                compiler_version=compiler_version,
+            )
+        )
     return compiled_paths
 
 
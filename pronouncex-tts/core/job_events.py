@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL_PREFIX = "px:events:"
+_SUBSCRIBER_QUEUE_SIZE = 1024
+# How long the listener blocks on Redis before picking up channel changes.
+_LISTEN_POLL_SECONDS = 0.1
+
+
+class JobSubscription:
+    """
+    Events for one job, delivered onto the subscriber's event loop.
+
+    Publishers run on worker threads (or the Redis listener thread), so events
+    are handed over with ``call_soon_threadsafe``. A subscriber that falls
+    behind drops its oldest events; the event stream re-reads the job whenever
+    it goes idle and sends the segment changes it missed, so a dropped event
+    only delays its delta until the next keepalive.
+    """
+
+    def __init__(self, bus: "JobEventBus", job_id: str, loop: asyncio.AbstractEventLoop):
+        self.job_id = job_id
+        self._bus = bus
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+
+    def _put(self, event: Dict[str, Any]) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Loop already closed: the request went away without unsubscribing.
+            self._bus.unsubscribe(self)
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Return the next event, or None if none arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            return None
+
+    def drain(self) -> List[Dict[str, Any]]:
+        events = []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+    def __enter__(self) -> "JobSubscription":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "JobSubscription":
+        await self._bus.wait_listening(self.job_id)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class JobEventBus:
+    """
+    Push notifications for job and segment state changes.
+
+    Without Redis, ``publish`` delivers straight to subscribers in this
+    process. With Redis, events go out on ``px:events:{job_id}`` so API
+    processes hear about segments finished by separate workers. Each process
+    runs one listener thread, started on the first local subscription, that
+    subscribes to a job's channel while the job has local subscribers and
+    delivers to them from there.
+    """
+
+    def __init__(self, redis_client: Optional[Any] = None):
+        self._redis = redis_client
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[JobSubscription]] = {}
+        self._listener: Optional[threading.Thread] = None
+        # Channels with local subscribers, and those Redis has confirmed on
+        # the listener's current connection.
+        self._wanted: Set[str] = set()
+        self._live: Set[str] = set()
+        self._live_changed = threading.Condition(self._lock)
+
+    def _channel(self, job_id: str) -> str:
+        return f"{EVENTS_CHANNEL_PREFIX}{job_id}"
+
+    def subscribe(self, job_id: str) -> JobSubscription:
+        subscription = JobSubscription(self, job_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(subscription)
+            if self._redis is not None:
+                self._wanted.add(self._channel(job_id))
+            start_listener = self._redis is not None and self._listener is None
+            if start_listener:
+                self._listener = threading.Thread(
+                    target=self._listen, name="px-job-events", daemon=True
+                )
+        if start_listener:
+            self._listener.start()
+        return subscription
+
+    async def wait_listening(self, job_id: str, timeout: float = 1.0) -> None:
+        """
+        Wait, off the event loop, until Redis confirms ``job_id``'s channel.
+
+        Events published before that are lost; ``async with bus.subscribe(...)``
+        waits here before the caller reads its snapshot.
+        """
+        if self._redis is None:
+            return
+        channel = self._channel(job_id)
+        with self._lock:
+            if channel in self._live:
+                return
+        await asyncio.to_thread(self._wait_live, channel, timeout)
+
+    def _wait_live(self, channel: str, timeout: float) -> None:
+        with self._live_changed:
+            self._live_changed.wait_for(lambda: channel in self._live, timeout=timeout)
+
+    def unsubscribe(self, subscription: JobSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.job_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.job_id, None)
+                self._wanted.discard(self._channel(subscription.job_id))
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, job_id: str, event: Dict[str, Any]) -> None:
+        event = {"job_id": job_id, **event}
+        if self._redis is None:
+            self._dispatch(event)
+            return
+        try:
+            self._redis.publish(self._channel(job_id), json.dumps(event))
+        except Exception:
+            # Notifications are best-effort; pollers and timeouts still
+            # observe the stored state.
+            logger.warning("Failed to publish event for job %s", job_id, exc_info=True)
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(event.get("job_id"), []))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def _listen(self) -> None:
+        while True:
+            pubsub = None
+            subscribed: Set[str] = set()
+            try:
+                pubsub = self._redis.pubsub()
+                while True:
+                    with self._lock:
+                        wanted = set(self._wanted)
+                    if wanted - subscribed:
+                        pubsub.subscribe(*(wanted - subscribed))
+                    if subscribed - wanted:
+                        pubsub.unsubscribe(*(subscribed - wanted))
+                        with self._lock:
+                            self._live -= subscribed - wanted
+                    subscribed = wanted
+                    message = pubsub.get_message(timeout=_LISTEN_POLL_SECONDS)
+                    if not message:
+                        continue
+                    if message.get("type") == "subscribe":
+                        with self._live_changed:
+                            if message["channel"] in subscribed:
+                                self._live.add(message["channel"])
+                                self._live_changed.notify_all()
+                        continue
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        event = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    self._dispatch(event)
+            except Exception:
+                logger.warning("Job event listener disconnected; retrying", exc_info=True)
+                time.sleep(1.0)
+            finally:
+                # Nothing is live until the next connection subscribes again.
+                with self._lock:
+                    self._live.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
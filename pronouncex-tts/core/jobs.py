@@ -1,41 +1,106 @@
+import itertools
 import logging
+import os
 import threading
 import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from dataclasses import dataclass
 from pathlib import Path
-from queue import Queue
-from typing import Any, Callable, Dict, Optional, Tuple
+from queue import PriorityQueue
+from typing import Any, Callable, ContextManager, Dict, Optional, Tuple
 
 from diskcache import Cache
 
 from .cache import SegmentCache
 from .chunking import chunk_text, merge_small_segments
 from .config import Settings
-from .encode import encode_to_ogg_opus
+from .encode import encode_to_ogg_opus, get_ffmpeg_pool
+from .fallback_espeak import get_espeak_pool
+from .job_events import JobEventBus
 from .metrics import Metrics
 from .normalize import normalize_text
-from .resolver import PronunciationResolver
+from .resolver import PronunciationResolver, ResolveResult
 from .synth import Synthesizer
+from .synth_process import ProcessSynthesizer
 from .redis_client import get_redis, set_client_name
-from .redis_queue import RedisJobQueue
-from .redis_store import RedisJobStore
+from .redis_locks import SingleFlight
+from .redis_queue import (
+    DEFAULT_PRIORITY,
+    PRIORITY_CLASSES,
+    RedisJobQueue,
+    RedisSegmentQueue,
+    RedisStreamJobQueue,
+    normalize_priority,
+)
+from .redis_store import RedisHashJobStore, RedisJobStore
 
 logger = logging.getLogger(__name__)
 
+SEGMENT_LEASE_SECONDS = 60
 
-def _encode_with_timing(audio, sample_rate: int, output_path: Path, tmp_dir: Path) -> Dict:
+
+def _encode_with_timing(
+    audio, sample_rate: int, output_path: Path, tmp_dir: Path, encoder: str = "auto"
+) -> Dict:
     start = time.perf_counter()
     try:
-        encode_to_ogg_opus(audio, sample_rate, output_path, tmp_dir)
+        used = encode_to_ogg_opus(audio, sample_rate, output_path, tmp_dir, encoder=encoder)
     except Exception as exc:
         return {
             "ok": False,
             "error": exc,
+            "encoder": None,
             "encode_ms": (time.perf_counter() - start) * 1000.0,
         }
-    return {"ok": True, "error": None, "encode_ms": (time.perf_counter() - start) * 1000.0}
+    return {
+        "ok": True,
+        "error": None,
+        "encoder": used,
+        "encode_ms": (time.perf_counter() - start) * 1000.0,
+    }
+
+
+class EncodeStage:
+    """
+    Bounded hand-off from synthesis threads to the shared encode pool.
+
+    ``submit`` blocks once ``max_pending`` encodes are queued or running, so
+    synthesis runs ahead of encoding by at most that many segments of audio.
+    ``drain`` waits for everything submitted and reports whether any segment
+    ended in error.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, max_pending: int):
+        self._executor = executor
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._futures: list[Future] = []
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[], bool]) -> None:
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._futures.append(future)
+
+    def drain(self) -> bool:
+        with self._lock:
+            futures = list(self._futures)
+        any_errors = False
+        for future in futures:
+            try:
+                if future.result():
+                    any_errors = True
+            except Exception:
+                logger.exception("Segment encode failed")
+                any_errors = True
+        return any_errors
 
 
 @dataclass
@@ -45,6 +110,7 @@ class JobRequest:
     voice_id: Optional[str]
     reading_profile: Dict
     prefer_phonemes: bool
+    priority: str = DEFAULT_PRIORITY
 
 
 class JobLimitError(ValueError):
@@ -70,6 +136,16 @@ class JobStore:
     def get(self, job_id: str) -> Optional[Dict]:
         return self.cache.get(job_id)
 
+    def get_segment(self, job_id: str, segment_id: str) -> Optional[Dict]:
+        # diskcache stores the manifest as one pickle; there is no cheaper read.
+        job = self.get(job_id)
+        if not job:
+            return None
+        return JobManager._find_segment(job, segment_id)
+
+    def exists(self, job_id: str) -> bool:
+        return job_id in self.cache
+
     def set(self, job_id: str, payload: Dict, ttl_seconds: Optional[int] = None) -> None:
         ttl = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
         # expire keeps the jobs directory from growing forever.
@@ -86,16 +162,18 @@ class JobStore:
 
 class LocalJobQueue:
     def __init__(self) -> None:
-        self._queue: Queue[str] = Queue()
+        # (priority rank, arrival order, job_id): FIFO within a priority class.
+        self._queue: PriorityQueue[Tuple[int, int, str]] = PriorityQueue()
+        self._order = itertools.count()
 
-    def enqueue(self, job_id: str) -> None:
-        self._queue.put(job_id)
+    def enqueue(self, job_id: str, priority: str = DEFAULT_PRIORITY) -> None:
+        self._queue.put((PRIORITY_CLASSES.index(priority), next(self._order), job_id))
 
     def dequeue(self, block: bool = True, timeout: int = 5) -> Optional[str]:
         try:
             if block:
-                return self._queue.get(timeout=timeout)
-            return self._queue.get_nowait()
+                return self._queue.get(timeout=timeout)[2]
+            return self._queue.get_nowait()[2]
         except Exception:
             return None
 
@@ -164,18 +242,27 @@ return 1
 
         if store is None:
             if self._redis is not None:
-                store = RedisJobStore(self._redis, settings.jobs_ttl_seconds)
+                store_cls = RedisHashJobStore if settings.job_store_layout == "hash" else RedisJobStore
+                store = store_cls(self._redis, settings.jobs_ttl_seconds)
             else:
                 store = JobStore(settings.jobs_dir, default_ttl_seconds=settings.jobs_ttl_seconds)
         self.jobs = store
 
         if queue is None and self.role in {"all", "api"}:
-            if self._redis is not None:
+            if self._redis is not None and settings.queue_backend == "stream":
+                queue = RedisStreamJobQueue(self._redis, consumer=f"px-{self.role}:{os.getpid()}")
+            elif self._redis is not None:
                 queue = RedisJobQueue(self._redis)
             else:
                 queue = LocalJobQueue()
         self.queue = queue
 
+        self.segment_queue: Optional[RedisSegmentQueue] = None
+        if self._redis is not None and settings.work_unit == "segment":
+            self.segment_queue = RedisSegmentQueue(self._redis)
+
+        self.events = JobEventBus(self._redis)
+        self.flights = SingleFlight(self._redis)
         self.resolver = PronunciationResolver(settings)
         self.cache = SegmentCache(settings.cache_dir, settings.segments_dir)
         self.metrics = Metrics()
@@ -191,8 +278,13 @@ return 1
         self._job_locks_lock = threading.Lock()
 
         self._encode_executor = (
-            ThreadPoolExecutor(max_workers=2) if getattr(settings, "parallel_encode", True) else None
+            ThreadPoolExecutor(max_workers=settings.encode_workers)
+            if getattr(settings, "parallel_encode", True)
+            else None
         )
+        # One spare ffmpeg per encode thread keeps encoder startup off the
+        # segment path when ffmpeg is the backend.
+        get_ffmpeg_pool().size = settings.encode_workers
 
         self._job_executor = None
         if self.role in {"worker", "all"} and self.queue is not None:
@@ -205,10 +297,58 @@ return 1
         self._active_jobs = 0
         self._active_lock = threading.Lock()
         self._synth_call_lock = threading.Lock()
+        self._model_call_locks: Dict[str, threading.Lock] = {}
+
+        if self.role in {"worker", "all"} and settings.synth_executor == "thread":
+            self._apply_synth_thread_budget()
 
+        if settings.phoneme_mode == "espeak":
+            self._warmup_phonemizer()
         if getattr(settings, "warmup_default_model", False):
             self._warmup_default_model()
 
+    def _synth_thread_budget(self) -> int:
+        # torch's intra-op pool is per process, so the budget is split evenly
+        # across the synthesizers that may run at once rather than set per
+        # instance.
+        threads = self.settings.synth_threads
+        if threads <= 0:
+            concurrent = 1 if self.settings.synth_concurrency == "global" else self.settings.max_workers
+            threads = max(1, (os.cpu_count() or 1) // max(1, concurrent))
+        return threads
+
+    def _apply_synth_thread_budget(self) -> None:
+        threads = self._synth_thread_budget()
+        try:
+            import torch
+
+            torch.set_num_threads(threads)
+        except Exception as exc:
+            logger.warning("Could not set torch threads to %s: %s", threads, exc)
+
+    def _synth_guard(self, model_id: str) -> ContextManager:
+        """Serialization around ``synthesize`` beyond the pool's per-instance exclusivity."""
+        mode = self.settings.synth_concurrency
+        if mode == "global":
+            return self._synth_call_lock
+        if mode == "model":
+            with self._synth_lock:
+                lock = self._model_call_locks.get(model_id)
+                if lock is None:
+                    lock = threading.Lock()
+                    self._model_call_locks[model_id] = lock
+            return lock
+        return nullcontext()
+
+    def _warmup_phonemizer(self) -> None:
+        # One idle backend per segment thread so the first segments of the
+        # first job do not pay espeak initialization.
+        count = self.settings.per_job_workers if self.role in {"worker", "all"} else 1
+        try:
+            get_espeak_pool().warm(count=count)
+        except Exception as exc:
+            logger.warning("Phonemizer warmup failed: %s", exc)
+
     def _warmup_default_model(self) -> None:
         try:
             synth = self._acquire_synthesizer(self.settings.model_id, None)
@@ -252,7 +392,13 @@ return 1
 
             self._synth_totals[key] = total + 1
 
-        synth = Synthesizer(model_id, voice_id=voice_id, gpu=self.settings.gpu)
+        try:
+            synth = self._create_synthesizer(model_id, voice_id)
+        except Exception:
+            with self._synth_cond:
+                self._synth_totals[key] = max(self._synth_totals.get(key, 1) - 1, 0)
+                self._synth_cond.notify()
+            raise
         supports = synth.supports_speaker_selection()
         with self._synth_cond:
             self._model_supports_speaker[model_id] = supports
@@ -262,9 +408,25 @@ return 1
                 self._synth_totals[effective_key] = self._synth_totals.get(effective_key, 0) + 1
         return synth
 
+    def _create_synthesizer(self, model_id: str, voice_id: Optional[str]) -> Synthesizer:
+        if self.settings.synth_executor == "process":
+            return ProcessSynthesizer(
+                model_id,
+                voice_id=voice_id,
+                gpu=self.settings.gpu,
+                threads=self._synth_thread_budget(),
+            )
+        return Synthesizer(model_id, voice_id=voice_id, gpu=self.settings.gpu)
+
     def _release_synthesizer(self, synth: Synthesizer) -> None:
         key = (synth.model_id, synth.effective_voice_id())
         with self._synth_cond:
+            if not getattr(synth, "alive", True):
+                # A crashed child process is dropped so the next acquire
+                # starts a fresh one.
+                self._synth_totals[key] = max(self._synth_totals.get(key, 1) - 1, 0)
+                self._synth_cond.notify()
+                return
             pool = self._synth_pool.setdefault(key, [])
             pool.append(synth)
             self._synth_cond.notify()
@@ -333,7 +495,7 @@ return 1
             return 0
         if isinstance(self.queue, RedisJobQueue) and self._redis is not None:
             try:
-                return int(self._redis.llen(self.queue.queue_key))
+                return self.queue.size()
             except Exception:
                 return 0
         if hasattr(self.queue, "size"):
@@ -343,6 +505,14 @@ return 1
                 return 0
         return 0
 
+    def segment_queue_length(self) -> int:
+        if self.segment_queue is None:
+            return 0
+        try:
+            return self.segment_queue.size()
+        except Exception:
+            return 0
+
     def active_jobs(self) -> int:
         if self._redis is None:
             with self._active_lock:
@@ -402,6 +572,7 @@ return 1
         return {
             "workers_online": self.workers_online(),
             "queue_len": self.queue_length(),
+            "segment_queue_len": self.segment_queue_length(),
             "active_jobs": self.active_jobs(),
             "retry_counts": {
                 "segment_retries": metrics.segment_retries,
@@ -414,6 +585,16 @@ return 1
                 "wait_max_ms": round(metrics.merge_lock_wait_max_ms, 3),
             },
             "stale_queued_cancels": metrics.stale_queued_cancels,
+            "cache_key_churn": {
+                "churned": metrics.cache_keys_churned,
+                "rate": round(metrics.cache_key_churn_rate, 3),
+            },
+            "espeak_pool": {
+                "backends": metrics.espeak_backends,
+                "hit_rate": round(metrics.espeak_pool_hit_rate, 3),
+                "calls": metrics.espeak_calls,
+                "avg_call_ms": round(metrics.espeak_avg_call_ms, 3),
+            },
         }
 
     def submit(self, request: JobRequest) -> Dict:
@@ -427,6 +608,7 @@ return 1
                 413,
                 f"text too long: {len(request.text)} > {self.settings.max_text_chars}",
             )
+        priority = normalize_priority(request.priority)
         if self.settings.require_workers and self._redis is not None:
             if self._workers_online() == 0:
                 raise JobLimitError(503, "no workers online")
@@ -458,18 +640,31 @@ return 1
             self._release_synthesizer(synthesizer)
 
         manifest_segments = []
+        key_churned = 0
         for index, segment_text in enumerate(segments):
             segment_id = uuid.uuid4().hex
 
             seg_norm = normalize_text(segment_text)
 
+            dict_fingerprint = None
+            segment_dict_versions = dict_versions_base
+            if self.settings.cache_key_dict_scope == "segment":
+                # Key on the entries this segment can use rather than on every
+                # pack version, so unrelated dictionary edits keep it warm.
+                dict_fingerprint = self.resolver.segment_fingerprint(segment_text)
+                segment_dict_versions = {"entries": dict_fingerprint}
+
             cache_key = self.cache.build_key(
                 seg_norm,
                 request.model_id,
                 effective_voice_id,
-                dict_versions_base,
+                segment_dict_versions,
                 self.settings.compiler_version,
             )
+            lineage_key = self.cache.build_lineage_key(
+                seg_norm, request.model_id, effective_voice_id, self.settings.compiler_version
+            )
+            key_churned += int(self.cache.swap_lineage(lineage_key, cache_key))
 
             manifest_segments.append(
                 {
@@ -479,9 +674,25 @@ return 1
                     "normalized_text": seg_norm,
                     "status": "queued",
                     "cache_key": cache_key,
+                    "dict_fingerprint": dict_fingerprint,
                     "attempts": 0,
                 }
             )
+        self.metrics.record_cache_keys(total=len(manifest_segments), churned=key_churned)
+
+        # Segments already in the cache are ready before any worker sees the
+        # job; only the misses are queued.
+        hits = self.cache.get_many(segment["cache_key"] for segment in manifest_segments)
+        hit_ids = []
+        for segment in manifest_segments:
+            cached_path = hits.get(segment["cache_key"])
+            if cached_path:
+                duration_ms = self.cache.get_duration_ms(segment["cache_key"])
+                self._apply_cache_hit(segment, cached_path, duration_ms)
+                hit_ids.append(segment["segment_id"])
+        pending_ids = [
+            segment["segment_id"] for segment in manifest_segments if segment["status"] != "ready"
+        ]
 
         job_id = uuid.uuid4().hex
         base_url = self.settings.public_segment_base_url
@@ -502,23 +713,42 @@ return 1
             "voice_id": request.voice_id,
             "reading_profile": request.reading_profile,
             "prefer_phonemes": request.prefer_phonemes,
+            "priority": priority,
             "dict_versions": dict_versions_base,
             "chars_total": chars_total,
-            "cache_hit_count": 0,
+            "cache_hit_count": len(hit_ids),
             "cache_miss_count": 0,
             "phoneme_segment_count": 0,
             "used_phoneme_segment_count": 0,
             "error_segment_count": 0,
             "segments": manifest_segments,
         }
+        if self.segment_queue is not None:
+            job_payload["work_unit"] = "segment"
+            job_payload["enqueued_at"] = created_at
+        first_audio = self._mark_first_audio(job_payload) if hit_ids else {}
         self._increment_active_job(job_id)
         try:
             self.jobs.set(job_id, job_payload)
-            if self.queue is not None:
-                self.queue.enqueue(job_id)
+            if pending_ids and self.segment_queue is not None:
+                self.segment_queue.enqueue_job(
+                    job_id,
+                    pending_ids,
+                    self.settings.jobs_ttl_seconds,
+                    priority=priority,
+                    head_count=self.settings.priority_head_segments,
+                    done_ids=hit_ids,
+                )
+            elif pending_ids and self.queue is not None:
+                self.queue.enqueue(job_id, priority=priority)
         except Exception:
             self._decrement_active_job(job_id)
             raise
+        self._record_first_audio(first_audio, job_payload)
+        if not pending_ids:
+            # Fully cached: finish here instead of a queue round-trip.
+            self._complete_job(job_id, time.time() - created_at, any_errors=False)
+            return self.jobs.get(job_id) or job_payload
         return job_payload
 
     def cancel_job(self, job_id: str) -> Optional[Dict]:
@@ -547,15 +777,18 @@ return 1
         return job
 
     def _worker_loop(self) -> None:
+        if self.segment_queue is not None:
+            self.run_segment_workers(f"px-all:{os.getpid()}")
+            return
         while True:
             job_id = self.queue.dequeue(block=True, timeout=5) if self.queue else None
             if not job_id:
                 continue
             try:
                 if self._job_executor is None:
-                    self._process_job(job_id)
+                    self.process_queued_job(job_id)
                 else:
-                    self._job_executor.submit(self._process_job, job_id)
+                    self._job_executor.submit(self.process_queued_job, job_id)
             finally:
                 if hasattr(self.queue, "task_done"):
                     self.queue.task_done()
@@ -564,21 +797,69 @@ return 1
         job["updated_at"] = time.time()
 
     def _update_job(self, job_id: str, update_fn: Callable[[Dict], None]) -> Optional[Dict]:
+        event: Dict[str, Any] = {}
+
         def wrapped(target: Dict) -> None:
+            event.clear()
+            before = target.get("status")
             update_fn(target)
             self._touch(target)
+            if target.get("status") != before:
+                event.update({"type": "job", "status": target.get("status")})
 
         if isinstance(self.jobs, RedisJobStore):
-            return self.jobs.update(job_id, wrapped)
+            job = self.jobs.update(job_id, wrapped)
+        else:
+            lock = self._get_job_lock(job_id)
+            with lock:
+                job = self.jobs.get(job_id)
+                if not job:
+                    return None
+                wrapped(job)
+                self.jobs.set(job_id, job)
+        if job is not None and event:
+            self.events.publish(job_id, event)
+        return job
 
-        lock = self._get_job_lock(job_id)
-        with lock:
-            job = self.jobs.get(job_id)
-            if not job:
-                return None
-            wrapped(job)
-            self.jobs.set(job_id, job)
-            return job
+    @staticmethod
+    def _segment_event(seg: Dict) -> Dict[str, Any]:
+        return {
+            "type": "segment",
+            "segment_id": seg.get("segment_id"),
+            "index": seg.get("index"),
+            "status": seg.get("status"),
+            "duration_ms": seg.get("duration_ms"),
+        }
+
+    def _update_segment(
+        self, job_id: str, segment_id: str, update_fn: Callable[[Dict], None]
+    ) -> Optional[Dict]:
+        """
+        Like ``_update_job`` for mutations scoped to one segment plus job
+        counters. Publishes a segment event when the segment's status changes.
+        """
+        event: Dict[str, Any] = {}
+
+        def tracked(target: Dict) -> None:
+            event.clear()
+            seg = self._find_segment(target, segment_id)
+            before = seg.get("status") if seg else None
+            update_fn(target)
+            seg = self._find_segment(target, segment_id)
+            if seg and seg.get("status") != before:
+                event.update(self._segment_event(seg))
+
+        if isinstance(self.jobs, RedisHashJobStore):
+            def wrapped(target: Dict) -> None:
+                tracked(target)
+                self._touch(target)
+
+            job = self.jobs.update_segment(job_id, segment_id, wrapped)
+        else:
+            job = self._update_job(job_id, tracked)
+        if job is not None and event:
+            self.events.publish(job_id, event)
+        return job
 
     @staticmethod
     def _find_segment(job: Dict, segment_id: str) -> Optional[Dict]:
@@ -587,6 +868,10 @@ return 1
                 return segment
         return None
 
+    def get_segment(self, job_id: str, segment_id: str) -> Optional[Dict]:
+        """Read one segment through the store's segment index, without the manifest."""
+        return self.jobs.get_segment(job_id, segment_id)
+
     @staticmethod
     def _job_is_canceled(job: Dict) -> bool:
         return job.get("status") == "canceled"
@@ -624,6 +909,8 @@ return 1
         model_id: str,
         voice_id: Optional[str],
         prefer_phonemes: bool,
+        prepared_resolve: Optional[Tuple[ResolveResult, float]] = None,
+        encode_stage: Optional["EncodeStage"] = None,
     ) -> bool:
         job = self.jobs.get(job_id)
         if not job:
@@ -638,35 +925,85 @@ return 1
             return False
 
         cache_key = segment["cache_key"]
-        segment_text = segment["text"]
         segment_start = time.perf_counter()
 
         cached_path = self.cache.get(cache_key)
+        leading = False
+        coalesce_seconds = self.settings.synth_coalesce_seconds
+        if not cached_path and coalesce_seconds > 0:
+            wait_start = time.perf_counter()
+            leading = self.flights.acquire(cache_key, timeout=coalesce_seconds)
+            # Re-check either way: the previous flight may have just finished,
+            # and a hit here is coalesced even if it finished before we waited.
+            cached_path = self.cache.get(cache_key)
+            if cached_path:
+                self.metrics.record_coalesced((time.perf_counter() - wait_start) * 1000.0)
+                if leading:
+                    self.flights.release(cache_key)
+                    leading = False
+
         if cached_path:
             def mark_cached(target: Dict) -> None:
+                first_audio.clear()
                 seg = self._find_segment(target, segment_id)
                 if not seg:
                     return
-                seg["status"] = "ready"
-                seg["path"] = str(cached_path)
-                seg["started_at"] = None
-                seg["timing_resolve_ms"] = 0.0
-                seg["timing_synth_ms"] = 0.0
-                seg["timing_encode_ms"] = 0.0
-                seg["timing_total_ms"] = 0.0
-                seg["timing_ms"] = {
-                    "resolve_ms": 0.0,
-                    "synth_ms": 0.0,
-                    "encode_ms": 0.0,
-                    "total_ms": 0.0,
-                }
-                seg["resolved_phonemes"] = None
-                seg["used_phonemes"] = None
+                self._apply_cache_hit(seg, cached_path, cached_duration_ms)
                 target["cache_hit_count"] = target.get("cache_hit_count", 0) + 1
+                first_audio.update(self._mark_first_audio(target))
 
-            self._update_job(job_id, mark_cached)
+            first_audio: Dict[str, Any] = {}
+            cached_duration_ms = self.cache.get_duration_ms(cache_key)
+            job = self._update_segment(job_id, segment_id, mark_cached)
+            self._record_first_audio(first_audio, job)
             return False
 
+        flight_open = leading
+
+        def release_flight() -> None:
+            # Waiters wake on release, so it must follow the cache write.
+            nonlocal flight_open
+            if flight_open:
+                flight_open = False
+                self.flights.release(cache_key)
+
+        handed_off = False
+        try:
+            result = self._synthesize_segment(
+                job_id,
+                segment_id,
+                segment,
+                model_id,
+                voice_id,
+                prefer_phonemes,
+                segment_start,
+                prepared_resolve,
+                encode_stage,
+                release_flight,
+            )
+            # With an encode stage, False means finish() was queued and will
+            # release the flight itself.
+            handed_off = encode_stage is not None and not result
+            return result
+        finally:
+            if not handed_off:
+                release_flight()
+
+    def _synthesize_segment(
+        self,
+        job_id: str,
+        segment_id: str,
+        segment: Dict,
+        model_id: str,
+        voice_id: Optional[str],
+        prefer_phonemes: bool,
+        segment_start: float,
+        prepared_resolve: Optional[Tuple[ResolveResult, float]],
+        encode_stage: Optional["EncodeStage"],
+        release_flight: Callable[[], None],
+    ) -> bool:
+        cache_key = segment["cache_key"]
+        segment_text = segment["text"]
         max_attempts = self.settings.segment_max_retries + 1
         allow_attempt = True
 
@@ -693,13 +1030,16 @@ return 1
             seg["started_at"] = time.time()
             target["cache_miss_count"] = target.get("cache_miss_count", 0) + 1
 
-        self._update_job(job_id, mark_attempt)
+        self._update_segment(job_id, segment_id, mark_attempt)
         if not allow_attempt:
             return True
 
-        resolve_start = time.perf_counter()
-        resolve_result = self.resolver.resolve_text(segment_text)
-        resolve_ms = (time.perf_counter() - resolve_start) * 1000.0
+        if prepared_resolve is not None:
+            resolve_result, resolve_ms = prepared_resolve
+        else:
+            resolve_start = time.perf_counter()
+            resolve_result = self.resolver.resolve_text(segment_text)
+            resolve_ms = (time.perf_counter() - resolve_start) * 1000.0
         phoneme_text = resolve_result.phoneme_text if prefer_phonemes else None
         resolved_phonemes = phoneme_text if prefer_phonemes else None
 
@@ -707,34 +1047,23 @@ return 1
             text = (message or "").splitlines()[0]
             return text[:160]
 
-        def _synth_and_encode(target_model_id: str):
+        def _synthesize(target_model_id: str):
             synth = self._acquire_synthesizer(target_model_id, voice_id)
             try:
-                with self._synth_call_lock:
+                with self._synth_guard(target_model_id):
                     synth_start = time.perf_counter()
                     audio, sample_rate, used_phonemes = synth.synthesize(segment_text, phoneme_text)
                     synth_ms = (time.perf_counter() - synth_start) * 1000.0
             finally:
                 self._release_synthesizer(synth)
-
-            output_path = self.cache.get_segment_path(cache_key)
-            if self._encode_executor is not None:
-                encode_future = self._encode_executor.submit(
-                    _encode_with_timing, audio, sample_rate, output_path, self.settings.tmp_dir
-                )
-                encode_result = encode_future.result()
-            else:
-                encode_result = _encode_with_timing(
-                    audio, sample_rate, output_path, self.settings.tmp_dir
-                )
-            return used_phonemes, synth_ms, encode_result, output_path
+            return audio, sample_rate, used_phonemes, synth_ms
 
         attempted_models = [model_id]
         fallback_used = False
         cache_ok = True
 
         try:
-            used_phonemes, synth_ms, encode_result, output_path = _synth_and_encode(model_id)
+            audio, sample_rate, used_phonemes, synth_ms = _synthesize(model_id)
         except Exception as exc:
             error_message = str(exc)
             if (
@@ -757,9 +1086,7 @@ return 1
                     segment_id,
                 )
                 try:
-                    used_phonemes, synth_ms, encode_result, output_path = _synth_and_encode(
-                        fallback_model
-                    )
+                    audio, sample_rate, used_phonemes, synth_ms = _synthesize(fallback_model)
                     fallback_used = True
                     cache_ok = False
                     logger.info(
@@ -797,9 +1124,11 @@ return 1
                         seg["resolved_phonemes"] = resolved_phonemes
                         if resolve_result.source_counts:
                             seg["resolve_source_counts"] = resolve_result.source_counts
+                        seg["resolve_espeak_words"] = resolve_result.espeak_words
+                        seg["resolve_espeak_calls"] = resolve_result.espeak_calls
                         target["error_segment_count"] = target.get("error_segment_count", 0) + 1
 
-                    self._update_job(job_id, mark_error)
+                    self._update_segment(job_id, segment_id, mark_error)
                     return True
             else:
                 total_ms = (time.perf_counter() - segment_start) * 1000.0
@@ -825,15 +1154,124 @@ return 1
                     seg["resolved_phonemes"] = resolved_phonemes
                     if resolve_result.source_counts:
                         seg["resolve_source_counts"] = resolve_result.source_counts
+                    seg["resolve_espeak_words"] = resolve_result.espeak_words
+                    seg["resolve_espeak_calls"] = resolve_result.espeak_calls
                     target["error_segment_count"] = target.get("error_segment_count", 0) + 1
 
-                self._update_job(job_id, mark_error)
+                self._update_segment(job_id, segment_id, mark_error)
                 return True
 
+        def finish() -> bool:
+            try:
+                return encode_and_finish()
+            finally:
+                release_flight()
+
+        def encode_and_finish() -> bool:
+            output_path = self.cache.get_segment_path(cache_key)
+            encode_result = _encode_with_timing(
+                audio, sample_rate, output_path, self.settings.tmp_dir, self.settings.audio_encoder
+            )
+            if encode_result.get("encoder"):
+                self.metrics.record_encode(encode_result["encoder"], encode_result["encode_ms"])
+            return self._finish_segment(
+                job_id,
+                segment_id,
+                cache_key=cache_key,
+                output_path=output_path,
+                encode_result=encode_result,
+                segment_start=segment_start,
+                resolve_ms=resolve_ms,
+                synth_ms=synth_ms,
+                resolve_result=resolve_result,
+                resolved_phonemes=resolved_phonemes,
+                used_phonemes=used_phonemes,
+                duration_ms=round(len(audio) / sample_rate * 1000.0, 3) if sample_rate else None,
+                attempted_models=attempted_models,
+                fallback_used=fallback_used,
+                cache_ok=cache_ok,
+            )
+
+        if encode_stage is not None:
+            # Hand the audio to the encode pool so this thread can start
+            # synthesizing the next segment.
+            encode_stage.submit(finish)
+            return False
+        return finish()
+
+    @staticmethod
+    def _apply_cache_hit(seg: Dict, cached_path: Path, duration_ms: Optional[float]) -> None:
+        seg["status"] = "ready"
+        seg["path"] = str(cached_path)
+        seg["started_at"] = None
+        seg["timing_resolve_ms"] = 0.0
+        seg["timing_synth_ms"] = 0.0
+        seg["timing_encode_ms"] = 0.0
+        seg["timing_total_ms"] = 0.0
+        seg["timing_ms"] = {
+            "resolve_ms": 0.0,
+            "synth_ms": 0.0,
+            "encode_ms": 0.0,
+            "total_ms": 0.0,
+        }
+        seg["resolved_phonemes"] = None
+        seg["used_phonemes"] = None
+        if duration_ms is not None:
+            seg["duration_ms"] = duration_ms
+
+    @staticmethod
+    def _mark_first_audio(target: Dict) -> Dict[str, Any]:
+        """Stamp time-to-first-audio on the job the first time a segment is ready."""
+        if target.get("first_audio_at"):
+            return {}
+        now = time.time()
+        created_at = float(target.get("created_at") or now)
+        target["first_audio_at"] = now
+        target["ttfa_ms"] = round((now - created_at) * 1000.0, 3)
+        return {
+            "priority": target.get("priority", DEFAULT_PRIORITY),
+            "first_audio_at": now,
+            "ttfa_ms": target["ttfa_ms"],
+        }
+
+    def _record_first_audio(self, first_audio: Dict[str, Any], job: Optional[Dict]) -> None:
+        """
+        Count TTFA in this process's metrics if its stamp is the one stored.
+
+        Recorded after the update so a retried store mutation counts once, and
+        only when ``job`` (the store's result) carries this stamp: segments of
+        one job finishing together in different workers each stamp it, but
+        the hash store keeps the first. The samples are per process, like the
+        rest of ``/v1/metrics``; the stored ``ttfa_ms`` on each manifest is
+        the cross-process record.
+        """
+        if first_audio and job and job.get("first_audio_at") == first_audio["first_audio_at"]:
+            self.metrics.record_ttfa(first_audio["priority"], first_audio["ttfa_ms"])
+
+    def _finish_segment(
+        self,
+        job_id: str,
+        segment_id: str,
+        *,
+        cache_key: str,
+        output_path: Path,
+        encode_result: Dict,
+        segment_start: float,
+        resolve_ms: float,
+        synth_ms: float,
+        resolve_result: ResolveResult,
+        resolved_phonemes: Optional[str],
+        used_phonemes: bool,
+        duration_ms: Optional[float],
+        attempted_models: list[str],
+        fallback_used: bool,
+        cache_ok: bool,
+    ) -> bool:
         encode_ms = encode_result["encode_ms"]
         total_ms = (time.perf_counter() - segment_start) * 1000.0
 
         def mark_done(target: Dict) -> None:
+            first_audio.clear()
             seg = self._find_segment(target, segment_id)
             if not seg:
                 return
@@ -851,7 +1289,11 @@ return 1
             seg["resolved_phonemes"] = resolved_phonemes
             if resolve_result.source_counts:
                 seg["resolve_source_counts"] = resolve_result.source_counts
+            seg["resolve_espeak_words"] = resolve_result.espeak_words
+            seg["resolve_espeak_calls"] = resolve_result.espeak_calls
             seg["used_phonemes"] = used_phonemes
+            if encode_result.get("encoder"):
+                seg["encoder"] = encode_result["encoder"]
             if fallback_used:
                 seg["attempted_models"] = attempted_models
                 seg["fallback_used"] = True
@@ -859,9 +1301,12 @@ return 1
 
             if encode_result["ok"]:
                 if cache_ok:
-                    self.cache.set(cache_key, output_path)
+                    self.cache.set(cache_key, output_path, duration_ms=duration_ms)
                 seg["status"] = "ready"
                 seg["path"] = str(output_path)
+                if duration_ms is not None:
+                    seg["duration_ms"] = duration_ms
+                first_audio.update(self._mark_first_audio(target))
             else:
                 seg["status"] = "error"
                 seg["error"] = str(encode_result["error"])
@@ -877,21 +1322,38 @@ return 1
                     target.get("used_phoneme_segment_count", 0) + 1
                 )
 
-        self._update_job(job_id, mark_done)
+        first_audio: Dict[str, Any] = {}
+        job = self._update_segment(job_id, segment_id, mark_done)
+        self._record_first_audio(first_audio, job)
 
         logger.info(
             "segment timing job_id=%s segment_id=%s resolve_ms=%.3f synth_ms=%.3f "
-            "encode_ms=%.3f total_ms=%.3f",
+            "encode_ms=%.3f encoder=%s total_ms=%.3f",
             job_id,
             segment_id,
             resolve_ms,
             synth_ms,
             encode_ms,
+            encode_result.get("encoder"),
             total_ms,
         )
 
         return not encode_result["ok"]
 
+    def _resolve_job_segments(
+        self, segments: list[Dict]
+    ) -> Dict[str, Tuple[ResolveResult, float]]:
+        # Cached segments never reach the resolver, so leave them out of the batch.
+        pending = [seg for seg in segments if not self.cache.get(seg["cache_key"])]
+        if not pending:
+            return {}
+        resolve_start = time.perf_counter()
+        results = self.resolver.resolve_texts([seg["text"] for seg in pending])
+        share_ms = (time.perf_counter() - resolve_start) * 1000.0 / len(pending)
+        return {
+            seg["segment_id"]: (result, share_ms) for seg, result in zip(pending, results)
+        }
+
     def _process_job(self, job_id: str) -> None:
         job = self.jobs.get(job_id)
         if not job:
@@ -935,10 +1397,18 @@ return 1
             for segment in job.get("segments", [])
             if segment.get("status") not in {"ready", "error", "canceled"}
         ]
+        prepared: Dict[str, Tuple[ResolveResult, float]] = {}
+        if self.settings.resolve_batch_scope == "job":
+            prepared = self._resolve_job_segments(segments)
+        encode_stage = None
+        if self._encode_executor is not None:
+            encode_stage = EncodeStage(self._encode_executor, 2 * self.settings.encode_workers)
         if self.settings.per_job_workers <= 1:
             for segment in segments:
                 latest = self.jobs.get(job_id)
                 if latest and self._job_is_canceled(latest):
+                    if encode_stage is not None:
+                        encode_stage.drain()
                     self._release_active_job_if_needed(job_id, latest)
                     return
                 if self._process_segment(
@@ -947,6 +1417,8 @@ return 1
                     model_id,
                     voice_id,
                     prefer_phonemes,
+                    prepared.get(segment["segment_id"]),
+                    encode_stage,
                 ):
                     any_errors = True
         else:
@@ -961,6 +1433,8 @@ return 1
                             model_id,
                             voice_id,
                             prefer_phonemes,
+                            prepared.get(segment["segment_id"]),
+                            encode_stage,
                         )
                     )
 
@@ -970,9 +1444,13 @@ return 1
                             any_errors = True
                     except Exception:
                         any_errors = True
+        if encode_stage is not None and encode_stage.drain():
+            any_errors = True
 
         job_duration_sec = time.perf_counter() - job_start
+        self._complete_job(job_id, job_duration_sec, any_errors)
 
+    def _complete_job(self, job_id: str, job_duration_sec: float, any_errors: bool) -> None:
         latest = self.jobs.get(job_id)
         if not latest:
             return
@@ -987,6 +1465,11 @@ return 1
             target["chars_per_sec"] = round(
                 (chars_total / job_duration_sec) if job_duration_sec else 0.0, 3
             )
+            target["resolve_batch_scope"] = self.settings.resolve_batch_scope
+            target["timing_resolve_ms"] = round(
+                sum(float(seg.get("timing_resolve_ms") or 0.0) for seg in target.get("segments", [])),
+                3,
+            )
 
         job = self._update_job(job_id, mark_complete)
         if job and not job.get("active_job_released"):
@@ -1004,6 +1487,156 @@ return 1
     def process_job(self, job_id: str) -> None:
         self._process_job(job_id)
 
+    def process_queued_job(self, job_id: str, queue: Optional[object] = None) -> None:
+        """Process a dequeued job, keeping its stream entry alive and acking it when done."""
+        queue = queue if queue is not None else self.queue
+        touch = getattr(queue, "touch", None)
+        stop_event = threading.Event()
+        if touch is not None:
+
+            def _touch() -> None:
+                while not stop_event.wait(20):
+                    try:
+                        touch(job_id)
+                    except Exception:
+                        logger.warning("Failed to refresh queue entry for job %s", job_id)
+
+            threading.Thread(target=_touch, daemon=True).start()
+        try:
+            self._process_job(job_id)
+        finally:
+            stop_event.set()
+        # Not acked on failure: the entry is redelivered once it goes idle.
+        ack = getattr(queue, "ack", None)
+        if ack is not None:
+            ack(job_id)
+
+    def process_segment_task(self, job_id: str, segment_id: str, worker_id: str) -> None:
+        """Claim and process one segment of a fanned-out job."""
+        if self._redis is None or self.segment_queue is None:
+            raise RuntimeError("segment tasks require Redis and work_unit=segment")
+        claim_key = f"px:claim:{job_id}:{segment_id}"
+        if not self._redis.set(claim_key, worker_id, ex=SEGMENT_LEASE_SECONDS, nx=True):
+            return
+
+        stop_event = threading.Event()
+
+        def _refresh_claim() -> None:
+            # A failed refresh is retried on the next tick, well inside the lease.
+            while not stop_event.wait(SEGMENT_LEASE_SECONDS / 3):
+                try:
+                    self._redis.set(claim_key, worker_id, ex=SEGMENT_LEASE_SECONDS)
+                except Exception:
+                    logger.warning("Failed to refresh claim %s; retrying", claim_key, exc_info=True)
+
+        threading.Thread(target=_refresh_claim, daemon=True).start()
+        try:
+            job = self.jobs.get(job_id)
+            if not job:
+                return
+
+            def mark_in_progress(target: Dict) -> None:
+                if target.get("status") == "queued":
+                    target["status"] = "in_progress"
+                target.setdefault("processing_started_at", time.time())
+
+            if not self._job_is_canceled(job):
+                job = self._update_job(job_id, mark_in_progress) or job
+                self._process_segment(
+                    job_id,
+                    segment_id,
+                    job.get("model_id", self.settings.model_id),
+                    job.get("voice_id"),
+                    bool(job.get("prefer_phonemes", True)),
+                )
+        except Exception as exc:
+            error = str(exc)
+
+            def mark_failed(target: Dict) -> None:
+                seg = self._find_segment(target, segment_id)
+                if not seg or seg.get("status") in {"ready", "error", "canceled"}:
+                    return
+                seg["status"] = "error"
+                seg["error"] = error
+                seg["error_code"] = "segment_task_failed"
+                target["error_segment_count"] = target.get("error_segment_count", 0) + 1
+
+            self._update_segment(job_id, segment_id, mark_failed)
+            raise
+        finally:
+            # Count the segment even if it failed so the job still finalizes.
+            stop_event.set()
+            self._redis.delete(claim_key)
+            remaining = self.segment_queue.mark_done(
+                job_id, segment_id, self.settings.jobs_ttl_seconds
+            )
+            if remaining == 0:
+                self._finalize_segment_job(job_id)
+
+    def _finalize_segment_job(self, job_id: str) -> None:
+        job = self.jobs.get(job_id)
+        if not job:
+            return
+        started_at = float(job.get("processing_started_at") or job.get("created_at") or time.time())
+        any_errors = int(job.get("error_segment_count", 0)) > 0
+        self._complete_job(job_id, max(time.time() - started_at, 0.0), any_errors)
+
+    def requeue_stalled_segments(self, job: Dict) -> int:
+        """
+        Re-enqueue unfinished, unclaimed segments of a job that stopped progressing.
+
+        A job no worker has started is still ``queued`` and is measured from
+        when its segments were last enqueued; a started job from its last
+        update, which every segment claim makes.
+        """
+        if self._redis is None or self.segment_queue is None:
+            return 0
+        job_id = job.get("job_id")
+        status = job.get("status")
+        if not job_id or status not in {"queued", "in_progress"}:
+            return 0
+        since_field = "enqueued_at" if status == "queued" else "updated_at"
+        since = float(job.get(since_field) or job.get("created_at") or 0)
+        if time.time() - since < self.settings.segment_stale_seconds:
+            return 0
+        if not self._redis.set(
+            f"px:requeue:{job_id}", "1", ex=self.settings.segment_stale_seconds, nx=True
+        ):
+            return 0
+        done = self.segment_queue.done_ids(job_id)
+        pending = [
+            seg["segment_id"]
+            for seg in job.get("segments", [])
+            if seg["segment_id"] not in done
+            and not self._redis.exists(f"px:claim:{job_id}:{seg['segment_id']}")
+        ]
+        self.segment_queue.enqueue(job_id, pending, priority=job.get("priority", DEFAULT_PRIORITY))
+        if status == "queued":
+            self._update_job(job_id, lambda target: target.update(enqueued_at=time.time()))
+        return len(pending)
+
+    def run_segment_workers(self, worker_id: str) -> None:
+        """Consume segment tasks on ``per_job_workers`` threads; blocks forever."""
+        if self.segment_queue is None:
+            raise RuntimeError("segment workers require Redis and work_unit=segment")
+
+        def _consume(consumer_id: str) -> None:
+            while True:
+                task = self.segment_queue.dequeue(block=True, timeout=5)
+                if not task:
+                    continue
+                job_id, segment_id = task
+                try:
+                    self.process_segment_task(job_id, segment_id, consumer_id)
+                except Exception:
+                    logger.exception("Segment task failed job=%s seg=%s", job_id, segment_id)
+
+        for index in range(1, self.settings.per_job_workers):
+            threading.Thread(
+                target=_consume, args=(f"{worker_id}:{index}",), daemon=True
+            ).start()
+        _consume(f"{worker_id}:0")
+
 
 _job_manager: Optional[JobManager] = None
 
@@ -1,10 +1,88 @@
 import json
+import os
 import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Optional
+from typing import BinaryIO, Dict, Optional, Tuple
+
+from .redis_locks import file_lock
+
+# Compact once the journal holds more lines than this or than live entries,
+# whichever is larger, so replay stays cheap without rewriting on every flush.
+COMPACT_MIN_JOURNAL_LINES = 500
+# Several processes may share the files; a flush that cannot get the lock in
+# time keeps its entries pending for the next one.
+FILE_LOCK_TIMEOUT_SECONDS = 5.0
+
+
+def journal_path_for(autolearn_path: Path) -> Path:
+    return autolearn_path.with_name(f"{autolearn_path.stem}.journal.jsonl")
+
+
+def load_autolearn_entries(
+    autolearn_path: Path,
+) -> Tuple[Optional[str], Dict[str, object], int]:
+    """Read the compacted snapshot and replay the journal on top of it.
+
+    Returns ``(version, raw entries, journal line count)``; entries keep whatever
+    shape they were stored in so callers can normalize them.
+    """
+    version: Optional[str] = None
+    entries: Dict[str, object] = {}
+    if autolearn_path.exists():
+        try:
+            payload = json.loads(autolearn_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            payload = {}
+        if isinstance(payload.get("version"), str) and payload["version"].strip():
+            version = payload["version"].strip()
+        if isinstance(payload.get("entries"), dict):
+            entries.update(payload["entries"])
+
+    journal_lines = 0
+    journal_path = journal_path_for(autolearn_path)
+    if journal_path.exists():
+        try:
+            lines = journal_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-append; everything before it is intact.
+                continue
+            key = record.pop("key", None)
+            record_version = record.pop("version", None)
+            if not key:
+                continue
+            journal_lines += 1
+            entries[str(key)] = record
+            if record_version:
+                version = str(record_version)
+    return version, entries, journal_lines
+
+
+def _truncate_torn_tail(handle: BinaryIO) -> None:
+    """Drop a partial last line left by a crash so the next append starts clean."""
+    end = handle.seek(0, os.SEEK_END)
+    if end == 0:
+        return
+    handle.seek(end - 1)
+    if handle.read(1) == b"\n":
+        return
+    pos = end
+    while pos > 0:
+        step = min(4096, pos)
+        handle.seek(pos - step)
+        newline = handle.read(step).rfind(b"\n")
+        if newline != -1:
+            handle.truncate(pos - step + newline + 1)
+            return
+        pos -= step
+    handle.truncate(0)
 
 
 @dataclass
@@ -18,31 +96,30 @@ class AutoLearnPack:
 class DictLearner:
     def __init__(self, autolearn_path: Path, flush_seconds: int = 5):
         self.autolearn_path = autolearn_path
+        self.journal_path = journal_path_for(autolearn_path)
+        self.lock_path = autolearn_path.with_name(f"{autolearn_path.stem}.lock")
         self.flush_seconds = max(1, flush_seconds)
         self._lock = threading.Lock()
         self._entries: Dict[str, Dict[str, object]] = {}
         self._pending: Dict[str, Dict[str, object]] = {}
+        self._journal_lines = 0
+        # Only a phoneme change warrants a new pack version; counts and
+        # timestamps do not.
+        self._phonemes_changed = False
         self._last_flush = time.time()
         self._version = self.current_version()
         self._load_existing()
 
     def _load_existing(self) -> None:
-        if not self.autolearn_path.exists():
-            return
-        try:
-            payload = json.loads(self.autolearn_path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
-            return
-        version = payload.get("version")
-        if isinstance(version, str) and version.strip():
-            self._version = version.strip()
-        entries = payload.get("entries")
-        if isinstance(entries, dict):
-            for key, value in entries.items():
-                normalized = str(key).lower()
-                payload_entry = self._normalize_entry(value)
-                if payload_entry:
-                    self._entries[normalized] = payload_entry
+        version, entries, journal_lines = load_autolearn_entries(self.autolearn_path)
+        if version:
+            self._version = version
+        self._journal_lines = journal_lines
+        for key, value in entries.items():
+            normalized = str(key).lower()
+            payload_entry = self._normalize_entry(value)
+            if payload_entry:
+                self._entries[normalized] = payload_entry
 
     def get_pack(self) -> Optional[AutoLearnPack]:
         if not self._entries:
@@ -54,6 +131,11 @@ class DictLearner:
             entries={k: dict(v) for k, v in self._entries.items()},
         )
 
+    def phoneme_entries(self) -> Dict[str, str]:
+        """Learned key -> phonemes, without the per-entry metadata."""
+        with self._lock:
+            return {key: str(entry["phonemes"]) for key, entry in self._entries.items()}
+
     def version(self) -> str:
         return self._version
 
@@ -67,8 +149,8 @@ class DictLearner:
             now = datetime.now(timezone.utc).isoformat()
             count = int(existing.get("count", 0)) + 1 if existing else 1
             entry = {"phonemes": phonemes, "count": count, "updated_at": now}
-            if existing and existing.get("phonemes") == phonemes:
-                entry["count"] = count
+            if not existing or existing.get("phonemes") != phonemes:
+                self._phonemes_changed = True
             self._entries[normalized_key] = entry
             self._pending[normalized_key] = entry
             if time.time() - self._last_flush >= self.flush_seconds:
@@ -78,10 +160,57 @@ class DictLearner:
         with self._lock:
             self._flush_locked()
 
+    def compact(self) -> None:
+        with self._lock:
+            with file_lock(self.lock_path, timeout=FILE_LOCK_TIMEOUT_SECONDS) as acquired:
+                if acquired:
+                    self._compact_locked()
+
     def _flush_locked(self) -> None:
         if not self._pending:
             return
-        self._version = self.current_version()
+        # Appends and compaction from other processes are serialized on the
+        # lock file, so a compaction never drops a line appended meanwhile.
+        with file_lock(self.lock_path, timeout=FILE_LOCK_TIMEOUT_SECONDS) as acquired:
+            if not acquired:
+                return
+            if self._phonemes_changed:
+                self._version = self.current_version()
+                self._phonemes_changed = False
+            if not self.autolearn_path.exists():
+                # Nothing to append to yet; writing the snapshot costs the same.
+                self._compact_locked()
+                return
+            lines = []
+            for key, entry in self._pending.items():
+                record = {"key": key, "version": self._version, **entry}
+                lines.append(json.dumps(record, ensure_ascii=False))
+            with self.journal_path.open("a+b") as handle:
+                _truncate_torn_tail(handle)
+                handle.write(("\n".join(lines) + "\n").encode("utf-8"))
+            self._journal_lines += len(lines)
+            self._pending.clear()
+            self._last_flush = time.time()
+            if self._journal_lines > max(COMPACT_MIN_JOURNAL_LINES, len(self._entries)):
+                self._compact_locked()
+
+    def _merge_from_disk(self) -> None:
+        """Pick up entries other processes wrote since this one loaded."""
+        version, entries, _ = load_autolearn_entries(self.autolearn_path)
+        if version and version > self._version:
+            self._version = version
+        for key, value in entries.items():
+            theirs = self._normalize_entry(value)
+            if not theirs:
+                continue
+            normalized = str(key).lower()
+            ours = self._entries.get(normalized)
+            if ours is None or str(theirs.get("updated_at", "")) > str(ours.get("updated_at", "")):
+                self._entries[normalized] = theirs
+
+    def _compact_locked(self) -> None:
+        """Rewrite the snapshot; callers hold both the thread and file locks."""
+        self._merge_from_disk()
         payload = {
             "name": "auto_learn",
             "version": self._version,
@@ -92,6 +221,10 @@ class DictLearner:
         tmp_path = self.autolearn_path.with_suffix(".tmp")
         tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
         tmp_path.replace(self.autolearn_path)
+        # Replaying the journal over the new snapshot is idempotent, so a crash
+        # between these two steps loses nothing.
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_lines = 0
         self._pending.clear()
         self._last_flush = time.time()
 
@@ -1,5 +1,13 @@
 import threading
+from collections import deque
 from dataclasses import dataclass
+from typing import Deque, Dict, List
+
+from .encode import get_ffmpeg_pool
+from .fallback_espeak import get_espeak_pool
+
+
+TTFA_WINDOW = 1000
 
 
 @dataclass
@@ -17,7 +25,24 @@ class MetricsSnapshot:
     merge_lock_waits: int
     merge_lock_wait_ms: float
     merge_lock_wait_max_ms: float
+    coalesced_segments: int
+    coalesced_wait_ms: float
     stale_queued_cancels: int
+    cache_keys_built: int
+    cache_keys_churned: int
+    encode_counts: dict
+    encode_ms: dict
+    ffmpeg_spawned: int
+    ffmpeg_spare_hits: int
+    ffmpeg_spare_misses: int
+    ffmpeg_restarts: int
+    ttfa_ms: Dict[str, List[float]]
+    espeak_backends: int
+    espeak_pool_hits: int
+    espeak_pool_misses: int
+    espeak_calls: int
+    espeak_call_ms: float
+    espeak_init_ms: float
 
     @property
     def cache_hit_rate(self) -> float:
@@ -32,6 +57,30 @@ class MetricsSnapshot:
     def avg_chars_per_sec(self) -> float:
         return (self.total_chars / self.total_duration_sec) if self.total_duration_sec else 0.0
 
+    @property
+    def cache_key_churn_rate(self) -> float:
+        return (self.cache_keys_churned / self.cache_keys_built) if self.cache_keys_built else 0.0
+
+    def ttfa_percentile(self, priority: str, pct: float) -> float:
+        values = sorted(self.ttfa_ms.get(priority, []))
+        if not values:
+            return 0.0
+        rank = max(int(round(pct / 100.0 * len(values) + 0.5)) - 1, 0)
+        return values[min(rank, len(values) - 1)]
+
+    def encode_avg_ms(self, encoder: str) -> float:
+        count = self.encode_counts.get(encoder, 0)
+        return (self.encode_ms.get(encoder, 0.0) / count) if count else 0.0
+
+    @property
+    def espeak_pool_hit_rate(self) -> float:
+        denom = self.espeak_pool_hits + self.espeak_pool_misses
+        return (self.espeak_pool_hits / denom) if denom else 0.0
+
+    @property
+    def espeak_avg_call_ms(self) -> float:
+        return (self.espeak_call_ms / self.espeak_calls) if self.espeak_calls else 0.0
+
 
 class Metrics:
     def __init__(self) -> None:
@@ -49,7 +98,15 @@ class Metrics:
         self._merge_lock_waits = 0
         self._merge_lock_wait_ms = 0.0
         self._merge_lock_wait_max_ms = 0.0
+        self._coalesced_segments = 0
+        self._coalesced_wait_ms = 0.0
         self._stale_queued_cancels = 0
+        self._cache_keys_built = 0
+        self._cache_keys_churned = 0
+        self._encode_counts: dict = {}
+        self._encode_ms: dict = {}
+        # Recent samples only, so percentiles track current load.
+        self._ttfa_ms: Dict[str, Deque[float]] = {}
 
     def record_job(
         self,
@@ -91,11 +148,36 @@ class Metrics:
             if wait_ms > self._merge_lock_wait_max_ms:
                 self._merge_lock_wait_max_ms = wait_ms
 
+    def record_coalesced(self, wait_ms: float) -> None:
+        """A segment served by another worker's synthesis of the same cache key."""
+        with self._lock:
+            self._coalesced_segments += 1
+            self._coalesced_wait_ms += wait_ms
+
     def record_stale_queued_cancel(self) -> None:
         with self._lock:
             self._stale_queued_cancels += 1
 
+    def record_cache_keys(self, *, total: int, churned: int) -> None:
+        with self._lock:
+            self._cache_keys_built += total
+            self._cache_keys_churned += churned
+
+    def record_encode(self, encoder: str, encode_ms: float) -> None:
+        with self._lock:
+            self._encode_counts[encoder] = self._encode_counts.get(encoder, 0) + 1
+            self._encode_ms[encoder] = self._encode_ms.get(encoder, 0.0) + encode_ms
+
+    def record_ttfa(self, priority: str, ttfa_ms: float) -> None:
+        with self._lock:
+            samples = self._ttfa_ms.setdefault(priority, deque(maxlen=TTFA_WINDOW))
+            samples.append(ttfa_ms)
+
     def snapshot(self) -> MetricsSnapshot:
+        # The espeak and ffmpeg pools are shared by the whole process, so read
+        # their counters rather than mirroring them here.
+        espeak = get_espeak_pool().stats()
+        ffmpeg = get_ffmpeg_pool().stats()
         with self._lock:
             return MetricsSnapshot(
                 total_jobs=self._total_jobs,
@@ -111,5 +193,22 @@ class Metrics:
                 merge_lock_waits=self._merge_lock_waits,
                 merge_lock_wait_ms=self._merge_lock_wait_ms,
                 merge_lock_wait_max_ms=self._merge_lock_wait_max_ms,
+                coalesced_segments=self._coalesced_segments,
+                coalesced_wait_ms=self._coalesced_wait_ms,
                 stale_queued_cancels=self._stale_queued_cancels,
+                cache_keys_built=self._cache_keys_built,
+                cache_keys_churned=self._cache_keys_churned,
+                encode_counts=dict(self._encode_counts),
+                encode_ms=dict(self._encode_ms),
+                ffmpeg_spawned=ffmpeg.spawned,
+                ffmpeg_spare_hits=ffmpeg.spare_hits,
+                ffmpeg_spare_misses=ffmpeg.spare_misses,
+                ffmpeg_restarts=ffmpeg.restarts,
+                ttfa_ms={priority: list(samples) for priority, samples in self._ttfa_ms.items()},
+                espeak_backends=espeak.backends,
+                espeak_pool_hits=espeak.hits,
+                espeak_pool_misses=espeak.misses,
+                espeak_calls=espeak.calls,
+                espeak_call_ms=espeak.call_ms,
+                espeak_init_ms=espeak.init_ms,
             )
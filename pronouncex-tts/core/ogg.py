@@ -0,0 +1,288 @@
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+_CAPTURE = b"OggS"
+_FLAG_CONTINUED = 0x01
+_FLAG_BOS = 0x02
+_FLAG_EOS = 0x04
+_NO_GRANULE = -1
+# Ogg Opus granule positions always count 48 kHz samples.
+OPUS_GRANULE_RATE = 48000
+
+# Ogg's CRC-32 is the non-reflected form of zlib's polynomial with a zero
+# initial value. Bit-reversing every input byte and the result lets zlib
+# compute it in C instead of a per-byte Python loop.
+_BIT_REVERSE = bytes(int(f"{value:08b}"[::-1], 2) for value in range(256))
+
+# Samples per Opus frame at 48 kHz, by TOC config (RFC 6716 section 3.1).
+_SILK_FRAMES = (480, 960, 1920, 2880)
+_HYBRID_FRAMES = (480, 960)
+_CELT_FRAMES = (120, 240, 480, 960)
+
+
+class OggConcatError(ValueError):
+    pass
+
+
+def ogg_crc(data: bytes) -> int:
+    reflected = zlib.crc32(data.translate(_BIT_REVERSE), 0xFFFFFFFF) ^ 0xFFFFFFFF
+    return int(f"{reflected:032b}"[::-1], 2)
+
+
+def opus_packet_samples(packet: bytes) -> int:
+    """Decoded length of one Opus packet in 48 kHz samples, from its TOC byte."""
+    if not packet:
+        return 0
+    toc = packet[0]
+    config = toc >> 3
+    if config < 12:
+        frame = _SILK_FRAMES[config & 3]
+    elif config < 16:
+        frame = _HYBRID_FRAMES[config & 1]
+    else:
+        frame = _CELT_FRAMES[config & 3]
+    code = toc & 3
+    if code == 0:
+        return frame
+    if code in (1, 2):
+        return frame * 2
+    if len(packet) < 2:
+        return 0
+    return frame * (packet[1] & 0x3F)
+
+
+@dataclass
+class OggPage:
+    header_type: int
+    granule: int
+    serial: int
+    sequence: int
+    lacing: bytes
+    body: bytes
+
+    @property
+    def size(self) -> int:
+        return _PAGE_HEADER.size + len(self.lacing) + len(self.body)
+
+    def to_bytes(self) -> bytes:
+        header = _PAGE_HEADER.pack(
+            _CAPTURE, 0, self.header_type, self.granule, self.serial, self.sequence, 0, len(self.lacing)
+        )
+        page = bytearray(header + self.lacing + self.body)
+        struct.pack_into("<I", page, 22, ogg_crc(bytes(page)))
+        return bytes(page)
+
+
+def read_pages(stream: BinaryIO) -> Iterator[OggPage]:
+    while True:
+        header = stream.read(_PAGE_HEADER.size)
+        if not header:
+            return
+        if len(header) < _PAGE_HEADER.size:
+            raise OggConcatError("truncated Ogg page header")
+        capture, version, header_type, granule, serial, sequence, _, count = _PAGE_HEADER.unpack(header)
+        if capture != _CAPTURE or version != 0:
+            raise OggConcatError("not an Ogg page")
+        lacing = stream.read(count)
+        body = stream.read(sum(lacing))
+        if len(lacing) < count or len(body) < sum(lacing):
+            raise OggConcatError("truncated Ogg page")
+        yield OggPage(header_type, granule, serial, sequence, lacing, body)
+
+
+class _PacketCounter:
+    """Track packet boundaries across pages and sum their Opus durations."""
+
+    def __init__(self) -> None:
+        self.packets = 0
+        self.samples = 0
+        self._head = b""
+
+    def feed(self, page: OggPage) -> int:
+        """Return how many packets complete on ``page``."""
+        completed = 0
+        offset = 0
+        for value in page.lacing:
+            if len(self._head) < 2:
+                self._head += page.body[offset : offset + min(value, 2 - len(self._head))]
+            offset += value
+            if value < 255:
+                if self.packets >= 2:
+                    self.samples += opus_packet_samples(self._head)
+                self.packets += 1
+                completed += 1
+                self._head = b""
+        return completed
+
+
+@dataclass
+class _OpusSource:
+    path: Path
+    header_bytes: int
+    channels: int
+    pre_skip: int
+
+
+def _inspect(path: Path) -> _OpusSource:
+    counter = _PacketCounter()
+    header_bytes = 0
+    first: Optional[OggPage] = None
+    with open(path, "rb") as stream:
+        for page in read_pages(stream):
+            if first is None:
+                first = page
+                if not page.body.startswith(b"OpusHead") or len(page.body) < 19:
+                    raise OggConcatError(f"{path.name} is not an Ogg/Opus stream")
+            header_bytes += page.size
+            counter.feed(page)
+            # OpusHead and OpusTags are the first two packets; audio starts
+            # on a fresh page.
+            if counter.packets >= 2:
+                break
+    if first is None or counter.packets < 2:
+        raise OggConcatError(f"{path.name} has incomplete Opus headers")
+    return _OpusSource(
+        path=path,
+        header_bytes=header_bytes,
+        channels=first.body[9],
+        pre_skip=struct.unpack_from("<H", first.body, 10)[0],
+    )
+
+
+@dataclass
+class _HeldPage:
+    page: OggPage
+    granule: int
+    offset: int
+    audio: bool
+
+
+class OpusStreamBuilder:
+    """
+    Incrementally join Ogg/Opus files into one logical bitstream.
+
+    The first file's OpusHead/OpusTags pages are kept and the header pages of
+    later files are dropped. Every audio page is re-stamped with the first
+    file's serial number, a continuous page sequence and a granule position
+    offset by the samples decoded so far, then re-checksummed; packet data is
+    copied untouched, so nothing is decoded or re-encoded.
+
+    ``append`` emits a file's pages except its last one, which is held until
+    the next ``append`` (written as a mid-stream page) or ``finish`` (written
+    with EOS and the encoder's end trim). Earlier files therefore play their
+    padding and encoder priming, a few milliseconds per join.
+
+    ``boundaries`` records, per appended file, the playback time and output
+    byte offset of its first audio page: a seek index at file granularity.
+    """
+
+    def __init__(self) -> None:
+        self._serial: Optional[int] = None
+        self._channels: Optional[int] = None
+        self._pre_skip = 0
+        self._sequence = 0
+        self._offset = 0
+        self._held: Optional[_HeldPage] = None
+        self.bytes_written = 0
+        self.boundaries: List[Tuple[float, int]] = []
+
+    @property
+    def started(self) -> bool:
+        return self._serial is not None
+
+    def _emit(self, held: _HeldPage, final: bool = False) -> bytes:
+        granule = held.granule
+        if final and held.audio and held.page.granule != _NO_GRANULE:
+            # Keep the encoder's end trim on the stream's last page.
+            granule = held.offset + held.page.granule
+        header_type = held.page.header_type & _FLAG_CONTINUED
+        if self._sequence == 0:
+            header_type |= _FLAG_BOS
+        if final:
+            header_type |= _FLAG_EOS
+        data = OggPage(
+            header_type=header_type,
+            granule=granule,
+            serial=self._serial,
+            sequence=self._sequence,
+            lacing=held.page.lacing,
+            body=held.page.body,
+        ).to_bytes()
+        self._sequence += 1
+        self.bytes_written += len(data)
+        return data
+
+    def append(self, path: Path, source: Optional[_OpusSource] = None) -> Iterator[bytes]:
+        source = source or _inspect(Path(path))
+        if self._channels is not None and source.channels != self._channels:
+            raise OggConcatError("segments disagree on channel count")
+        self._channels = source.channels
+        counter = _PacketCounter()
+        offset = self._offset
+        with open(source.path, "rb") as stream:
+            if self.started:
+                stream.seek(source.header_bytes)
+                counter.packets = 2
+            else:
+                self._pre_skip = source.pre_skip
+            for page in read_pages(stream):
+                is_first_audio = counter.packets == 2
+                completed = counter.feed(page)
+                if self._serial is None:
+                    self._serial = page.serial
+                if self._held is not None:
+                    yield self._emit(self._held)
+                if is_first_audio:
+                    start_ms = max(offset - self._pre_skip, 0) / OPUS_GRANULE_RATE * 1000.0
+                    self.boundaries.append((round(start_ms, 3), self.bytes_written))
+                if counter.packets <= 2:
+                    # Header packets carry granule 0.
+                    granule = 0
+                elif completed:
+                    granule = offset + counter.samples
+                else:
+                    granule = _NO_GRANULE
+                self._held = _HeldPage(page, granule, offset, counter.packets > 2)
+        self._offset = offset + counter.samples
+
+    def finish(self) -> Iterator[bytes]:
+        if self._held is not None:
+            yield self._emit(self._held, final=True)
+            self._held = None
+
+
+class OpusConcat:
+    """Concatenate a known list of Ogg/Opus files; see ``OpusStreamBuilder``."""
+
+    def __init__(self, paths: Sequence[Path]):
+        if not paths:
+            raise OggConcatError("nothing to concatenate")
+        self._sources: List[_OpusSource] = [_inspect(Path(path)) for path in paths]
+        channels = {source.channels for source in self._sources}
+        if len(channels) != 1:
+            raise OggConcatError("segments disagree on channel count")
+        # Pages keep their size, so the output length is known up front.
+        self.content_length = sum(
+            source.path.stat().st_size - (source.header_bytes if index else 0)
+            for index, source in enumerate(self._sources)
+        )
+
+    def pages(self) -> Iterator[bytes]:
+        self.builder = OpusStreamBuilder()
+        for source in self._sources:
+            yield from self.builder.append(source.path, source)
+        yield from self.builder.finish()
+
+    def chunks(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        buffer = bytearray()
+        for page in self.pages():
+            buffer += page
+            if len(buffer) >= chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
@@ -1,13 +1,20 @@
+import logging
+import threading
 import time
+import uuid
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any, Dict, Iterator, Optional
 
 try:
     import fcntl
 except ImportError:  # pragma: no cover - Windows fallback
     fcntl = None
 
+logger = logging.getLogger(__name__)
+
+FLIGHT_LEASE_SECONDS = 300
+
 
 def merge_lock(
     client: Any,
@@ -43,3 +50,115 @@ def file_lock(path: Path, timeout: float = 1.0) -> Iterator[bool]:
             yield True
         finally:
             fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class SingleFlight:
+    """
+    Let one caller produce a key while concurrent callers wait for it.
+
+    Threads of one process queue behind a local leader on an event. With
+    Redis, that local leader also claims ``px:flight:{key}`` with SET NX, so
+    only one process synthesizes; the others block on ``px:flight:done:{key}``
+    and wake when the owner releases. Each woken waiter pushes the token back
+    for the next one, so every waiter wakes without polling. The claim
+    expires after ``lease_seconds`` in case its owner dies.
+
+    ``acquire`` returning False only means the wait ended: the leader may have
+    failed or run past ``timeout``, so callers re-check the result.
+    """
+
+    _RELEASE_LUA = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+  redis.call("DEL", KEYS[1])
+end
+redis.call("RPUSH", KEYS[2], "1")
+redis.call("EXPIRE", KEYS[2], ARGV[2])
+return 1
+"""
+
+    def __init__(self, client: Optional[Any] = None, lease_seconds: int = FLIGHT_LEASE_SECONDS):
+        self._redis = client
+        self._lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._local: Dict[str, threading.Event] = {}
+        self._tokens: Dict[str, str] = {}
+
+    def _marker_key(self, key: str) -> str:
+        return f"px:flight:{key}"
+
+    def _done_key(self, key: str) -> str:
+        return f"px:flight:done:{key}"
+
+    def acquire(self, key: str, timeout: float) -> bool:
+        """Return True if the caller leads ``key`` and must ``release`` it."""
+        with self._lock:
+            event = self._local.get(key)
+            if event is None:
+                self._local[key] = threading.Event()
+        if event is not None:
+            event.wait(timeout)
+            return False
+        if self._redis is None or self._claim(key):
+            return True
+        try:
+            self._wait_remote(key, timeout)
+        finally:
+            self._finish_local(key)
+        return False
+
+    def release(self, key: str) -> None:
+        token = self._tokens.pop(key, None)
+        try:
+            if self._redis is not None and token is not None:
+                self._redis.eval(
+                    self._RELEASE_LUA,
+                    2,
+                    self._marker_key(key),
+                    self._done_key(key),
+                    token,
+                    self._lease_seconds,
+                )
+        except Exception:
+            logger.warning("Failed to release flight for %s", key, exc_info=True)
+        finally:
+            self._finish_local(key)
+
+    def _claim(self, key: str) -> bool:
+        token = uuid.uuid4().hex
+        try:
+            if not self._redis.set(self._marker_key(key), token, nx=True, ex=self._lease_seconds):
+                return False
+            # Drop the wake-up token left by an earlier flight of this key.
+            self._redis.delete(self._done_key(key))
+        except Exception:
+            # Coalescing is an optimization; fall back to synthesizing.
+            logger.warning("Failed to claim flight for %s", key, exc_info=True)
+            return True
+        self._tokens[key] = token
+        return True
+
+    def _wait_remote(self, key: str, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                if self._redis.blpop([self._done_key(key)], timeout=min(remaining, 1.0)):
+                    # Pass the token on to the next waiter.
+                    pipe = self._redis.pipeline()
+                    pipe.rpush(self._done_key(key), "1")
+                    pipe.expire(self._done_key(key), self._lease_seconds)
+                    pipe.execute()
+                    return
+                if not self._redis.exists(self._marker_key(key)):
+                    # Owner released before we blocked, or its lease lapsed.
+                    return
+        except Exception:
+            logger.warning("Failed while waiting on flight for %s", key, exc_info=True)
+
+    def _finish_local(self, key: str) -> None:
+        with self._lock:
+            event = self._local.pop(key, None)
+        if event is not None:
+            event.set()
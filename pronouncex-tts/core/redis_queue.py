@@ -1,7 +1,25 @@
-from typing import Any, Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+PRIORITY_CLASSES = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+
+def normalize_priority(priority: Optional[str]) -> str:
+    value = (priority or DEFAULT_PRIORITY).strip().lower()
+    if value not in PRIORITY_CLASSES:
+        raise ValueError(f"priority must be one of: {', '.join(PRIORITY_CLASSES)}")
+    return value
 
 
 class RedisJobQueue:
+    """
+    One list per priority class. ``blpop`` over the keys in priority order
+    always serves the highest non-empty class first; ``normal`` keeps the
+    original key so existing deployments drain it unchanged.
+    """
+
     def __init__(self, client: Any, queue_key: str = "px:queue:jobs"):
         self._redis = client
         self._queue_key = queue_key
@@ -10,11 +28,294 @@ class RedisJobQueue:
     def queue_key(self) -> str:
         return self._queue_key
 
-    def enqueue(self, job_id: str) -> None:
-        self._redis.rpush(self._queue_key, job_id)
+    def _key_for(self, priority: str) -> str:
+        if priority == DEFAULT_PRIORITY:
+            return self._queue_key
+        return f"{self._queue_key}:{priority}"
+
+    @property
+    def queue_keys(self) -> List[str]:
+        return [self._key_for(priority) for priority in PRIORITY_CLASSES]
+
+    def enqueue(self, job_id: str, priority: str = DEFAULT_PRIORITY) -> None:
+        self._redis.rpush(self._key_for(priority), job_id)
 
     def dequeue(self, block: bool = True, timeout: int = 5) -> Optional[str]:
         if block:
-            result = self._redis.blpop(self._queue_key, timeout=timeout)
+            result = self._redis.blpop(self.queue_keys, timeout=timeout)
             return result[1] if result else None
-        return self._redis.lpop(self._queue_key)
+        for key in self.queue_keys:
+            job_id = self._redis.lpop(key)
+            if job_id:
+                return job_id
+        return None
+
+    def size(self) -> int:
+        return sum(int(self._redis.llen(key)) for key in self.queue_keys)
+
+
+class RedisStreamJobQueue:
+    """
+    Job queue on Redis Streams with a consumer group.
+
+    Delivery is tracked by the group's pending entries list instead of claim
+    keys: a worker acks a job once it is processed, ``touch`` resets the idle
+    time of a job still being worked on, and entries idle for longer than
+    ``claim_idle_ms`` (their worker died) are taken over with XAUTOCLAIM.
+    Recovery therefore only looks at pending entries, never at stored jobs.
+    Acked entries are deleted so the streams hold only outstanding work.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        consumer: str,
+        stream_key: str = "px:stream:jobs",
+        group: str = "px-workers",
+        claim_idle_ms: int = 60000,
+        autoclaim_interval: Optional[float] = None,
+    ):
+        self._redis = client
+        self._consumer = consumer
+        self._stream_key = stream_key
+        self._group = group
+        self._claim_idle_ms = claim_idle_ms
+        self._groups_ready = False
+        self._inflight: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self._next_autoclaim = 0.0
+        if autoclaim_interval is None:
+            autoclaim_interval = max(claim_idle_ms / 4000.0, 1.0)
+        self._autoclaim_interval = autoclaim_interval
+
+    @property
+    def queue_key(self) -> str:
+        return self._stream_key
+
+    def _key_for(self, priority: str) -> str:
+        if priority == DEFAULT_PRIORITY:
+            return self._stream_key
+        return f"{self._stream_key}:{priority}"
+
+    @property
+    def queue_keys(self) -> List[str]:
+        return [self._key_for(priority) for priority in PRIORITY_CLASSES]
+
+    def _ensure_groups(self) -> None:
+        if self._groups_ready:
+            return
+        for key in self.queue_keys:
+            try:
+                self._redis.xgroup_create(key, self._group, id="0", mkstream=True)
+            except Exception as exc:
+                if "BUSYGROUP" not in str(exc):
+                    raise
+        self._groups_ready = True
+
+    def _track(self, key: str, message_id: str, fields: Optional[Dict[str, str]]) -> Optional[str]:
+        job_id = (fields or {}).get("job_id")
+        if not job_id:
+            # Nothing to run; drop it so it is not redelivered forever.
+            self._redis.xack(key, self._group, message_id)
+            self._redis.xdel(key, message_id)
+            return None
+        with self._lock:
+            self._inflight[job_id] = (key, message_id)
+        return job_id
+
+    def enqueue(self, job_id: str, priority: str = DEFAULT_PRIORITY) -> None:
+        self._ensure_groups()
+        self._redis.xadd(self._key_for(priority), {"job_id": job_id})
+
+    def _autoclaim(self) -> Optional[str]:
+        now = time.monotonic()
+        if now < self._next_autoclaim:
+            return None
+        self._next_autoclaim = now + self._autoclaim_interval
+        for key in self.queue_keys:
+            result = self._redis.xautoclaim(
+                key,
+                self._group,
+                self._consumer,
+                min_idle_time=self._claim_idle_ms,
+                start_id="0-0",
+                count=1,
+            )
+            for message_id, fields in result[1]:
+                job_id = self._track(key, message_id, fields)
+                if job_id:
+                    return job_id
+        return None
+
+    def _read(self, streams: Dict[str, str], block_ms: Optional[int]) -> Optional[str]:
+        response = self._redis.xreadgroup(
+            self._group, self._consumer, streams, count=1, block=block_ms
+        )
+        for key, messages in response or []:
+            for message_id, fields in messages:
+                job_id = self._track(key, message_id, fields)
+                if job_id:
+                    return job_id
+        return None
+
+    def dequeue(self, block: bool = True, timeout: int = 5) -> Optional[str]:
+        self._ensure_groups()
+        job_id = self._autoclaim()
+        if job_id:
+            return job_id
+        # Poll in priority order first; XREADGROUP over several streams does
+        # not prefer one over another.
+        for key in self.queue_keys:
+            job_id = self._read({key: ">"}, None)
+            if job_id:
+                return job_id
+        if not block:
+            return None
+        return self._read({key: ">" for key in self.queue_keys}, timeout * 1000)
+
+    def touch(self, job_id: str) -> None:
+        """Reset the idle time of a job still being processed."""
+        with self._lock:
+            entry = self._inflight.get(job_id)
+        if entry:
+            key, message_id = entry
+            self._redis.xclaim(
+                key, self._group, self._consumer, min_idle_time=0, message_ids=[message_id], justid=True
+            )
+
+    def ack(self, job_id: str) -> None:
+        with self._lock:
+            entry = self._inflight.pop(job_id, None)
+        if entry:
+            key, message_id = entry
+            pipe = self._redis.pipeline()
+            pipe.xack(key, self._group, message_id)
+            pipe.xdel(key, message_id)
+            pipe.execute()
+
+    def size(self) -> int:
+        """Entries not yet delivered to any consumer."""
+        self._ensure_groups()
+        waiting = 0
+        for key in self.queue_keys:
+            pending = self._redis.xpending(key, self._group)
+            waiting += int(self._redis.xlen(key)) - int(pending.get("pending", 0))
+        return max(waiting, 0)
+
+
+class RedisSegmentQueue:
+    """
+    Segment-granularity work queue for fanning one job out across workers.
+
+    Tasks are ``job_id:segment_id`` strings. Each job also gets a remaining
+    counter and a done set; ``mark_done`` decrements the counter once per
+    segment no matter how many times a task is redelivered, so exactly one
+    caller sees it reach zero and finalizes the job.
+
+    The first ``head_count`` segments of a job go on head lists that are
+    drained before any tail list, so a new job starts playing ahead of the
+    remaining segments of older jobs. Within heads and within tails, higher
+    priority classes are served first.
+    """
+
+    _DONE_LUA = """
+if redis.call("SADD", KEYS[1], ARGV[1]) == 1 then
+  redis.call("EXPIRE", KEYS[1], ARGV[2])
+  return redis.call("DECR", KEYS[2])
+end
+return -1
+"""
+
+    def __init__(self, client: Any, queue_key: str = "px:queue:segments"):
+        self._redis = client
+        self._queue_key = queue_key
+
+    @property
+    def queue_key(self) -> str:
+        return self._queue_key
+
+    def _key_for(self, priority: str, head: bool) -> str:
+        if head:
+            return f"{self._queue_key}:head:{priority}"
+        if priority == DEFAULT_PRIORITY:
+            return self._queue_key
+        return f"{self._queue_key}:{priority}"
+
+    @property
+    def queue_keys(self) -> List[str]:
+        heads = [self._key_for(priority, True) for priority in PRIORITY_CLASSES]
+        tails = [self._key_for(priority, False) for priority in PRIORITY_CLASSES]
+        return heads + tails
+
+    @staticmethod
+    def _remaining_key(job_id: str) -> str:
+        return f"px:segments:remaining:{job_id}"
+
+    @staticmethod
+    def _done_key(job_id: str) -> str:
+        return f"px:segments:done:{job_id}"
+
+    def enqueue_job(
+        self,
+        job_id: str,
+        segment_ids: List[str],
+        ttl_seconds: int,
+        priority: str = DEFAULT_PRIORITY,
+        head_count: int = 0,
+        done_ids: Optional[List[str]] = None,
+    ) -> None:
+        """Queue ``segment_ids``; ``done_ids`` are segments already finished at submit."""
+        tasks = [f"{job_id}:{segment_id}" for segment_id in segment_ids]
+        heads, tails = tasks[:head_count], tasks[head_count:]
+        pipe = self._redis.pipeline()
+        pipe.set(self._remaining_key(job_id), len(segment_ids), ex=ttl_seconds)
+        pipe.delete(self._done_key(job_id))
+        if done_ids:
+            pipe.sadd(self._done_key(job_id), *done_ids)
+            pipe.expire(self._done_key(job_id), ttl_seconds)
+        if heads:
+            pipe.rpush(self._key_for(priority, True), *heads)
+        if tails:
+            pipe.rpush(self._key_for(priority, False), *tails)
+        pipe.execute()
+
+    def enqueue(self, job_id: str, segment_ids: List[str], priority: str = DEFAULT_PRIORITY) -> None:
+        if segment_ids:
+            self._redis.rpush(
+                self._key_for(priority, False),
+                *[f"{job_id}:{segment_id}" for segment_id in segment_ids],
+            )
+
+    def dequeue(self, block: bool = True, timeout: int = 5) -> Optional[Tuple[str, str]]:
+        if block:
+            result = self._redis.blpop(self.queue_keys, timeout=timeout)
+            raw = result[1] if result else None
+        else:
+            raw = None
+            for key in self.queue_keys:
+                raw = self._redis.lpop(key)
+                if raw:
+                    break
+        if not raw or ":" not in raw:
+            return None
+        job_id, segment_id = raw.split(":", 1)
+        return job_id, segment_id
+
+    def mark_done(self, job_id: str, segment_id: str, ttl_seconds: int) -> int:
+        """Return segments still outstanding, or -1 if this segment was already counted."""
+        return int(
+            self._redis.eval(
+                self._DONE_LUA,
+                2,
+                self._done_key(job_id),
+                self._remaining_key(job_id),
+                segment_id,
+                ttl_seconds,
+            )
+        )
+
+    def done_ids(self, job_id: str) -> Set[str]:
+        return set(self._redis.smembers(self._done_key(job_id)))
+
+    def size(self) -> int:
+        return sum(int(self._redis.llen(key)) for key in self.queue_keys)
@@ -1,8 +1,21 @@
 import json
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+def _segment_fields(payload: Dict[str, Any]) -> Dict[str, str]:
+    return {seg["segment_id"]: json.dumps(seg) for seg in payload.get("segments") or []}
 
 
 class RedisJobStore:
+    """
+    Job manifests as JSON strings under ``px:job:{id}``.
+
+    ``px:jobidx:{id}`` mirrors each segment as one hash field so segment
+    routes can read a single segment without fetching and decoding the whole
+    manifest. The mirror is written in the same transaction as the manifest,
+    and only for segments whose JSON changed.
+    """
+
     def __init__(self, client: Any, ttl_seconds: int):
         self._redis = client
         self._ttl_seconds = ttl_seconds
@@ -10,18 +23,50 @@ class RedisJobStore:
     def _key(self, job_id: str) -> str:
         return f"px:job:{job_id}"
 
+    def _index_key(self, job_id: str) -> str:
+        return f"px:jobidx:{job_id}"
+
     def get(self, job_id: str) -> Optional[Dict[str, Any]]:
         raw = self._redis.get(self._key(job_id))
         if not raw:
             return None
         return json.loads(raw)
 
+    def get_segment(self, job_id: str, segment_id: str) -> Optional[Dict[str, Any]]:
+        raw = self._redis.hget(self._index_key(job_id), segment_id)
+        if not raw:
+            return None
+        return json.loads(raw)
+
+    def exists(self, job_id: str) -> bool:
+        return bool(self._redis.exists(self._key(job_id)))
+
     def set(self, job_id: str, payload: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
         ttl = self._ttl_seconds if ttl_seconds is None else ttl_seconds
-        self._redis.set(self._key(job_id), json.dumps(payload), ex=ttl)
+        segments = _segment_fields(payload)
+        index_key = self._index_key(job_id)
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(job_id), json.dumps(payload), ex=ttl)
+        pipe.delete(index_key)
+        if segments:
+            pipe.hset(index_key, mapping=segments)
+            pipe.expire(index_key, ttl)
+        pipe.execute()
+
+    def scan(self) -> Iterator[Dict[str, Any]]:
+        """Yield every stored job; entries that vanish or fail to decode are skipped."""
+        prefix = self._key("")
+        for key in self._redis.scan_iter(match=f"{prefix}*", count=50):
+            try:
+                payload = self.get(key[len(prefix):])
+            except json.JSONDecodeError:
+                continue
+            if payload:
+                yield payload
 
     def update(self, job_id: str, mutator_fn: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
         key = self._key(job_id)
+        index_key = self._index_key(job_id)
         for _ in range(10):
             pipe = self._redis.pipeline()
             try:
@@ -31,9 +76,18 @@ class RedisJobStore:
                     pipe.unwatch()
                     return None
                 payload = json.loads(raw)
+                before = _segment_fields(payload)
                 mutator_fn(payload)
+                after = _segment_fields(payload)
+                changed = {name: value for name, value in after.items() if before.get(name) != value}
+                removed = [name for name in before if name not in after]
                 pipe.multi()
                 pipe.set(key, json.dumps(payload), ex=self._ttl_seconds)
+                if changed:
+                    pipe.hset(index_key, mapping=changed)
+                if removed:
+                    pipe.hdel(index_key, *removed)
+                pipe.expire(index_key, self._ttl_seconds)
                 pipe.execute()
                 return payload
             except Exception:
@@ -41,3 +95,210 @@ class RedisJobStore:
             finally:
                 pipe.reset()
         return None
+
+
+def _is_counter(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class RedisHashJobStore(RedisJobStore):
+    """
+    Job manifest split across two hashes so a segment transition rewrites one
+    field instead of the whole document.
+
+    ``px:jobh:{id}`` holds the job-level fields and ``px:jobseg:{id}`` holds one
+    field per segment, each value JSON-encoded. ``get`` reassembles the
+    manifest in the original segment order. ``update`` keeps the optimistic
+    WATCH transaction for job-wide changes but only writes fields that
+    changed; ``update_segment`` patches a single segment with a Lua script and
+    applies counter changes as ``HINCRBY`` so concurrent segments of one job
+    never conflict.
+    """
+
+    _ORDER_FIELD = "_segment_ids"
+
+    _PATCH_LUA = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+  return 0
+end
+if ARGV[3] ~= "" then
+  redis.call("HSET", KEYS[2], ARGV[2], ARGV[3])
+end
+local result = {1}
+for i = 4, #ARGV, 3 do
+  local op, field, value = ARGV[i], ARGV[i + 1], ARGV[i + 2]
+  if op == "incr" then
+    redis.call("HINCRBY", KEYS[1], field, value)
+  elseif op == "setnx" then
+    if redis.call("HSETNX", KEYS[1], field, value) == 0 then
+      table.insert(result, field)
+      table.insert(result, redis.call("HGET", KEYS[1], field))
+    end
+  elseif op == "del" then
+    redis.call("HDEL", KEYS[1], field)
+  else
+    redis.call("HSET", KEYS[1], field, value)
+  end
+end
+redis.call("EXPIRE", KEYS[1], ARGV[1])
+redis.call("EXPIRE", KEYS[2], ARGV[1])
+return result
+"""
+
+    def _key(self, job_id: str) -> str:
+        return f"px:jobh:{job_id}"
+
+    def _segments_key(self, job_id: str) -> str:
+        return f"px:jobseg:{job_id}"
+
+    def _split(self, payload: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        fields = {
+            name: json.dumps(value) for name, value in payload.items() if name != "segments"
+        }
+        segments = payload.get("segments") or []
+        fields[self._ORDER_FIELD] = json.dumps([seg["segment_id"] for seg in segments])
+        return fields, _segment_fields(payload)
+
+    def _assemble(self, fields: Dict[str, str], segments: Dict[str, str]) -> Dict[str, Any]:
+        payload = {
+            name: json.loads(raw) for name, raw in fields.items() if name != self._ORDER_FIELD
+        }
+        order = json.loads(fields.get(self._ORDER_FIELD) or "[]")
+        payload["segments"] = [
+            json.loads(segments[segment_id]) for segment_id in order if segment_id in segments
+        ]
+        return payload
+
+    def get_segment(self, job_id: str, segment_id: str) -> Optional[Dict[str, Any]]:
+        raw = self._redis.hget(self._segments_key(job_id), segment_id)
+        if not raw:
+            return None
+        return json.loads(raw)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hgetall(self._key(job_id))
+        pipe.hgetall(self._segments_key(job_id))
+        fields, segments = pipe.execute()
+        if not fields:
+            return None
+        return self._assemble(fields, segments)
+
+    def set(self, job_id: str, payload: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        ttl = self._ttl_seconds if ttl_seconds is None else ttl_seconds
+        fields, segments = self._split(payload)
+        key = self._key(job_id)
+        segments_key = self._segments_key(job_id)
+        pipe = self._redis.pipeline()
+        pipe.delete(key, segments_key)
+        pipe.hset(key, mapping=fields)
+        if segments:
+            pipe.hset(segments_key, mapping=segments)
+        pipe.expire(key, ttl)
+        pipe.expire(segments_key, ttl)
+        pipe.execute()
+
+    def update(self, job_id: str, mutator_fn: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        key = self._key(job_id)
+        segments_key = self._segments_key(job_id)
+        for _ in range(10):
+            pipe = self._redis.pipeline()
+            try:
+                pipe.watch(key, segments_key)
+                fields = pipe.hgetall(key)
+                if not fields:
+                    pipe.unwatch()
+                    return None
+                segments = pipe.hgetall(segments_key)
+                payload = self._assemble(fields, segments)
+                mutator_fn(payload)
+                new_fields, new_segments = self._split(payload)
+                pipe.multi()
+                for target, old, new in ((key, fields, new_fields), (segments_key, segments, new_segments)):
+                    changed = {name: raw for name, raw in new.items() if old.get(name) != raw}
+                    removed = [name for name in old if name not in new]
+                    if changed:
+                        pipe.hset(target, mapping=changed)
+                    if removed:
+                        pipe.hdel(target, *removed)
+                pipe.expire(key, self._ttl_seconds)
+                pipe.expire(segments_key, self._ttl_seconds)
+                pipe.execute()
+                return payload
+            except Exception:
+                continue
+            finally:
+                pipe.reset()
+        return None
+
+    def update_segment(
+        self,
+        job_id: str,
+        segment_id: str,
+        mutator_fn: Callable[[Dict[str, Any]], None],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Apply ``mutator_fn`` to a view holding the job-level fields and only
+        ``segment_id`` under ``segments``, then write back just that segment.
+
+        Integer job fields the mutator changed are applied as deltas, fields it
+        added are only set if still absent, and other changes overwrite. The
+        segment itself is last-writer-wins: callers hold the segment's claim.
+        In the returned view, an added field another writer set first carries
+        the stored value, so callers can tell whether theirs won.
+        """
+        key = self._key(job_id)
+        segments_key = self._segments_key(job_id)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hgetall(key)
+        pipe.hget(segments_key, segment_id)
+        fields, raw_segment = pipe.execute()
+        if not fields:
+            return None
+        payload = {
+            name: json.loads(raw) for name, raw in fields.items() if name != self._ORDER_FIELD
+        }
+        payload["segments"] = [json.loads(raw_segment)] if raw_segment else []
+        before = {name: value for name, value in payload.items() if name != "segments"}
+        mutator_fn(payload)
+
+        args: List[Any] = []
+        for name, value in payload.items():
+            if name == "segments":
+                continue
+            encoded = json.dumps(value)
+            if name in fields and fields[name] == encoded:
+                continue
+            if _is_counter(value) and (name not in before or _is_counter(before[name])):
+                args.extend(["incr", name, value - before.get(name, 0)])
+            elif name not in before:
+                args.extend(["setnx", name, encoded])
+            else:
+                args.extend(["set", name, encoded])
+        for name in before:
+            if name not in payload:
+                args.extend(["del", name, ""])
+
+        segment_raw = ""
+        for seg in payload.get("segments") or []:
+            if seg.get("segment_id") == segment_id:
+                segment_raw = json.dumps(seg)
+        if segment_raw == (raw_segment or ""):
+            segment_raw = ""
+
+        patched = self._redis.eval(
+            self._PATCH_LUA,
+            2,
+            key,
+            segments_key,
+            self._ttl_seconds,
+            segment_id,
+            segment_raw,
+            *args,
+        )
+        if not patched:
+            return None
+        lost = patched[1:]
+        for name, raw in zip(lost[::2], lost[1::2]):
+            payload[name] = json.loads(raw)
+        return payload
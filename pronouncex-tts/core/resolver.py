@@ -1,14 +1,21 @@
+import hashlib
 import json
+import logging
 import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from packaging.version import InvalidVersion, Version
 
+from .compiled_dict import CompiledPack, load_compiled_pack, normalize_entries
 from .config import Settings
-from .fallback_espeak import phonemize_espeak
-from .learner import DictLearner
+from .fallback_espeak import EspeakError, phonemize_espeak, phonemize_espeak_batch
+from .learner import DictLearner, load_autolearn_entries
+
+logger = logging.getLogger(__name__)
 
 WORD_RE = re.compile(r"[A-Za-z']+")
 TOKEN_RE = re.compile(r"[A-Za-z']+|[^A-Za-z']+")
@@ -18,6 +25,7 @@ TOKEN_RE = re.compile(r"[A-Za-z']+|[^A-Za-z']+")
 class DictPack:
     name: str
     version: str
+    # A plain dict, or a CompiledPack when an up-to-date artifact exists.
     entries: Dict[str, str]
 
 
@@ -27,6 +35,93 @@ class ResolveResult:
     phoneme_text: Optional[str]
     dict_versions: Dict[str, str]
     source_counts: Dict[str, int]
+    espeak_words: int = 0
+    espeak_calls: int = 0
+
+
+WordResolution = Tuple[Optional[str], Optional[str]]
+MemoKey = Tuple[str, str, str]
+
+
+@dataclass
+class WordMemoStats:
+    size: int
+    capacity: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        denom = self.hits + self.misses
+        return (self.hits / denom) if denom else 0.0
+
+
+class WordMemo:
+    """
+    Bounded LRU of word resolutions shared by every job using the resolver.
+
+    Values are ``(phonemes, source)``; ``(None, None)`` records a word espeak
+    could not phonemize so it is not retried on every segment.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(0, capacity)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[MemoKey, WordResolution]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: MemoKey) -> Optional[WordResolution]:
+        if not self.capacity:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: MemoKey, value: WordResolution) -> None:
+        if not self.capacity:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def discard(self, key: MemoKey) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> WordMemoStats:
+        with self._lock:
+            return WordMemoStats(
+                size=len(self._entries),
+                capacity=self.capacity,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+class PhraseTrieNode:
+    """Word-level trie node; ``phonemes`` maps pack name to the phrase ending here."""
+
+    __slots__ = ("children", "phonemes")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "PhraseTrieNode"] = {}
+        self.phonemes: Dict[str, str] = {}
 
 
 class PronunciationResolver:
@@ -34,21 +129,32 @@ class PronunciationResolver:
         self.settings = settings
         self.dict_dir = settings.dict_dir
         self.priority = ["local_overrides", "auto_learn", "anime_en", "en_core"]
+        self._priority_rank = {name: rank for rank, name in enumerate(self.priority)}
         self.learner = (
             DictLearner(settings.autolearn_path, settings.autolearn_flush_seconds)
             if settings.enable_autolearn
             else None
         )
         self.packs = self._load_packs()
+        self._index = self._build_index()
+        self._phrase_trie = self._build_phrase_trie()
+        self.word_memo = WordMemo(settings.resolve_memo_size)
+        self._dict_fingerprint = self._compute_dict_fingerprint()
 
     def _load_packs(self) -> Dict[str, DictPack]:
         packs: Dict[str, DictPack] = {}
         for path in self.dict_dir.glob("*.json"):
-            with path.open("r", encoding="utf-8") as handle:
-                payload = json.load(handle)
-            name = payload.get("name")
-            version = payload.get("version", "0.0.0")
-            entries = self._normalize_entries(payload.get("entries", {}))
+            compiled = load_compiled_pack(path, self.settings.compiled_dir)
+            if compiled is not None:
+                name = compiled.name
+                version = compiled.version
+                entries = compiled
+            else:
+                with path.open("r", encoding="utf-8") as handle:
+                    payload = json.load(handle)
+                name = payload.get("name")
+                version = payload.get("version", "0.0.0")
+                entries = self._normalize_entries(payload.get("entries", {}))
             if not name:
                 continue
             existing = packs.get(name)
@@ -81,40 +187,149 @@ class PronunciationResolver:
 
     def _load_autolearn_pack(self) -> Optional[DictPack]:
         if self.learner:
-            pack = self.learner.get_pack()
-            if pack:
-                return DictPack(
-                    name=pack.name,
-                    version=pack.version,
-                    entries=self._normalize_entries(pack.entries),
-                )
-            return None
-        if not self.settings.autolearn_path.exists():
+            entries = self.learner.phoneme_entries()
+            if entries:
+                return DictPack(name="auto_learn", version=self.learner.version(), entries=entries)
             return None
-        try:
-            payload = json.loads(self.settings.autolearn_path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
+        version, raw_entries, _ = load_autolearn_entries(self.settings.autolearn_path)
+        if version is None and not raw_entries:
             return None
-        name = payload.get("name") or "auto_learn"
-        version = payload.get("version", "0.0.0")
-        entries = self._normalize_entries(payload.get("entries", {}))
-        return DictPack(name=name, version=version, entries=entries)
+        entries = self._normalize_entries(raw_entries)
+        return DictPack(name="auto_learn", version=version or "0.0.0", entries=entries)
 
     def refresh(self) -> None:
         self.packs = self._load_packs()
+        self._index = self._build_index()
+        self._phrase_trie = self._build_phrase_trie()
+        self._dict_fingerprint = self._compute_dict_fingerprint()
+        self.word_memo.clear()
 
     def dict_versions(self) -> Dict[str, str]:
         return {name: pack.version for name, pack in self.packs.items()}
 
-    def _lookup_dicts(self, key: str) -> Optional[Tuple[str, str]]:
+    def _compute_dict_fingerprint(self) -> str:
+        blob = json.dumps(self.dict_versions(), sort_keys=True).encode("utf-8")
+        return hashlib.sha1(blob).hexdigest()[:16]
+
+    def _memo_key(self, word: str) -> MemoKey:
+        return (word.lower(), self._dict_fingerprint, self.settings.phoneme_mode)
+
+    def _segment_keys(self, text: str) -> List[str]:
+        """Every dictionary key that could take part in resolving ``text``."""
+        tokens = [
+            {"type": "word" if WORD_RE.fullmatch(token) else "sep", "text": token}
+            for token in TOKEN_RE.findall(text)
+        ]
+        keys = {token["text"].lower() for token in tokens if token["type"] == "word"}
+        for start_idx, token in enumerate(tokens):
+            if token["type"] != "word":
+                continue
+            node = self._phrase_trie.children.get(token["text"].lower())
+            words = [token["text"].lower()]
+            idx = start_idx
+            while node is not None:
+                if node.phonemes and len(words) > 1:
+                    keys.add(" ".join(words))
+                if idx + 2 >= len(tokens):
+                    break
+                sep, nxt = tokens[idx + 1], tokens[idx + 2]
+                if not sep["text"].isspace() or nxt["type"] != "word":
+                    break
+                node = node.children.get(nxt["text"].lower())
+                words.append(nxt["text"].lower())
+                idx += 2
+        return sorted(keys)
+
+    def segment_fingerprint(self, text: str) -> str:
+        """Content hash of the dictionary entries ``text`` resolves through.
+
+        Each word contributes ``[key, phonemes]`` from the pack that wins it,
+        or ``[key, None]`` on a miss, so edits to entries the segment does not
+        use, or moving an entry between packs, keep the hash. Learning a
+        missed word adds an entry and re-keys the segment. espeak is never
+        consulted, so the key does not depend on it being available here.
+        """
+        used = []
+        for key in self._segment_keys(text):
+            if " " in key:
+                for name in self.priority:
+                    pack = self.packs.get(name)
+                    value = pack.entries.get(key) if pack else None
+                    if value:
+                        used.append([key, value])
+                continue
+            hit = self._lookup_dicts(key)
+            used.append([key, hit[1] if hit else None])
+        blob = json.dumps(used, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha1(blob).hexdigest()[:16]
+
+    def memo_stats(self) -> WordMemoStats:
+        return self.word_memo.stats()
+
+    def _build_index(self) -> Dict[str, Tuple[str, str]]:
+        # Compiled packs stay in their mmap and are probed directly; only the
+        # in-memory packs are merged. Fill from the lowest priority pack up so
+        # higher packs overwrite.
+        self._compiled_names = [
+            name
+            for name in self.priority
+            if name in self.packs and isinstance(self.packs[name].entries, CompiledPack)
+        ]
+        index: Dict[str, Tuple[str, str]] = {}
+        for name in reversed(self.priority):
+            pack = self.packs.get(name)
+            if not pack or name in self._compiled_names:
+                continue
+            for key, value in pack.entries.items():
+                if value:
+                    index[key] = (name, value)
+        return index
+
+    def _reindex_key(self, key: str) -> None:
         for name in self.priority:
             pack = self.packs.get(name)
-            if not pack:
+            if not pack or name in self._compiled_names:
                 continue
             value = pack.entries.get(key)
+            if value:
+                self._index[key] = (name, value)
+                return
+        self._index.pop(key, None)
+
+    def _lookup_dicts(self, key: str) -> Optional[Tuple[str, str]]:
+        hit = self._index.get(key)
+        if not self._compiled_names:
+            return hit
+        limit = self._priority_rank[hit[0]] if hit else len(self.priority)
+        for name in self._compiled_names:
+            if self._priority_rank[name] >= limit:
+                break
+            value = self.packs[name].entries.get(key)
             if value:
                 return name, value
-        return None
+        return hit
+
+    def set_entry(
+        self, pack_name: str, key: str, phonemes: str, version: Optional[str] = None
+    ) -> None:
+        """Add or replace one entry without reloading every pack."""
+        normalized = key.strip().lower()
+        pack = self.packs.get(pack_name)
+        if not pack:
+            pack = DictPack(name=pack_name, version=version or "0.0.0", entries={})
+            self.packs[pack_name] = pack
+        pack.entries[normalized] = phonemes
+        if version:
+            pack.version = version
+        self._reindex_key(normalized)
+        if pack_name in self._priority_rank:
+            self._insert_phrase(self._phrase_trie, pack_name, normalized, phonemes)
+        fingerprint = self._compute_dict_fingerprint()
+        if fingerprint != self._dict_fingerprint:
+            self._dict_fingerprint = fingerprint
+            self.word_memo.clear()
+        else:
+            self.word_memo.discard(self._memo_key(normalized))
 
     def _lookup_word(self, word: str) -> Optional[Tuple[str, str]]:
         return self._lookup_dicts(word)
@@ -162,18 +377,30 @@ class PronunciationResolver:
         return phonemes, "auto_learn"
 
     def resolve_word(self, word: str) -> Tuple[Optional[str], Optional[str]]:
+        memo_key = self._memo_key(word)
+        memoized = self.word_memo.get(memo_key)
+        if memoized is not None:
+            return memoized
         lowered = word.lower()
         hit = self._lookup_word(lowered)
         if hit:
             pack_name, phonemes = hit
+            self.word_memo.put(memo_key, (phonemes, pack_name))
             return phonemes, pack_name
         if self.settings.phoneme_mode != "espeak":
             return None, None
-        phonemes = phonemize_espeak(word)
+        try:
+            phonemes = phonemize_espeak(word, strict=True)
+        except EspeakError:
+            # Not memoized: the word may resolve once espeak recovers.
+            logger.warning("espeak failed for %r", word, exc_info=True)
+            return None, None
         if phonemes:
             if self._should_autolearn(word, phonemes):
                 self._learn_autolearn(word, phonemes)
+            self.word_memo.put(self._memo_key(word), (phonemes, "espeak"))
             return phonemes, "espeak"
+        self.word_memo.put(memo_key, (None, None))
         return None, None
 
     def _should_autolearn(self, word: str, phonemes: str) -> bool:
@@ -191,6 +418,7 @@ class PronunciationResolver:
             return False
         if word.strip("'") == "":
             return False
+        # Never shadow a curated entry, even one ranked below auto_learn.
         for name in self.priority:
             if name == "auto_learn":
                 continue
@@ -204,65 +432,144 @@ class PronunciationResolver:
             return
         normalized = key.lower()
         self.learner.learn(normalized, phonemes)
-        pack = self.packs.get("auto_learn")
-        if not pack:
-            pack = DictPack(name="auto_learn", version=self.learner.version(), entries={})
-            self.packs["auto_learn"] = pack
-        pack.entries[normalized] = phonemes
-        pack.version = self.learner.version()
+        self.set_entry("auto_learn", normalized, phonemes, self.learner.version())
 
     def resolve_text(self, text: str) -> ResolveResult:
-        tokens = TOKEN_RE.findall(text)
-        token_objs = []
-        for token in tokens:
-            token_objs.append(
-                {"type": "word" if WORD_RE.fullmatch(token) else "sep", "text": token}
+        return self.resolve_texts([text])[0]
+
+    def resolve_texts(self, texts: Sequence[str]) -> List[ResolveResult]:
+        """Resolve several texts, sending every dictionary miss to espeak at once.
+
+        With ``resolve_batch_scope == "word"`` each miss is phonemized on its own,
+        which is the pre-batching behaviour and is kept for comparison.
+        """
+        per_text = []
+        for text in texts:
+            tokens = TOKEN_RE.findall(text)
+            token_objs = []
+            for token in tokens:
+                token_objs.append(
+                    {"type": "word" if WORD_RE.fullmatch(token) else "sep", "text": token}
+                )
+            source_counts: Dict[str, int] = {}
+            token_objs = self._apply_phrase_overrides(token_objs, source_counts)
+            per_text.append((text, token_objs, source_counts))
+
+        if self.settings.resolve_batch_scope == "word":
+            return [
+                self._resolve_tokens_per_word(text, token_objs, source_counts)
+                for text, token_objs, source_counts in per_text
+            ]
+
+        espeak_words = [0] * len(per_text)
+        # Keyed like the memo, so case variants of a word are phonemized once.
+        misses: Dict[MemoKey, Tuple[str, List[Tuple[int, Dict[str, str]]]]] = {}
+        for text_idx, (_, token_objs, source_counts) in enumerate(per_text):
+            for token in token_objs:
+                if token["type"] != "word":
+                    continue
+                memo_key = self._memo_key(token["text"])
+                memoized = self.word_memo.get(memo_key)
+                if memoized is not None:
+                    phonemes, source = memoized
+                    if phonemes and source:
+                        token["type"] = "phoneme"
+                        token["text"] = phonemes
+                        source_counts[source] = source_counts.get(source, 0) + 1
+                        if source == "espeak":
+                            espeak_words[text_idx] += 1
+                    continue
+                hit = self._lookup_word(token["text"].lower())
+                if hit:
+                    pack_name, phonemes = hit
+                    self.word_memo.put(memo_key, (phonemes, pack_name))
+                    token["type"] = "phoneme"
+                    token["text"] = phonemes
+                    source_counts[pack_name] = source_counts.get(pack_name, 0) + 1
+                    continue
+                misses.setdefault(memo_key, (token["text"], []))[1].append((text_idx, token))
+
+        espeak_calls = 0
+        if misses and self.settings.phoneme_mode == "espeak":
+            words = [word for word, _ in misses.values()]
+            try:
+                phonemized = phonemize_espeak_batch(words)
+            except EspeakError:
+                # Leave the misses unresolved and unmemoized so a later
+                # request retries them once espeak recovers.
+                logger.warning("espeak batch of %d words failed", len(words), exc_info=True)
+                phonemized = []
+            espeak_calls = 1
+            for (memo_key, (word, tokens)), phonemes in zip(misses.items(), phonemized):
+                if not phonemes:
+                    self.word_memo.put(memo_key, (None, None))
+                    continue
+                if self._should_autolearn(word, phonemes):
+                    self._learn_autolearn(word, phonemes)
+                # Learning re-fingerprints the dictionaries, so key afresh.
+                self.word_memo.put(self._memo_key(word), (phonemes, "espeak"))
+                for text_idx, token in tokens:
+                    token["type"] = "phoneme"
+                    token["text"] = phonemes
+                    source_counts = per_text[text_idx][2]
+                    source_counts["espeak"] = source_counts.get("espeak", 0) + 1
+                    espeak_words[text_idx] += 1
+
+        dict_versions = self.dict_versions()
+        results = []
+        for text_idx, (text, token_objs, source_counts) in enumerate(per_text):
+            results.append(
+                ResolveResult(
+                    text=text,
+                    phoneme_text=self._join_tokens(token_objs),
+                    dict_versions=dict_versions,
+                    source_counts=source_counts,
+                    espeak_words=espeak_words[text_idx],
+                    espeak_calls=espeak_calls,
+                )
             )
+        return results
 
-        source_counts: Dict[str, int] = {}
-        token_objs = self._apply_phrase_overrides(token_objs, source_counts)
-
-        found_phoneme = any(token["type"] == "phoneme" for token in token_objs)
+    def _resolve_tokens_per_word(
+        self, text: str, token_objs: List[Dict[str, str]], source_counts: Dict[str, int]
+    ) -> ResolveResult:
+        espeak_words = 0
+        espeak_calls = 0
         for token in token_objs:
             if token["type"] != "word":
                 continue
             phonemes, source = self.resolve_word(token["text"])
+            if source in {None, "espeak"} and self.settings.phoneme_mode == "espeak":
+                espeak_calls += 1
             if phonemes:
                 token["type"] = "phoneme"
                 token["text"] = phonemes
-                found_phoneme = True
                 if source:
                     source_counts[source] = source_counts.get(source, 0) + 1
-
-        phoneme_text = "".join(token["text"] for token in token_objs) if found_phoneme else None
+                if source == "espeak":
+                    espeak_words += 1
         return ResolveResult(
             text=text,
-            phoneme_text=phoneme_text,
+            phoneme_text=self._join_tokens(token_objs),
             dict_versions=self.dict_versions(),
             source_counts=source_counts,
+            espeak_words=espeak_words,
+            espeak_calls=espeak_calls,
         )
 
+    @staticmethod
+    def _join_tokens(token_objs: List[Dict[str, str]]) -> Optional[str]:
+        if not any(token["type"] == "phoneme" for token in token_objs):
+            return None
+        return "".join(token["text"] for token in token_objs)
+
     @staticmethod
     def _normalize_entries(entries: object) -> Dict[str, str]:
-        if not isinstance(entries, dict):
-            return {}
-        normalized: Dict[str, str] = {}
-        for key, value in entries.items():
-            if not key:
-                continue
-            phonemes = None
-            if isinstance(value, str):
-                phonemes = value.strip()
-            elif isinstance(value, dict):
-                phonemes = str(value.get("phonemes", "")).strip()
-            if phonemes:
-                normalized[str(key).lower()] = phonemes
-        return normalized
+        return normalize_entries(entries)
 
     def _apply_phrase_overrides(
         self, tokens: List[Dict[str, str]], source_counts: Dict[str, int]
     ) -> List[Dict[str, str]]:
-        phrase_entries = self._phrase_entries_by_pack()
         output: List[Dict[str, str]] = []
         idx = 0
         while idx < len(tokens):
@@ -272,7 +579,7 @@ class PronunciationResolver:
                 idx += 1
                 continue
 
-            match = self._find_phrase_match(tokens, idx, phrase_entries)
+            match = self._find_phrase_match(tokens, idx)
             if match:
                 end_idx, phonemes, pack_name = match
                 output.append({"type": "phoneme", "text": phonemes})
@@ -284,57 +591,64 @@ class PronunciationResolver:
         return output
 
     def _find_phrase_match(
-        self,
-        tokens: List[Dict[str, str]],
-        start_idx: int,
-        phrase_entries: Dict[str, List[Dict[str, object]]],
+        self, tokens: List[Dict[str, str]], start_idx: int
     ) -> Optional[Tuple[int, str, str]]:
-        start_word = tokens[start_idx]["text"].lower()
-        for pack_name in self.priority:
-            entries = phrase_entries.get(pack_name)
-            if not entries:
+        # Walk the trie along whitespace-separated words, remembering every
+        # phrase that ends on the way. A higher-priority pack wins over a longer
+        # match from a lower-priority pack, and within a pack the longest wins.
+        node = self._phrase_trie.children.get(tokens[start_idx]["text"].lower())
+        if node is None:
+            return None
+        best: Optional[Tuple[int, str, str]] = None
+        best_rank = len(self.priority)
+        idx = start_idx
+        while True:
+            for pack_name, phonemes in node.phonemes.items():
+                rank = self._priority_rank[pack_name]
+                if rank <= best_rank:
+                    best = (idx, phonemes, pack_name)
+                    best_rank = rank
+            sep_idx = idx + 1
+            word_idx = idx + 2
+            if word_idx >= len(tokens):
+                break
+            sep = tokens[sep_idx]
+            if sep["type"] != "sep" or not sep["text"].isspace():
+                break
+            if tokens[word_idx]["type"] != "word":
+                break
+            node = node.children.get(tokens[word_idx]["text"].lower())
+            if node is None:
+                break
+            idx = word_idx
+        return best
+
+    def _build_phrase_trie(self) -> "PhraseTrieNode":
+        root = PhraseTrieNode()
+        for name in self.priority:
+            pack = self.packs.get(name)
+            if not pack:
                 continue
-            for entry in entries:
-                words = entry["words"]
-                if words[0] != start_word:
-                    continue
-                end_idx = self._match_phrase_at(tokens, start_idx, words)
-                if end_idx is not None:
-                    return end_idx, entry["phonemes"], pack_name
-        return None
+            if isinstance(pack.entries, CompiledPack):
+                items = pack.entries.phrase_items()
+            else:
+                items = pack.entries.items()
+            for key, value in items:
+                self._insert_phrase(root, name, key, value)
+        return root
 
     @staticmethod
-    def _match_phrase_at(
-        tokens: List[Dict[str, str]], start_idx: int, words: List[str]
-    ) -> Optional[int]:
-        idx = start_idx
-        for word_idx, word in enumerate(words):
-            if idx >= len(tokens) or tokens[idx]["type"] != "word":
-                return None
-            if tokens[idx]["text"].lower() != word:
-                return None
-            idx += 1
-            if word_idx == len(words) - 1:
-                return idx - 1
-            if idx >= len(tokens):
-                return None
-            if tokens[idx]["type"] != "sep" or not tokens[idx]["text"].isspace():
-                return None
-            idx += 1
-        return None
-
-    def _phrase_entries_by_pack(self) -> Dict[str, List[Dict[str, object]]]:
-        phrase_entries: Dict[str, List[Dict[str, object]]] = {}
-        for name, pack in self.packs.items():
-            entries = []
-            for key, value in pack.entries.items():
-                if " " not in key or not value:
-                    continue
-                words = [word for word in key.split() if word]
-                if not words:
-                    continue
-                entries.append({"words": words, "phonemes": value})
-            if entries:
-                entries.sort(key=lambda item: len(item["words"]), reverse=True)
-                phrase_entries[name] = entries
-        return phrase_entries
+    def _insert_phrase(root: "PhraseTrieNode", pack_name: str, key: str, phonemes: str) -> None:
+        if " " not in key or not phonemes:
+            return
+        words = [word for word in key.split() if word]
+        if not words:
+            return
+        node = root
+        for word in words:
+            child = node.children.get(word)
+            if child is None:
+                child = PhraseTrieNode()
+                node.children[word] = child
+            node = child
+        node.phonemes[pack_name] = phonemes
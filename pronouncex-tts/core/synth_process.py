@@ -0,0 +1,209 @@
+import multiprocessing as mp
+import threading
+import weakref
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_BUFFER_SAMPLES = 22050 * 30
+_READY_TIMEOUT_SECONDS = 600
+
+
+class SynthProcessError(RuntimeError):
+    pass
+
+
+def _child_main(
+    conn,
+    model_id: str,
+    voice_id: Optional[str],
+    gpu: bool,
+    threads: int,
+    synth_factory: Optional[Callable[..., Any]],
+) -> None:
+    if threads > 0:
+        try:
+            import torch
+
+            torch.set_num_threads(threads)
+        except Exception:
+            pass
+    try:
+        if synth_factory is None:
+            from core.synth import Synthesizer
+
+            synth_factory = Synthesizer
+        synth = synth_factory(model_id, voice_id=voice_id, gpu=gpu)
+    except Exception as exc:
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+        return
+    conn.send(
+        (
+            "ready",
+            {
+                "supports_speaker": bool(synth.supports_speaker_selection()),
+                "effective_voice_id": synth.effective_voice_id(),
+                "supports_phonemes": bool(getattr(synth, "supports_phonemes", False)),
+            },
+        )
+    )
+
+    shm: Optional[shared_memory.SharedMemory] = None
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message[0] == "close":
+                break
+            _, text, phoneme_text, shm_name = message
+            try:
+                audio, sample_rate, used_phonemes = synth.synthesize(text, phoneme_text)
+                samples = np.asarray(audio, dtype=np.float32).ravel()
+            except Exception as exc:
+                conn.send(("error", str(exc)))
+                continue
+            if shm is None or shm.name != shm_name:
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+            if samples.nbytes > shm.size:
+                # The parent owns the buffers; ask for a bigger one and wait
+                # for its name.
+                conn.send(("grow", samples.nbytes))
+                shm.close()
+                shm = shared_memory.SharedMemory(name=conn.recv())
+            np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)[:] = samples
+            conn.send(("ok", int(samples.size), int(sample_rate), bool(used_phonemes)))
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+def _release_buffer(shm: Optional[shared_memory.SharedMemory]) -> None:
+    if shm is None:
+        return
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _shutdown(process, conn, buffers: Dict[str, Any]) -> None:
+    try:
+        conn.send(("close",))
+    except Exception:
+        pass
+    process.join(timeout=5)
+    if process.is_alive():
+        process.terminate()
+        process.join(timeout=5)
+    conn.close()
+    _release_buffer(buffers.pop("shm", None))
+
+
+class ProcessSynthesizer:
+    """
+    Synthesizer proxy that runs the model in a dedicated child process.
+
+    The child loads the model once and serves one ``synthesize`` call at a
+    time. Audio is written as float32 samples into a shared memory buffer
+    owned by the parent, so only the sample count crosses the pipe. Exposes
+    the same surface the job manager uses on ``Synthesizer``.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        voice_id: Optional[str] = None,
+        gpu: bool = False,
+        *,
+        threads: int = 0,
+        buffer_samples: int = DEFAULT_BUFFER_SAMPLES,
+        synth_factory: Optional[Callable[..., Any]] = None,
+    ):
+        self.model_id = model_id
+        self.voice_id = voice_id
+        self._lock = threading.Lock()
+        self._alive = False
+        ctx = mp.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_child_main,
+            args=(child_conn, model_id, voice_id, gpu, threads, synth_factory),
+            name=f"px-synth-{model_id}",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        # Held in a dict so the finalizer sees buffers swapped in by _grow.
+        self._buffers: Dict[str, Any] = {
+            "shm": shared_memory.SharedMemory(create=True, size=max(buffer_samples, 1) * 4)
+        }
+        self._finalizer = weakref.finalize(self, _shutdown, self._process, self._conn, self._buffers)
+
+        if not self._conn.poll(_READY_TIMEOUT_SECONDS):
+            self.close()
+            raise SynthProcessError(f"synth process for {model_id} did not start")
+        status, payload = self._recv()
+        if status != "ready":
+            self.close()
+            raise SynthProcessError(str(payload))
+        self._alive = True
+        self._supports_speaker = payload["supports_speaker"]
+        self._effective_voice_id = payload["effective_voice_id"]
+        self.supports_phonemes = payload["supports_phonemes"]
+
+    @property
+    def alive(self) -> bool:
+        return self._alive and self._process.is_alive()
+
+    def _recv(self) -> Tuple:
+        try:
+            return self._conn.recv()
+        except (EOFError, OSError) as exc:
+            self._alive = False
+            raise SynthProcessError(
+                f"synth process for {self.model_id} exited (code={self._process.exitcode})"
+            ) from exc
+
+    def _grow(self, nbytes: int) -> shared_memory.SharedMemory:
+        old = self._buffers["shm"]
+        self._buffers["shm"] = shared_memory.SharedMemory(create=True, size=max(nbytes, old.size * 2))
+        _release_buffer(old)
+        return self._buffers["shm"]
+
+    def supports_speaker_selection(self) -> bool:
+        return self._supports_speaker
+
+    def effective_voice_id(self) -> Optional[str]:
+        return self._effective_voice_id
+
+    def synthesize(self, text: str, phoneme_text: Optional[str]) -> Tuple[np.ndarray, int, bool]:
+        with self._lock:
+            if not self.alive:
+                raise SynthProcessError(f"synth process for {self.model_id} is not running")
+            shm = self._buffers["shm"]
+            try:
+                self._conn.send(("synth", text, phoneme_text, shm.name))
+            except (BrokenPipeError, OSError) as exc:
+                self._alive = False
+                raise SynthProcessError(f"synth process for {self.model_id} exited") from exc
+            message = self._recv()
+            if message[0] == "grow":
+                shm = self._grow(message[1])
+                self._conn.send(shm.name)
+                message = self._recv()
+            if message[0] == "error":
+                raise RuntimeError(message[1])
+            _, count, sample_rate, used_phonemes = message
+            # Copy out: the buffer is reused by the next call.
+            audio = np.ndarray((count,), dtype=np.float32, buffer=shm.buf).copy()
+            return audio, sample_rate, used_phonemes
+
+    def close(self) -> None:
+        self._alive = False
+        self._finalizer()
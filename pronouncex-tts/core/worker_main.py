@@ -1,4 +1,4 @@
-import json
+import logging
 import os
 import threading
 import time
@@ -6,7 +6,9 @@ import time
 from core.config import load_settings
 from core.jobs import JobManager
 from core.redis_client import get_redis, safe_ping, set_client_name
-from core.redis_queue import RedisJobQueue
+from core.redis_queue import RedisJobQueue, RedisStreamJobQueue
+
+logger = logging.getLogger(__name__)
 
 
 def main() -> None:
@@ -30,17 +32,15 @@ def main() -> None:
 
     def _sweep_stale_jobs() -> None:
         while True:
-            for key in client.scan_iter(match="px:job:*", count=50):
-                raw = client.get(key)
-                if not raw:
-                    continue
-                try:
-                    payload = json.loads(raw)
-                except json.JSONDecodeError:
+            for payload in job_manager.jobs.scan():
+                if payload.get("work_unit") == "segment":
+                    job_manager.requeue_stalled_segments(payload)
                     continue
                 if payload.get("status") != "in_progress":
                     continue
-                job_id = payload.get("job_id") or key.split("px:job:")[-1]
+                job_id = payload.get("job_id")
+                if not job_id:
+                    continue
                 claim_key = f"px:claim:{job_id}"
                 if client.exists(claim_key):
                     continue
@@ -49,33 +49,63 @@ def main() -> None:
                     queue.enqueue(job_id)
             time.sleep(10)
 
-    threading.Thread(target=_sweep_stale_jobs, daemon=True).start()
+    job_manager = JobManager(settings, role="worker", redis_client=client)
 
     queue = RedisJobQueue(client)
-    job_manager = JobManager(settings, role="worker", redis_client=client)
 
-    while True:
-        job_id = queue.dequeue(block=True, timeout=5)
-        if not job_id:
-            continue
-        claim_key = f"px:claim:{job_id}"
-        if not client.set(claim_key, str(worker_id), ex=60, nx=True):
-            continue
-
-        stop_event = threading.Event()
-
-        def _refresh_claim() -> None:
-            while not stop_event.wait(20):
-                client.set(claim_key, str(worker_id), ex=60)
-
-        refresher = threading.Thread(target=_refresh_claim, daemon=True)
-        refresher.start()
-        try:
-            job_manager.process_job(job_id)
-        finally:
-            stop_event.set()
-            client.delete(claim_key)
-        time.sleep(0.01)
+    if job_manager.segment_queue is not None:
+        # Segment fan-out: claim individual segments instead of whole jobs.
+        threading.Thread(target=_sweep_stale_jobs, daemon=True).start()
+        job_manager.run_segment_workers(f"px-worker:{worker_id}")
+        return
+
+    if settings.queue_backend == "stream":
+        # Pending entries replace claim keys and the stale-job sweep.
+        stream_queue = RedisStreamJobQueue(client, consumer=f"px-worker:{worker_id}")
+
+        def _consume() -> None:
+            while True:
+                job_id = stream_queue.dequeue(block=True, timeout=5)
+                if not job_id:
+                    continue
+                try:
+                    job_manager.process_queued_job(job_id, stream_queue)
+                except Exception:
+                    logger.exception("Job %s failed; leaving it pending for redelivery", job_id)
+
+    else:
+        threading.Thread(target=_sweep_stale_jobs, daemon=True).start()
+
+        def _consume() -> None:
+            while True:
+                job_id = queue.dequeue(block=True, timeout=5)
+                if not job_id:
+                    continue
+                claim_key = f"px:claim:{job_id}"
+                if not client.set(claim_key, str(worker_id), ex=60, nx=True):
+                    continue
+
+                stop_event = threading.Event()
+
+                def _refresh_claim() -> None:
+                    while not stop_event.wait(20):
+                        client.set(claim_key, str(worker_id), ex=60)
+
+                refresher = threading.Thread(target=_refresh_claim, daemon=True)
+                refresher.start()
+                try:
+                    job_manager.process_job(job_id)
+                finally:
+                    stop_event.set()
+                    client.delete(claim_key)
+                time.sleep(0.01)
+
+    # Stream entries stay pending per job, so stream workers take up to
+    # max_workers jobs at once; list workers keep to one job at a time.
+    consumers = settings.max_workers if settings.queue_backend == "stream" else 1
+    for _ in range(1, consumers):
+        threading.Thread(target=_consume, daemon=True).start()
+    _consume()
 
 
 if __name__ == "__main__":
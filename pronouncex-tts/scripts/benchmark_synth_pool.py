@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+from core.config import Settings, load_settings  # noqa: E402
+from core.jobs import JobManager, JobRequest  # noqa: E402
+
+
+def _settings(base: Settings, root: Path, pool_size: int, args: argparse.Namespace) -> Settings:
+    dirs = {
+        name: root / name for name in ("cache_dir", "jobs_dir", "segments_dir", "tmp_dir")
+    }
+    for path in dirs.values():
+        path.mkdir(parents=True, exist_ok=True)
+    return replace(
+        base,
+        **dirs,
+        role="api",
+        redis_url=None,
+        model_id=args.model,
+        model_allowlist=[*base.model_allowlist, args.model],
+        max_workers=pool_size,
+        synth_concurrency=args.concurrency,
+        synth_threads=args.threads,
+        gpu=args.gpu,
+        chunk_target_chars=args.chunk_chars,
+        chunk_max_chars=args.chunk_chars * 2,
+        max_text_chars=max(base.max_text_chars, len(args.text)),
+        max_segments=max(base.max_segments, len(args.text)),
+        require_workers=False,
+        warmup_default_model=False,
+    )
+
+
+def _run(manager: JobManager, text: str, pool_size: int) -> float:
+    def submit() -> Dict:
+        return manager.submit(
+            JobRequest(
+                text=text,
+                model_id=manager.settings.model_id,
+                voice_id=None,
+                reading_profile=manager.settings.reading_profile,
+                prefer_phonemes=True,
+            )
+        )
+
+    def run(job: Dict, segments: list) -> None:
+        # Drive the same path a worker takes for a cache miss: claim a pooled
+        # synthesizer, synthesize, encode, store.
+        def work(segment: Dict) -> None:
+            manager._synthesize_segment(
+                job["job_id"],
+                segment["segment_id"],
+                segment,
+                manager.settings.model_id,
+                None,
+                True,
+                time.perf_counter(),
+                None,
+                None,
+                lambda: None,
+            )
+
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            list(executor.map(work, segments))
+
+    # Submit both jobs before synthesizing so neither is served from cache.
+    job, warmup = submit(), submit()
+    # One untimed segment per synthesizer so model warmup does not skew the numbers.
+    run(warmup, warmup["segments"][:pool_size])
+
+    start = time.perf_counter()
+    run(job, job["segments"])
+    elapsed = time.perf_counter() - start
+    return len(job["segments"]) / elapsed if elapsed else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure in-process synthesis throughput against synthesizer pool size."
+    )
+    parser.add_argument("--text-file", required=True, help="Path to text file for synthesis")
+    parser.add_argument("--model", default="tts_models/en/ljspeech/vits", help="Model ID")
+    parser.add_argument("--pool-sizes", default="1,2,4", help="Comma-separated pool sizes")
+    parser.add_argument(
+        "--concurrency",
+        choices=["instance", "model", "global"],
+        default="instance",
+        help="PRONOUNCEX_TTS_SYNTH_CONCURRENCY mode to benchmark",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="torch threads (0 = CPU count divided by pool size)",
+    )
+    parser.add_argument("--chunk-chars", type=int, default=300, help="Target segment size")
+    parser.add_argument("--gpu", action="store_true")
+    args = parser.parse_args()
+
+    args.text = Path(args.text_file).read_text(encoding="utf-8").strip()
+    if not args.text:
+        raise SystemExit("Text file is empty")
+    pool_sizes = [int(item) for item in args.pool_sizes.split(",") if item.strip()]
+
+    base = load_settings()
+    print(f"model={args.model}, concurrency={args.concurrency}")
+    for pool_size in pool_sizes:
+        with tempfile.TemporaryDirectory(prefix="px-bench-") as root:
+            manager = JobManager(_settings(base, Path(root), pool_size, args))
+            manager._apply_synth_thread_budget()
+            rate = _run(manager, args.text, pool_size)
+        print(f"pool_size={pool_size}: {rate:.2f} segments/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import time
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+TERMINAL = {"complete", "complete_with_errors", "canceled", "error"}
+
+
+def _request_json(method: str, url: str, payload=None):
+    data = None
+    headers = {}
+    if payload is not None:
+        data = json.dumps(payload).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    request = Request(url, data=data, headers=headers, method=method)
+    with urlopen(request) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Submit concurrent jobs and report segment throughput across workers."
+    )
+    parser.add_argument("--text-file", required=True, help="Path to text file for each job")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of jobs to submit at once")
+    parser.add_argument("--timeout", type=int, default=1800, help="Seconds to wait for completion")
+    parser.add_argument("--no-phonemes", action="store_true")
+    args = parser.parse_args()
+
+    text = Path(args.text_file).read_text(encoding="utf-8").strip()
+    if not text:
+        raise SystemExit("Text file is empty")
+
+    metrics = _request_json("GET", f"{args.base_url}/v1/metrics")
+    start = time.perf_counter()
+    job_ids = []
+    for index in range(args.jobs):
+        # Vary the text so the segment cache does not absorb the load.
+        payload = {"text": f"Run {index}, {time.time()}. {text}", "prefer_phonemes": not args.no_phonemes}
+        job_ids.append(_request_json("POST", f"{args.base_url}/v1/tts/jobs", payload)["job_id"])
+
+    manifests = {}
+    deadline = time.time() + args.timeout
+    while len(manifests) < len(job_ids) and time.time() < deadline:
+        for job_id in job_ids:
+            if job_id in manifests:
+                continue
+            manifest = _request_json("GET", f"{args.base_url}/v1/tts/jobs/{job_id}").get("manifest") or {}
+            if manifest.get("status") in TERMINAL:
+                manifests[job_id] = manifest
+        time.sleep(0.5)
+    elapsed = time.perf_counter() - start
+
+    segments = sum(len(manifest.get("segments", [])) for manifest in manifests.values())
+    print(f"workers_online={metrics.get('workers_online')} jobs={len(manifests)}/{len(job_ids)}")
+    print(f"elapsed={elapsed:.2f}s segments={segments} segments_per_sec={segments / elapsed:.2f}")
+    for job_id, manifest in manifests.items():
+        print(f"{job_id} status={manifest.get('status')} timing_total_ms={manifest.get('timing_total_ms')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import core.encode as encode
+from core.encode import encode_to_ogg_opus
+
+
+def test_soundfile_encoder_writes_opus_without_ffmpeg(monkeypatch, tmp_path):
+    if not encode.soundfile_opus_available():
+        pytest.skip("libsndfile without OGG/Opus support")
+    monkeypatch.setattr(
+        encode, "encode_ogg_opus_ffmpeg", lambda *args: pytest.fail("ffmpeg should not run")
+    )
+    audio = np.sin(np.linspace(0, 2000 * np.pi, 22050)).astype(np.float32)
+    output_path = tmp_path / "segments" / "seg.ogg"
+
+    assert encode_to_ogg_opus(audio, 22050, output_path, tmp_path / "tmp") == "soundfile"
+
+    info = sf.info(str(output_path))
+    assert info.format == "OGG"
+    assert info.subtype == "OPUS"
+    assert abs(info.duration - 1.0) < 0.05
+    assert not (tmp_path / "tmp").exists()
+
+
+def test_auto_encoder_falls_back_to_ffmpeg(monkeypatch, tmp_path):
+    calls = []
+
+    def failing_soundfile(audio, sample_rate, output_path):
+        raise encode.AudioEncodingError("no opus")
+
+    monkeypatch.setattr(encode, "soundfile_opus_available", lambda: True)
+    monkeypatch.setattr(encode, "encode_ogg_opus_soundfile", failing_soundfile)
+    monkeypatch.setattr(encode, "encode_ogg_opus_ffmpeg", lambda *args: calls.append(args))
+
+    assert encode_to_ogg_opus([0.0], 22050, tmp_path / "seg.ogg", tmp_path) == "ffmpeg"
+    assert len(calls) == 1
+    with pytest.raises(encode.AudioEncodingError):
+        encode_to_ogg_opus([0.0], 22050, tmp_path / "seg.ogg", tmp_path, encoder="soundfile")
+
+
+class FakeFfmpeg:
+    spawned = []
+
+    def __init__(self, command, stdin=None, stdout=None, stderr=None):
+        self.command = command
+        self.returncode = None
+        self.dead = False
+        FakeFfmpeg.spawned.append(self)
+
+    def poll(self):
+        return -9 if self.dead else self.returncode
+
+    def communicate(self, input=None):
+        self.returncode = 0
+        return b"OggS" + input[:4], b""
+
+    def kill(self):
+        self.dead = True
+
+    def wait(self):
+        return self.returncode
+
+
+def _wait_for_spares(pool, count):
+    # Spares are started on a background thread after each acquire.
+    deadline = time.monotonic() + 5
+    while pool.stats().idle < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.stats().idle == count
+
+
+def test_ffmpeg_pool_reuses_spares_and_replaces_dead_ones(monkeypatch, tmp_path):
+    FakeFfmpeg.spawned = []
+    monkeypatch.setattr(encode.subprocess, "Popen", FakeFfmpeg)
+    pool = encode.FfmpegEncoderPool(size=1)
+    monkeypatch.setattr(encode, "_ffmpeg_pool", pool)
+
+    output_path = tmp_path / "seg.ogg"
+    encode.encode_ogg_opus_ffmpeg([0.5], 22050, output_path, tmp_path)
+    assert output_path.read_bytes() == b"OggS" + np.float32(0.5).tobytes()
+    assert "22050" in FakeFfmpeg.spawned[0].command
+
+    _wait_for_spares(pool, 1)
+    encode.encode_ogg_opus_ffmpeg([0.5], 22050, output_path, tmp_path)
+    _wait_for_spares(pool, 1)
+    FakeFfmpeg.spawned[-1].dead = True
+    encode.encode_ogg_opus_ffmpeg([0.5], 22050, output_path, tmp_path)
+    _wait_for_spares(pool, 1)
+
+    stats = pool.stats()
+    assert stats.spare_misses == 2
+    assert stats.spare_hits == 1
+    assert stats.restarts == 1
+    assert stats.idle == 1
+    assert not list(tmp_path.glob("*.wav"))
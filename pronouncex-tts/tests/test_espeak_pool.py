@@ -0,0 +1,73 @@
+import pytest
+
+from core import fallback_espeak
+from core.fallback_espeak import EspeakBackendPool
+
+
+class FakeBackend:
+    created = 0
+
+    def __init__(self, language, preserve_punctuation=False, with_stress=False):
+        FakeBackend.created += 1
+        self.language = language
+
+    def phonemize(self, lines, separator=None, strip=False):
+        return [f"{self.language}:{line.lower()}" for line in lines]
+
+
+def test_pool_reuses_warmed_backend(monkeypatch):
+    FakeBackend.created = 0
+    monkeypatch.setattr(fallback_espeak, "EspeakBackend", FakeBackend)
+    pool = EspeakBackendPool()
+
+    assert pool.warm(count=2) == 2
+    assert pool.warm(count=2) == 0
+    assert pool.phonemize(["Gojo"]) == ["en-us:gojo"]
+    assert pool.phonemize(["Yuta"]) == ["en-us:yuta"]
+
+    stats = pool.stats()
+    assert FakeBackend.created == 2
+    assert stats.backends == 2
+    assert stats.hits == 2
+    assert stats.misses == 0
+    assert stats.calls == 2
+
+
+def test_pool_keys_backends_by_language_and_flags(monkeypatch):
+    FakeBackend.created = 0
+    monkeypatch.setattr(fallback_espeak, "EspeakBackend", FakeBackend)
+    pool = EspeakBackendPool()
+    pool.warm()
+
+    assert pool.phonemize(["Gojo"], language="fr-fr") == ["fr-fr:gojo"]
+    pool.phonemize(["Gojo"], with_stress=False)
+
+    stats = pool.stats()
+    assert stats.backends == 3
+    assert stats.hits == 0
+    assert stats.misses == 2
+
+
+def test_phonemize_espeak_batch_uses_shared_pool(monkeypatch):
+    monkeypatch.setattr(fallback_espeak, "EspeakBackend", FakeBackend)
+    monkeypatch.setattr(fallback_espeak, "_pool", EspeakBackendPool())
+
+    assert fallback_espeak.phonemize_espeak_batch(["Gojo", "", "Yuta  Okkotsu"]) == [
+        "en-us:gojo",
+        None,
+        "en-us:yuta okkotsu",
+    ]
+    assert fallback_espeak.get_espeak_pool().stats().calls == 1
+
+
+def test_phonemize_espeak_batch_raises_on_backend_failure(monkeypatch):
+    class BrokenBackend(FakeBackend):
+        def phonemize(self, lines, separator=None, strip=False):
+            raise RuntimeError("espeak crashed")
+
+    monkeypatch.setattr(fallback_espeak, "EspeakBackend", BrokenBackend)
+    monkeypatch.setattr(fallback_espeak, "_pool", EspeakBackendPool())
+
+    with pytest.raises(fallback_espeak.EspeakError):
+        fallback_espeak.phonemize_espeak_batch(["Gojo"])
+    assert fallback_espeak.phonemize_espeak("Gojo") is None
@@ -1,4 +1,10 @@
+import asyncio
+import threading
+from dataclasses import replace
 from pathlib import Path
+from typing import Optional
+
+import pytest
 
 import core.jobs as jobs
 import core.synth as synth
@@ -45,6 +51,9 @@ class DummySynth:
     def effective_voice_id(self):
         return None
 
+    def supports_speaker_selection(self):
+        return False
+
     def synthesize(self, text, phoneme_text):
         return [0.0], 22050, False
 
@@ -65,13 +74,20 @@ def _build_settings(tmp_path: Path) -> Settings:
             model_id_quality="dummy",
             model_allowlist=["dummy"],
             phoneme_mode="espeak",
+            resolve_batch_scope="segment",
+            resolve_memo_size=50000,
             role="all",
             redis_url=None,
+            work_unit="job",
+            queue_backend="list",
+            job_store_layout="json",
+            priority_head_segments=2,
             enable_autolearn=False,
             autolearn_on_miss=False,
             autolearn_path=autolearn_path,
             autolearn_flush_seconds=5,
             autolearn_min_len=3,
+            cache_key_dict_scope="segment",
             dict_dir=dict_dir,
             compiled_dir=compiled_dir,
             cache_dir=cache_dir,
@@ -82,15 +98,26 @@ def _build_settings(tmp_path: Path) -> Settings:
             compiler_version="1.0.0",
             public_segment_base_url="/api/tts",
             parallel_encode=False,
+            audio_encoder="auto",
+            encode_workers=2,
             max_workers=2,
             per_job_workers=1,
             max_text_chars=20000,
             max_segments=120,
             max_active_jobs=10,
             max_concurrent_segments=2,
+            synth_concurrency="instance",
+            synth_threads=0,
+            synth_executor="thread",
+            synth_coalesce_seconds=60.0,
             min_segment_chars=1,
             require_workers=False,
             jobs_ttl_seconds=24 * 3600,
+            segment_max_retries=2,
+            segment_stale_seconds=300,
+            stale_queued_seconds=3600,
+            stale_queued_require_workers=True,
+            stale_queued_abandoned_seconds=86400,
             chunk_target_chars=120,
             chunk_max_chars=240,
             gpu=False,
@@ -98,6 +125,51 @@ def _build_settings(tmp_path: Path) -> Settings:
         )
 
 
+def _request(text: str, **fields) -> JobRequest:
+    defaults = {
+        "model_id": "dummy",
+        "voice_id": None,
+        "reading_profile": {},
+        "prefer_phonemes": False,
+    }
+    return JobRequest(text=text, **{**defaults, **fields})
+
+
+def _resolve_plain(text: str) -> ResolveResult:
+    return ResolveResult(text=text, phoneme_text=None, dict_versions={}, source_counts={})
+
+
+@pytest.fixture
+def fake_encode(monkeypatch):
+    def encode(audio, sample_rate, output_path, tmp_dir, encoder="auto"):
+        Path(output_path).write_bytes(b"OggS")
+        return {"ok": True, "error": None, "encode_ms": 0.0}
+
+    monkeypatch.setattr(jobs, "_encode_with_timing", encode)
+
+
+@pytest.fixture
+def make_manager(monkeypatch, tmp_path):
+    """
+    Build a JobManager without background workers: one segment per word,
+    text passed through the resolver untouched and every pooled
+    synthesizer made by ``synth_class``.
+    """
+    monkeypatch.setattr(jobs.JobManager, "_worker_loop", lambda self: None)
+
+    def make(synth_class=DummySynth, root: Optional[Path] = None, **overrides) -> JobManager:
+        settings = replace(
+            _build_settings(root or tmp_path),
+            **{"chunk_target_chars": 3, "chunk_max_chars": 6, **overrides},
+        )
+        job_manager = JobManager(settings)
+        job_manager.resolver.resolve_text = _resolve_plain
+        job_manager._create_synthesizer = lambda model_id, voice_id: synth_class()
+        return job_manager
+
+    return make
+
+
 def test_voice_id_propagates_and_cache_key_changes_when_supported(monkeypatch, tmp_path):
     monkeypatch.setattr(synth, "TTS", DummyTTS)
     monkeypatch.setattr(jobs.JobManager, "_worker_loop", lambda self: None)
@@ -164,6 +236,30 @@ def test_reading_profile_does_not_affect_cache_key(monkeypatch, tmp_path):
     assert job_a["segments"][0]["cache_key"] == job_b["segments"][0]["cache_key"]
 
 
+def test_dictionary_edit_only_changes_keys_of_affected_segments(monkeypatch, tmp_path):
+    monkeypatch.setattr(jobs.JobManager, "_worker_loop", lambda self: None)
+
+    settings = _build_settings(tmp_path)
+    job_manager = JobManager(settings)
+
+    def submit(text: str) -> dict:
+        return job_manager.submit(_request(text, prefer_phonemes=True))
+
+    gojo_before = submit("Gojo arrives.")["segments"][0]["cache_key"]
+    yuta_before = submit("Yuta arrives.")["segments"][0]["cache_key"]
+
+    job_manager.resolver.set_entry("local_overrides", "gojo", "G2", "9.9.9")
+
+    gojo_after = submit("Gojo arrives.")["segments"][0]["cache_key"]
+    yuta_after = submit("Yuta arrives.")["segments"][0]["cache_key"]
+
+    assert gojo_after != gojo_before
+    assert yuta_after == yuta_before
+    metrics = job_manager.metrics.snapshot()
+    assert metrics.cache_keys_built == 4
+    assert metrics.cache_keys_churned == 1
+
+
 def test_segment_url_base_override(monkeypatch, tmp_path):
     monkeypatch.setattr(jobs.JobManager, "_worker_loop", lambda self: None)
 
@@ -174,13 +270,20 @@ def test_segment_url_base_override(monkeypatch, tmp_path):
             model_id_quality=settings.model_id_quality,
             model_allowlist=settings.model_allowlist,
             phoneme_mode=settings.phoneme_mode,
+            resolve_batch_scope=settings.resolve_batch_scope,
+            resolve_memo_size=settings.resolve_memo_size,
             role=settings.role,
             redis_url=settings.redis_url,
+            work_unit=settings.work_unit,
+            queue_backend=settings.queue_backend,
+            job_store_layout=settings.job_store_layout,
+            priority_head_segments=settings.priority_head_segments,
             enable_autolearn=settings.enable_autolearn,
             autolearn_on_miss=settings.autolearn_on_miss,
             autolearn_path=settings.autolearn_path,
             autolearn_flush_seconds=settings.autolearn_flush_seconds,
             autolearn_min_len=settings.autolearn_min_len,
+            cache_key_dict_scope=settings.cache_key_dict_scope,
             dict_dir=settings.dict_dir,
             compiled_dir=settings.compiled_dir,
             cache_dir=settings.cache_dir,
@@ -191,15 +294,26 @@ def test_segment_url_base_override(monkeypatch, tmp_path):
             compiler_version=settings.compiler_version,
             public_segment_base_url="/proxy/tts",
             parallel_encode=settings.parallel_encode,
+            audio_encoder=settings.audio_encoder,
+            encode_workers=settings.encode_workers,
             max_workers=settings.max_workers,
             per_job_workers=settings.per_job_workers,
             max_text_chars=settings.max_text_chars,
             max_segments=settings.max_segments,
             max_active_jobs=settings.max_active_jobs,
             max_concurrent_segments=settings.max_concurrent_segments,
+            synth_concurrency=settings.synth_concurrency,
+            synth_threads=settings.synth_threads,
+            synth_executor=settings.synth_executor,
+            synth_coalesce_seconds=settings.synth_coalesce_seconds,
             min_segment_chars=settings.min_segment_chars,
             require_workers=False,
             jobs_ttl_seconds=settings.jobs_ttl_seconds,
+            segment_max_retries=settings.segment_max_retries,
+            segment_stale_seconds=settings.segment_stale_seconds,
+            stale_queued_seconds=settings.stale_queued_seconds,
+            stale_queued_require_workers=settings.stale_queued_require_workers,
+            stale_queued_abandoned_seconds=settings.stale_queued_abandoned_seconds,
             chunk_target_chars=settings.chunk_target_chars,
             chunk_max_chars=settings.chunk_max_chars,
             gpu=settings.gpu,
@@ -289,7 +403,7 @@ def test_parallel_segment_workers_complete(monkeypatch, tmp_path):
     monkeypatch.setattr(
         jobs,
         "_encode_with_timing",
-        lambda audio, sample_rate, output_path, tmp_dir: {"ok": True, "error": None, "encode_ms": 0.0},
+        lambda audio, sample_rate, output_path, tmp_dir, encoder="auto": {"ok": True, "error": None, "encode_ms": 0.0},
     )
 
     settings = _build_settings(tmp_path)
@@ -299,13 +413,20 @@ def test_parallel_segment_workers_complete(monkeypatch, tmp_path):
             model_id_quality=settings.model_id_quality,
             model_allowlist=settings.model_allowlist,
             phoneme_mode=settings.phoneme_mode,
+            resolve_batch_scope=settings.resolve_batch_scope,
+            resolve_memo_size=settings.resolve_memo_size,
             role=settings.role,
             redis_url=settings.redis_url,
+            work_unit=settings.work_unit,
+            queue_backend=settings.queue_backend,
+            job_store_layout=settings.job_store_layout,
+            priority_head_segments=settings.priority_head_segments,
             enable_autolearn=settings.enable_autolearn,
             autolearn_on_miss=settings.autolearn_on_miss,
             autolearn_path=settings.autolearn_path,
             autolearn_flush_seconds=settings.autolearn_flush_seconds,
             autolearn_min_len=settings.autolearn_min_len,
+            cache_key_dict_scope=settings.cache_key_dict_scope,
             dict_dir=settings.dict_dir,
             compiled_dir=settings.compiled_dir,
             cache_dir=settings.cache_dir,
@@ -316,15 +437,26 @@ def test_parallel_segment_workers_complete(monkeypatch, tmp_path):
             compiler_version=settings.compiler_version,
             public_segment_base_url=settings.public_segment_base_url,
             parallel_encode=settings.parallel_encode,
+            audio_encoder=settings.audio_encoder,
+            encode_workers=settings.encode_workers,
             max_workers=settings.max_workers,
             per_job_workers=2,
             max_text_chars=settings.max_text_chars,
             max_segments=settings.max_segments,
             max_active_jobs=settings.max_active_jobs,
             max_concurrent_segments=settings.max_concurrent_segments,
+            synth_concurrency=settings.synth_concurrency,
+            synth_threads=settings.synth_threads,
+            synth_executor=settings.synth_executor,
+            synth_coalesce_seconds=settings.synth_coalesce_seconds,
             min_segment_chars=settings.min_segment_chars,
             require_workers=False,
             jobs_ttl_seconds=settings.jobs_ttl_seconds,
+            segment_max_retries=settings.segment_max_retries,
+            segment_stale_seconds=settings.segment_stale_seconds,
+            stale_queued_seconds=settings.stale_queued_seconds,
+            stale_queued_require_workers=settings.stale_queued_require_workers,
+            stale_queued_abandoned_seconds=settings.stale_queued_abandoned_seconds,
             chunk_target_chars=3,
             chunk_max_chars=6,
             gpu=settings.gpu,
@@ -354,3 +486,193 @@ def test_parallel_segment_workers_complete(monkeypatch, tmp_path):
     stored = job_manager.jobs.get(job["job_id"])
     assert stored["status"] == "complete"
     assert all(seg["status"] == "ready" for seg in stored["segments"])
+
+
+def test_synth_guard_matches_concurrency_mode(make_manager):
+    job_manager = make_manager()
+    assert job_manager._synth_guard("dummy") is not job_manager._synth_call_lock
+
+    job_manager.settings = replace(job_manager.settings, synth_concurrency="model")
+    assert job_manager._synth_guard("a") is job_manager._synth_guard("a")
+    assert job_manager._synth_guard("a") is not job_manager._synth_guard("b")
+
+    job_manager.settings = replace(job_manager.settings, synth_concurrency="global")
+    assert job_manager._synth_guard("a") is job_manager._synth_call_lock
+
+
+def test_pooled_synthesizers_overlap_only_in_instance_mode(make_manager, fake_encode, tmp_path):
+    def peak_concurrency(mode: str) -> int:
+        lock = threading.Lock()
+        both_inside = threading.Event()
+        active = [0]
+        peak = [0]
+
+        class BlockingSynth(DummySynth):
+            def synthesize(self, text, phoneme_text):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                    if active[0] == 2:
+                        both_inside.set()
+                # Blocks until the other segment is inside synthesize too, or
+                # gives up if the mode serializes them.
+                both_inside.wait(timeout=0.5)
+                with lock:
+                    active[0] -= 1
+                return super().synthesize(text, phoneme_text)
+
+        job_manager = make_manager(
+            BlockingSynth, root=tmp_path / mode, per_job_workers=2, synth_concurrency=mode
+        )
+        job = job_manager.submit(_request("hello world"))
+        assert len(job["segments"]) == 2
+        job_manager._process_job(job["job_id"])
+        assert job_manager.jobs.get(job["job_id"])["status"] == "complete"
+        return peak[0]
+
+    assert peak_concurrency("instance") == 2
+    assert peak_concurrency("global") == 1
+
+
+def test_next_segment_synthesizes_while_previous_encodes(make_manager, monkeypatch):
+    second_synth = threading.Event()
+    encode_lock = threading.Lock()
+    encoded = []
+    overlapped = []
+
+    class CountingSynth(DummySynth):
+        calls = 0
+
+        def synthesize(self, text, phoneme_text):
+            CountingSynth.calls += 1
+            if CountingSynth.calls == 2:
+                second_synth.set()
+            return super().synthesize(text, phoneme_text)
+
+    def slow_encode(audio, sample_rate, output_path, tmp_dir, encoder="auto"):
+        # Encodes can run side by side, so pick the first one under a lock.
+        with encode_lock:
+            encoded.append(output_path)
+            first = len(encoded) == 1
+        if first:
+            # The first encode only finishes once the next segment is being synthesized.
+            overlapped.append(second_synth.wait(timeout=5))
+        return {"ok": True, "error": None, "encoder": "soundfile", "encode_ms": 1.0}
+
+    monkeypatch.setattr(jobs, "_encode_with_timing", slow_encode)
+    job_manager = make_manager(CountingSynth, parallel_encode=True)
+
+    job = job_manager.submit(_request("hello world"))
+    job_manager._process_job(job["job_id"])
+
+    stored = job_manager.jobs.get(job["job_id"])
+    assert overlapped == [True]
+    assert stored["status"] == "complete"
+    assert all(seg["status"] == "ready" for seg in stored["segments"])
+    assert all(seg["encoder"] == "soundfile" for seg in stored["segments"])
+
+
+def test_local_queue_serves_higher_priority_first():
+    queue = jobs.LocalJobQueue()
+    queue.enqueue("old-low", priority="low")
+    queue.enqueue("normal-1")
+    queue.enqueue("high", priority="high")
+    queue.enqueue("normal-2")
+
+    order = [queue.dequeue(block=False) for _ in range(4)]
+    assert order == ["high", "normal-1", "normal-2", "old-low"]
+
+
+def test_first_ready_segment_records_ttfa(make_manager, fake_encode):
+    job_manager = make_manager()
+
+    job = job_manager.submit(_request("hello world", priority="high"))
+    job_manager._process_job(job["job_id"])
+
+    stored = job_manager.jobs.get(job["job_id"])
+    assert stored["priority"] == "high"
+    assert stored["ttfa_ms"] >= 0.0
+    snapshot = job_manager.metrics.snapshot()
+    assert len(snapshot.ttfa_ms["high"]) == 1
+    assert snapshot.ttfa_percentile("high", 95) == stored["ttfa_ms"]
+
+
+def test_job_events_publish_segment_and_job_transitions(make_manager, fake_encode):
+    job_manager = make_manager()
+    job = job_manager.submit(_request("hello world"))
+
+    async def collect():
+        with job_manager.events.subscribe(job["job_id"]) as subscription:
+            await asyncio.to_thread(job_manager._process_job, job["job_id"])
+            events = subscription.drain()
+            assert await subscription.next(timeout=0.01) is None
+        assert job_manager.events.subscriber_count() == 0
+        return events
+
+    events = asyncio.run(collect())
+    segment_ids = [seg["segment_id"] for seg in job["segments"]]
+    ready = [event["segment_id"] for event in events if event.get("status") == "ready"]
+    assert sorted(ready) == sorted(segment_ids)
+    job_statuses = [event["status"] for event in events if event["type"] == "job"]
+    assert job_statuses == ["in_progress", "complete"]
+    assert all(event["job_id"] == job["job_id"] for event in events)
+
+
+def test_submit_marks_cached_segments_ready_and_skips_queue(make_manager, fake_encode):
+    job_manager = make_manager()
+
+    first = job_manager.submit(_request("hello world"))
+    job_manager._process_job(first["job_id"])
+    assert job_manager.queue.dequeue(block=False) == first["job_id"]
+
+    again = job_manager.submit(_request("hello world"))
+    assert again["status"] == "complete"
+    assert again["cache_hit_count"] == len(again["segments"]) == 2
+    assert all(seg["status"] == "ready" and seg["path"] for seg in again["segments"])
+    assert job_manager.queue.size() == 0
+    assert job_manager.active_jobs() == 0
+
+    partial = job_manager.submit(_request("hello again"))
+    statuses = {seg["text"]: seg["status"] for seg in partial["segments"]}
+    assert statuses == {"hello": "ready", "again": "queued"}
+    assert partial["status"] == "queued"
+    assert partial["ttfa_ms"] >= 0.0
+    assert job_manager.queue.dequeue(block=False) == partial["job_id"]
+
+
+def test_identical_segments_synthesize_once(make_manager, fake_encode):
+    calls = []
+    main_thread = threading.get_ident()
+    missed_by = set()
+    looked_up = threading.Condition()
+
+    class CountingSynth(DummySynth):
+        def synthesize(self, text, phoneme_text):
+            calls.append(text)
+            # Hold the flight until both segment workers have missed the cache.
+            with looked_up:
+                assert looked_up.wait_for(lambda: len(missed_by) == 2, timeout=5)
+            return super().synthesize(text, phoneme_text)
+
+    job_manager = make_manager(CountingSynth, per_job_workers=2)
+    original_get = job_manager.cache.get
+
+    def get(key):
+        path = original_get(key)
+        if path is None and threading.get_ident() != main_thread:
+            with looked_up:
+                missed_by.add(threading.get_ident())
+                looked_up.notify_all()
+        return path
+
+    job_manager.cache.get = get
+
+    job = job_manager.submit(_request("hello hello"))
+    assert len({seg["cache_key"] for seg in job["segments"]}) == 1
+    job_manager._process_job(job["job_id"])
+
+    stored = job_manager.jobs.get(job["job_id"])
+    assert stored["status"] == "complete"
+    assert calls == ["hello"]
+    assert stored["cache_hit_count"] == 1
+    assert job_manager.metrics.snapshot().coalesced_segments == 1
@@ -22,13 +22,20 @@ def _build_settings(tmp_path: Path) -> Settings:
             model_id_quality="dummy",
             model_allowlist=["dummy"],
             phoneme_mode="espeak",
+            resolve_batch_scope="segment",
+            resolve_memo_size=50000,
             role="all",
             redis_url=None,
+            work_unit="job",
+            queue_backend="list",
+            job_store_layout="json",
+            priority_head_segments=2,
             enable_autolearn=False,
             autolearn_on_miss=False,
             autolearn_path=autolearn_path,
             autolearn_flush_seconds=5,
             autolearn_min_len=3,
+            cache_key_dict_scope="segment",
             dict_dir=dict_dir,
             compiled_dir=compiled_dir,
             cache_dir=cache_dir,
@@ -39,15 +46,26 @@ def _build_settings(tmp_path: Path) -> Settings:
             compiler_version="1.0.0",
             public_segment_base_url="/api/tts",
             parallel_encode=False,
+            audio_encoder="auto",
+            encode_workers=2,
             max_workers=1,
             per_job_workers=1,
             max_text_chars=20000,
             max_segments=120,
             max_active_jobs=10,
             max_concurrent_segments=2,
+            synth_concurrency="instance",
+            synth_threads=0,
+            synth_executor="thread",
+            synth_coalesce_seconds=60.0,
             min_segment_chars=1,
             require_workers=False,
             jobs_ttl_seconds=24 * 3600,
+            segment_max_retries=2,
+            segment_stale_seconds=300,
+            stale_queued_seconds=3600,
+            stale_queued_require_workers=True,
+            stale_queued_abandoned_seconds=86400,
             chunk_target_chars=120,
             chunk_max_chars=240,
             gpu=False,
@@ -71,7 +89,7 @@ def test_manifest_phoneme_fields(monkeypatch, tmp_path):
     monkeypatch.setattr(
         jobs,
         "_encode_with_timing",
-        lambda audio, sample_rate, output_path, tmp_dir: {"ok": True, "error": None, "encode_ms": 0.0},
+        lambda audio, sample_rate, output_path, tmp_dir, encoder="auto": {"ok": True, "error": None, "encode_ms": 0.0},
     )
 
     settings = _build_settings(tmp_path)
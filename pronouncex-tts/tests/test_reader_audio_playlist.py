@@ -1,8 +1,10 @@
+import asyncio
 import importlib
 import json
 from pathlib import Path
 
 import numpy as np
+import pytest
 from fastapi.testclient import TestClient
 
 import api.app as app_module
@@ -11,6 +13,7 @@ import core.config as config
 import core.jobs as jobs
 from core.encode import encode_to_ogg_opus
 from core.jobs import JobManager
+from core.ogg import OpusConcat
 
 
 def _configure_env(monkeypatch, tmp_path) -> None:
@@ -75,6 +78,153 @@ def test_audio_merge_happy_path(monkeypatch, tmp_path):
     assert res.content[:4] == b"OggS"
 
 
+def test_audio_merge_streams_once_then_serves_cached_file(monkeypatch, tmp_path):
+    client = _build_app(monkeypatch, tmp_path)
+    segments_dir = Path(config.load_settings().segments_dir)
+    paths = [segments_dir / "m1.ogg", segments_dir / "m2.ogg"]
+    for path in paths:
+        _make_ogg(path)
+    monkeypatch.setattr(
+        tts_route, "_merge_segments", lambda *args: pytest.fail("ffmpeg merge should not run")
+    )
+
+    job_id = "job-audio-cache"
+    jobs._job_manager.jobs.set(
+        job_id,
+        {
+            "job_id": job_id,
+            "status": "complete",
+            "segments": [
+                {
+                    "index": index,
+                    "segment_id": f"s{index}",
+                    "status": "ready",
+                    "path": str(path),
+                    "cache_key": f"k{index}",
+                }
+                for index, path in enumerate(paths)
+            ],
+        },
+    )
+
+    first = client.get(f"/v1/tts/jobs/{job_id}/audio.ogg")
+    assert first.status_code == 200
+    assert first.headers["content-length"] == str(len(first.content))
+    assert "accept-ranges" not in first.headers
+    cached = list((segments_dir / job_id).glob("merged-*.ogg"))
+    assert len(cached) == 1
+    assert cached[0].read_bytes() == first.content
+    assert len(list((segments_dir / job_id).glob("merged-*.index.json"))) == 1
+
+    second = client.get(f"/v1/tts/jobs/{job_id}/audio.ogg")
+    assert second.headers["accept-ranges"] == "bytes"
+    assert second.content == first.content
+
+
+def test_audio_merge_ranges_and_seek_index(monkeypatch, tmp_path):
+    client = _build_app(monkeypatch, tmp_path)
+    segments_dir = Path(config.load_settings().segments_dir)
+    paths = [segments_dir / f"r{index}.ogg" for index in range(3)]
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        audio = (0.2 * np.sin(np.arange(22050) / 8.0)).astype(np.float32)
+        encode_to_ogg_opus(audio, 22050, path, path.parent / "tmp")
+
+    job_id = "job-audio-seek"
+    jobs._job_manager.jobs.set(
+        job_id,
+        {
+            "job_id": job_id,
+            "status": "complete",
+            "segments": [
+                {
+                    "index": index,
+                    "segment_id": f"s{index}",
+                    "status": "ready",
+                    "path": str(path),
+                    "cache_key": f"k{index}",
+                }
+                for index, path in enumerate(paths)
+            ],
+        },
+    )
+    url = f"/v1/tts/jobs/{job_id}/audio.ogg"
+
+    # A range before the merge exists builds the cache and answers 206.
+    partial = client.get(url, headers={"Range": "bytes=0-99"})
+    assert partial.status_code == 206
+    assert len(partial.content) == 100
+    merged = next((segments_dir / job_id).glob("merged-*.ogg")).read_bytes()
+    assert partial.content == merged[:100]
+
+    index = json.loads(next((segments_dir / job_id).glob("merged-*.index.json")).read_text())
+    offsets = [entry["byte_offset"] for entry in index["segments"]]
+    assert [entry["segment_id"] for entry in index["segments"]] == ["s0", "s1", "s2"]
+    assert offsets[0] == index["header_bytes"]
+    assert all(merged[offset : offset + 4] == b"OggS" for offset in offsets)
+    starts = [entry["start_ms"] for entry in index["segments"]]
+    assert starts[0] == 0.0
+    assert 950.0 < starts[1] < 1050.0 and 1950.0 < starts[2] < 2100.0
+
+    seeked = client.get(url, params={"t": 1.5})
+    assert seeked.status_code == 200
+    assert seeked.headers["x-seek-segment-id"] == "s1"
+    assert seeked.content == merged[: index["header_bytes"]] + merged[offsets[1] :]
+    assert seeked.headers["content-length"] == str(len(seeked.content))
+    assert seeked.headers["accept-ranges"] == "bytes"
+
+    # Ranges on a seek address the spliced body, across the header/audio seam.
+    seam = index["header_bytes"]
+    ranged = client.get(url, params={"t": 1.5}, headers={"Range": f"bytes={seam - 10}-{seam + 9}"})
+    assert ranged.status_code == 206
+    assert ranged.content == seeked.content[seam - 10 : seam + 10]
+    assert ranged.headers["content-range"] == (
+        f"bytes {seam - 10}-{seam + 9}/{len(seeked.content)}"
+    )
+    tail = client.get(url, params={"t": 1.5}, headers={"Range": "bytes=-50"})
+    assert tail.status_code == 206
+    assert tail.content == seeked.content[-50:]
+    outside = client.get(
+        url, params={"t": 1.5}, headers={"Range": f"bytes={len(seeked.content)}-"}
+    )
+    assert outside.status_code == 416
+
+    assert client.get(url, params={"t": 0.2}).content == merged
+
+
+def test_progressive_audio_appends_segments_as_they_finish(monkeypatch, tmp_path):
+    _build_app(monkeypatch, tmp_path)
+    segments_dir = Path(config.load_settings().segments_dir)
+    paths = [segments_dir / "p1.ogg", segments_dir / "p2.ogg"]
+    for path in paths:
+        _make_ogg(path)
+
+    job_id = "job-progressive"
+    segments = [
+        {"index": 0, "segment_id": "s1", "status": "ready", "path": str(paths[0])},
+        {"index": 1, "segment_id": "s2", "status": "error"},
+        {"index": 2, "segment_id": "s3", "status": "synthesizing"},
+    ]
+    jobs._job_manager.jobs.set(
+        job_id, {"job_id": job_id, "status": "in_progress", "segments": segments}
+    )
+
+    def mark_ready(target):
+        seg = JobManager._find_segment(target, "s3")
+        seg["status"] = "ready"
+        seg["path"] = str(paths[1])
+
+    async def read_stream():
+        chunks = tts_route._progressive_audio(job_id, segments)
+        first = await chunks.__anext__()
+        jobs._job_manager._update_segment(job_id, "s3", mark_ready)
+        return first, [chunk async for chunk in chunks]
+
+    first, rest = asyncio.run(read_stream())
+    assert first.startswith(b"OggS")
+    assert first + b"".join(rest) == b"".join(OpusConcat(paths).chunks())
+
+
 def test_audio_merge_202(monkeypatch, tmp_path):
     client = _build_app(monkeypatch, tmp_path)
     job_id = "job-in-progress"
@@ -133,3 +283,149 @@ def test_playlist_best_url_backend(monkeypatch, tmp_path):
     assert res.status_code == 200
     playlist = res.json()["playlist"]
     assert playlist[0]["url_best"] == f"/v1/tts/jobs/{job_id}/segments/s1"
+
+
+def test_segment_route_status_codes(monkeypatch, tmp_path):
+    client = _build_app(monkeypatch, tmp_path)
+    seg_path = tmp_path / "s1.ogg"
+    seg_path.write_bytes(b"OggS")
+    job_id = "job-segments"
+    job_payload = {
+        "job_id": job_id,
+        "status": "in_progress",
+        "segments": [
+            {"index": 0, "segment_id": "s1", "status": "ready", "path": str(seg_path), "cache_key": "a"},
+            {"index": 1, "segment_id": "s2", "status": "queued"},
+        ],
+    }
+    jobs._job_manager.jobs.set(job_id, job_payload)
+
+    res = client.get(f"/v1/tts/jobs/{job_id}/segments/s1")
+    assert res.status_code == 200
+    assert res.content == b"OggS"
+    assert res.headers["etag"] == '"a"'
+    assert client.head(f"/v1/tts/jobs/{job_id}/segments/s1").headers["content-length"] == "4"
+    assert client.get(f"/v1/tts/jobs/{job_id}/segments/s2").status_code == 202
+    missing = client.get(f"/v1/tts/jobs/{job_id}/segments/nope")
+    assert (missing.status_code, missing.json()["detail"]) == (404, "segment not found")
+    missing = client.get("/v1/tts/jobs/nope/segments/s1")
+    assert (missing.status_code, missing.json()["detail"]) == (404, "job not found")
+
+
+def _events_job(job_id: str) -> None:
+    jobs._job_manager.jobs.set(
+        job_id,
+        {
+            "job_id": job_id,
+            "status": "in_progress",
+            "text": "long original text " * 50,
+            "segments": [
+                {"index": 0, "segment_id": "s1", "status": "queued", "text": "first"},
+                {"index": 1, "segment_id": "s2", "status": "queued", "text": "second"},
+            ],
+        },
+    )
+
+
+def _mark_ready(target):
+    seg = JobManager._find_segment(target, "s1")
+    seg["status"] = "ready"
+    seg["duration_ms"] = 1250.0
+
+
+def _mark_complete(target):
+    target["status"] = "complete"
+
+
+def test_job_events_stream_segment_deltas_until_complete(monkeypatch, tmp_path):
+    client = _build_app(monkeypatch, tmp_path)
+    job_id = "job-events"
+    _events_job(job_id)
+
+    class ConnectedRequest:
+        headers = {}
+
+        async def is_disconnected(self):
+            return False
+
+    async def read_events():
+        res = await tts_route.job_events(job_id, ConnectedRequest())
+        assert res.media_type == "text/event-stream"
+        chunks = res.body_iterator
+        first = await chunks.__anext__()
+        jobs._job_manager._update_segment(job_id, "s1", _mark_ready)
+        jobs._job_manager._update_job(job_id, _mark_complete)
+        rest = [chunk async for chunk in chunks]
+        return [first, *rest]
+
+    chunks = asyncio.run(read_events())
+    events = [chunk.split("\n")[0][len("event: "):] for chunk in chunks]
+    payloads = [json.loads(chunk.split("data: ", 1)[1]) for chunk in chunks]
+    assert events == ["snapshot", "segment", "job"]
+    assert payloads[0]["segments_ready"] == 0
+    assert "text" not in payloads[0]
+    assert payloads[0]["segments"] == [
+        {"segment_id": "s1", "index": 0, "status": "queued"},
+        {"segment_id": "s2", "index": 1, "status": "queued"},
+    ]
+    assert payloads[1] == {
+        "segment_id": "s1",
+        "index": 0,
+        "status": "ready",
+        "url": f"/v1/tts/jobs/{job_id}/segments/s1",
+        "duration_ms": 1250.0,
+        "segments_ready": 1,
+        "segments_error": 0,
+        "progress_pct": 50.0,
+    }
+    assert payloads[2] == {"job_id": job_id, "status": "complete"}
+
+    assert client.get("/v1/tts/jobs/missing/events").status_code == 404
+
+
+def test_job_events_catch_up_on_lost_segment_events(monkeypatch, tmp_path):
+    _build_app(monkeypatch, tmp_path)
+    monkeypatch.setattr(tts_route, "EVENTS_KEEPALIVE_SECONDS", 0.05)
+    job_id = "job-events-lost"
+    _events_job(job_id)
+
+    async def connected():
+        return False
+
+    async def read_events():
+        messages = tts_route._job_event_messages(job_id, False, connected)
+        first = await messages.__anext__()
+        # Change the stored job without publishing, as if the events were lost.
+        job = jobs._job_manager.jobs.get(job_id)
+        _mark_ready(job)
+        _mark_complete(job)
+        jobs._job_manager.jobs.set(job_id, job)
+        rest = [message async for message in messages]
+        return [first, *rest]
+
+    messages = asyncio.run(read_events())
+    assert [event for event, _ in messages] == ["snapshot", "segment", "job"]
+    assert messages[1][1]["status"] == "ready"
+    assert messages[1][1]["segments_ready"] == 1
+    assert messages[2][1] == {"job_id": job_id, "status": "complete"}
+
+
+def test_job_events_websocket_sends_same_messages(monkeypatch, tmp_path):
+    client = _build_app(monkeypatch, tmp_path)
+    job_id = "job-events-ws"
+    _events_job(job_id)
+
+    with client.websocket_connect(
+        f"/v1/tts/jobs/{job_id}/ws", headers={"origin": "http://localhost:3000"}
+    ) as websocket:
+        snapshot = websocket.receive_json()
+        assert snapshot["event"] == "snapshot"
+        jobs._job_manager._update_segment(job_id, "s1", _mark_ready)
+        segment = websocket.receive_json()
+        assert segment["event"] == "segment"
+        assert segment["data"]["url"] == f"/api/tts/jobs/{job_id}/segments/s1"
+        jobs._job_manager._update_job(job_id, _mark_complete)
+        assert websocket.receive_json() == {
+            "event": "job",
+            "data": {"job_id": job_id, "status": "complete"},
+        }
@@ -1,14 +1,30 @@
+import asyncio
 import importlib
 import os
+import threading
+import time
 import uuid
 
 import pytest
 
 import core.config as config
+import core.jobs as jobs
+from core.job_events import JobEventBus
 from core.jobs import JobManager, JobRequest
 from core.redis_client import get_redis, safe_ping
-from core.redis_queue import RedisJobQueue
-from core.redis_store import RedisJobStore
+from core.redis_locks import SingleFlight
+from core.redis_queue import RedisJobQueue, RedisSegmentQueue, RedisStreamJobQueue
+from core.redis_store import RedisHashJobStore, RedisJobStore
+
+
+class FakeSynth:
+    model_id = "dummy"
+
+    def effective_voice_id(self):
+        return None
+
+    def synthesize(self, text, phoneme_text):
+        return [0.0], 22050, False
 
 
 def _configure_env(monkeypatch, tmp_path, redis_url: str) -> None:
@@ -78,3 +94,366 @@ def test_redis_submit_enqueues(monkeypatch, tmp_path):
             client.delete(active_key)
         else:
             client.set(active_key, prev_active)
+
+
+@pytest.mark.parametrize("store_cls", [RedisJobStore, RedisHashJobStore])
+def test_redis_segment_fanout_completes_job(monkeypatch, tmp_path, store_cls):
+    redis_url = _get_redis()
+    if not redis_url:
+        pytest.skip("PRONOUNCEX_TTS_REDIS_URL not set")
+
+    try:
+        client = get_redis(redis_url)
+    except RuntimeError:
+        pytest.skip("redis package not installed")
+    if not safe_ping(client):
+        pytest.skip("Redis not reachable")
+
+    _configure_env(monkeypatch, tmp_path, redis_url)
+    monkeypatch.setenv("PRONOUNCEX_TTS_WORK_UNIT", "segment")
+    monkeypatch.setenv("PRONOUNCEX_TTS_MIN_SEGMENT_CHARS", "1")
+    monkeypatch.setenv("PRONOUNCEX_TTS_CHUNK_TARGET_CHARS", "3")
+    monkeypatch.setenv("PRONOUNCEX_TTS_CHUNK_MAX_CHARS", "6")
+    monkeypatch.setattr(jobs.JobManager, "_worker_loop", lambda self: None)
+    monkeypatch.setattr(
+        jobs,
+        "_encode_with_timing",
+        lambda audio, sample_rate, output_path, tmp_dir, encoder="auto": {
+            "ok": True,
+            "error": None,
+            "encode_ms": 0.0,
+        },
+    )
+    importlib.reload(config)
+    settings = config.load_settings()
+
+    segment_queue_key = f"px:test:segments:{uuid.uuid4().hex}"
+    store = store_cls(client, ttl_seconds=settings.jobs_ttl_seconds)
+    job_manager = JobManager(settings, role="all", store=store, redis_client=client)
+    job_manager.segment_queue = RedisSegmentQueue(client, queue_key=segment_queue_key)
+    job_manager._acquire_synthesizer = lambda model_id, voice_id: FakeSynth()
+    job_manager._release_synthesizer = lambda synth: None
+
+    job = job_manager.submit(
+        JobRequest(
+            text="hello brave world",
+            model_id=settings.model_id,
+            voice_id=None,
+            reading_profile=settings.reading_profile,
+            prefer_phonemes=False,
+        )
+    )
+    job_id = job["job_id"]
+    try:
+        assert job["work_unit"] == "segment"
+        assert len(job["segments"]) > 1
+        # Two "workers" share the queue; each task is counted exactly once.
+        tasks = []
+        while True:
+            task = job_manager.segment_queue.dequeue(block=False)
+            if not task:
+                break
+            tasks.append(task)
+        order = [seg["segment_id"] for seg in job["segments"]]
+        assert [segment_id for _, segment_id in tasks[: settings.priority_head_segments]] == order[
+            : settings.priority_head_segments
+        ]
+        for index, (task_job_id, segment_id) in enumerate(tasks):
+            job_manager.process_segment_task(task_job_id, segment_id, f"worker-{index % 2}")
+            if index == 0:
+                assert store.get(job_id)["status"] == "in_progress"
+        job_manager.process_segment_task(job_id, tasks[0][1], "worker-redelivered")
+
+        stored = store.get(job_id)
+        assert stored["status"] == "complete"
+        assert all(seg["status"] == "ready" for seg in stored["segments"])
+        assert store.get_segment(job_id, order[-1]) == stored["segments"][-1]
+        assert store.get_segment(job_id, "missing") is None
+    finally:
+        for prefix in ("px:job", "px:jobidx", "px:jobh", "px:jobseg"):
+            client.delete(f"{prefix}:{job_id}")
+        client.delete(f"px:active_job:{job_id}")
+        client.delete(f"px:segments:remaining:{job_id}")
+        client.delete(f"px:segments:done:{job_id}")
+        for key in job_manager.segment_queue.queue_keys:
+            client.delete(key)
+
+
+def test_redis_segment_task_failure_still_finishes_job(monkeypatch, tmp_path):
+    redis_url = _get_redis()
+    if not redis_url:
+        pytest.skip("PRONOUNCEX_TTS_REDIS_URL not set")
+
+    try:
+        client = get_redis(redis_url)
+    except RuntimeError:
+        pytest.skip("redis package not installed")
+    if not safe_ping(client):
+        pytest.skip("Redis not reachable")
+
+    _configure_env(monkeypatch, tmp_path, redis_url)
+    monkeypatch.setenv("PRONOUNCEX_TTS_WORK_UNIT", "segment")
+    monkeypatch.setenv("PRONOUNCEX_TTS_MIN_SEGMENT_CHARS", "1")
+    monkeypatch.setenv("PRONOUNCEX_TTS_CHUNK_TARGET_CHARS", "3")
+    monkeypatch.setenv("PRONOUNCEX_TTS_CHUNK_MAX_CHARS", "6")
+    monkeypatch.setattr(jobs.JobManager, "_worker_loop", lambda self: None)
+    importlib.reload(config)
+    settings = config.load_settings()
+
+    segment_queue_key = f"px:test:segments:{uuid.uuid4().hex}"
+    store = RedisHashJobStore(client, ttl_seconds=settings.jobs_ttl_seconds)
+    job_manager = JobManager(settings, role="all", store=store, redis_client=client)
+    job_manager.segment_queue = RedisSegmentQueue(client, queue_key=segment_queue_key)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    job_manager._process_segment = broken
+    request = JobRequest(
+        text="hello brave world",
+        model_id=settings.model_id,
+        voice_id=None,
+        reading_profile=settings.reading_profile,
+        prefer_phonemes=False,
+    )
+    job_ids = []
+    try:
+        job = job_manager.submit(request)
+        job_ids.append(job["job_id"])
+        tasks = []
+        while True:
+            task = job_manager.segment_queue.dequeue(block=False)
+            if not task:
+                break
+            tasks.append(task)
+        for task_job_id, segment_id in tasks:
+            with pytest.raises(RuntimeError):
+                job_manager.process_segment_task(task_job_id, segment_id, "worker-0")
+            assert not client.exists(f"px:claim:{task_job_id}:{segment_id}")
+
+        stored = store.get(job["job_id"])
+        assert stored["status"] == "complete_with_errors"
+        assert {seg["error_code"] for seg in stored["segments"]} == {"segment_task_failed"}
+        assert stored["error_segment_count"] == len(tasks)
+
+        # A queued job is stalled once it has waited too long since it was
+        # enqueued, even while other work keeps the queue busy.
+        lost = job_manager.submit(request)
+        job_ids.append(lost["job_id"])
+        assert job_manager.segment_queue.size() > 0
+        assert job_manager.requeue_stalled_segments(lost) == 0
+        stale = {**lost, "enqueued_at": time.time() - settings.segment_stale_seconds - 1}
+        assert job_manager.requeue_stalled_segments(stale) == len(lost["segments"])
+        assert store.get(lost["job_id"])["enqueued_at"] > stale["enqueued_at"]
+    finally:
+        for job_id in job_ids:
+            for prefix in ("px:jobh", "px:jobseg", "px:active_job", "px:requeue"):
+                client.delete(f"{prefix}:{job_id}")
+            client.delete(f"px:segments:remaining:{job_id}")
+            client.delete(f"px:segments:done:{job_id}")
+        for key in job_manager.segment_queue.queue_keys:
+            client.delete(key)
+
+
+def test_redis_segment_queue_serves_new_job_heads_before_old_tails():
+    redis_url = _get_redis()
+    if not redis_url:
+        pytest.skip("PRONOUNCEX_TTS_REDIS_URL not set")
+
+    try:
+        client = get_redis(redis_url)
+    except RuntimeError:
+        pytest.skip("redis package not installed")
+    if not safe_ping(client):
+        pytest.skip("Redis not reachable")
+
+    queue = RedisSegmentQueue(client, queue_key=f"px:test:segments:{uuid.uuid4().hex}")
+    try:
+        queue.enqueue_job("old", ["a", "b", "c"], 60, head_count=1)
+        queue.enqueue_job("new", ["d", "e"], 60, head_count=1)
+        queue.enqueue_job("urgent", ["f", "g"], 60, priority="high", head_count=1)
+
+        order = []
+        while True:
+            task = queue.dequeue(block=False)
+            if not task:
+                break
+            order.append(task[1])
+        assert order == ["f", "a", "d", "g", "b", "c", "e"]
+    finally:
+        for key in queue.queue_keys:
+            client.delete(key)
+        for job_id in ("old", "new", "urgent"):
+            client.delete(f"px:segments:remaining:{job_id}")
+            client.delete(f"px:segments:done:{job_id}")
+
+
+def _standalone_client():
+    # Streams and store scripts are self-contained, so fakeredis is enough
+    # when no server is configured.
+    redis_url = _get_redis()
+    if redis_url:
+        try:
+            client = get_redis(redis_url)
+        except RuntimeError:
+            pytest.skip("redis package not installed")
+        if not safe_ping(client):
+            pytest.skip("Redis not reachable")
+        return client
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_redis_stream_queue_acks_and_recovers_dead_worker():
+    client = _standalone_client()
+    stream_key = f"px:test:stream:{uuid.uuid4().hex}"
+    dead = RedisStreamJobQueue(client, consumer="dead", stream_key=stream_key)
+    alive = RedisStreamJobQueue(
+        client, consumer="alive", stream_key=stream_key, claim_idle_ms=0, autoclaim_interval=0
+    )
+    try:
+        dead.enqueue("job-low", priority="low")
+        dead.enqueue("job-a")
+        dead.enqueue("job-high", priority="high")
+        assert alive.size() == 3
+
+        assert alive.dequeue(block=False) == "job-high"
+        alive.ack("job-high")
+        # The dead worker takes a job and never acks it.
+        assert dead.dequeue(block=False) == "job-a"
+        assert alive.size() == 1
+
+        # Any idle time counts as dead here, so the survivor takes it over.
+        assert alive.dequeue(block=False) == "job-a"
+        alive.touch("job-a")
+        alive.ack("job-a")
+        assert alive.dequeue(block=False) == "job-low"
+        alive.ack("job-low")
+        assert alive.dequeue(block=False) is None
+        assert sum(client.xlen(key) for key in alive.queue_keys) == 0
+    finally:
+        for key in alive.queue_keys:
+            client.delete(key)
+
+
+def test_redis_segment_queue_counts_segments_done_at_submit():
+    client = _standalone_client()
+    queue = RedisSegmentQueue(client, queue_key=f"px:test:segments:{uuid.uuid4().hex}")
+    job_id = f"job-{uuid.uuid4().hex}"
+    try:
+        queue.enqueue_job(job_id, ["miss"], 60, done_ids=["hit"])
+        assert queue.done_ids(job_id) == {"hit"}
+        assert queue.dequeue(block=False) == (job_id, "miss")
+        assert queue.mark_done(job_id, "hit", 60) == -1
+        assert queue.mark_done(job_id, "miss", 60) == 0
+    finally:
+        for key in queue.queue_keys:
+            client.delete(key)
+        client.delete(f"px:segments:remaining:{job_id}", f"px:segments:done:{job_id}")
+
+
+def test_single_flight_wakes_waiters_in_other_processes():
+    client = _standalone_client()
+    key = uuid.uuid4().hex
+    leader, other_process = SingleFlight(client), SingleFlight(client)
+    woke = []
+
+    def wait(flights):
+        woke.append(flights.acquire(key, timeout=5))
+
+    try:
+        assert leader.acquire(key, timeout=5)
+        # Two threads in the other process: one waits on Redis, one behind it.
+        waiters = [threading.Thread(target=wait, args=(other_process,)) for _ in range(2)]
+        for thread in waiters:
+            thread.start()
+        time.sleep(0.2)
+        assert woke == []
+        leader.release(key)
+        for thread in waiters:
+            thread.join(timeout=5)
+        assert woke == [False, False]
+        assert not client.exists(f"px:flight:{key}")
+
+        # The next flight of the key gets a fresh claim.
+        assert other_process.acquire(key, timeout=5)
+        other_process.release(key)
+    finally:
+        client.delete(f"px:flight:{key}", f"px:flight:done:{key}")
+
+
+def test_redis_hash_store_patches_segments_without_lost_updates():
+    client = _standalone_client()
+    store = RedisHashJobStore(client, ttl_seconds=60)
+    job_id = f"test-{uuid.uuid4().hex}"
+    store.set(
+        job_id,
+        {
+            "job_id": job_id,
+            "status": "in_progress",
+            "error_segment_count": 0,
+            "segments": [
+                {"segment_id": segment_id, "status": "queued"} for segment_id in ("s2", "s0", "s1")
+            ],
+        },
+    )
+
+    def fail(segment_id):
+        def mutate(target):
+            seg = target["segments"][0]
+            assert [item["segment_id"] for item in target["segments"]] == [segment_id]
+            seg["status"] = "error"
+            target["error_segment_count"] = target["error_segment_count"] + 1
+            target.setdefault("first_audio_at", segment_id)
+            if segment_id == "s0":
+                # Another worker finishes s1 between this read and write.
+                store.update_segment(job_id, "s1", fail("s1"))
+
+        return mutate
+
+    try:
+        patched = store.update_segment(job_id, "s0", fail("s0"))
+        # s1 stamped first_audio_at first, and the returned view says so.
+        assert patched["first_audio_at"] == "s1"
+        job = store.get(job_id)
+        assert [seg["segment_id"] for seg in job["segments"]] == ["s2", "s0", "s1"]
+        assert [seg["status"] for seg in job["segments"]] == ["queued", "error", "error"]
+        assert job["error_segment_count"] == 2
+        assert job["first_audio_at"] == "s1"
+
+        store.update(job_id, lambda target: target.update(status="complete"))
+        assert store.get(job_id)["status"] == "complete"
+        assert job_id in {payload["job_id"] for payload in store.scan()}
+        assert store.update_segment("missing", "s0", fail("s0")) is None
+    finally:
+        client.delete(f"px:jobh:{job_id}", f"px:jobseg:{job_id}")
+
+
+def test_redis_job_events_reach_subscribers_in_other_processes():
+    client = _standalone_client()
+    api_bus = JobEventBus(client)
+    worker_bus = JobEventBus(client)
+    job_id = f"test-{uuid.uuid4().hex}"
+
+    async def receive():
+        async with api_bus.subscribe(job_id) as subscription:
+            await asyncio.to_thread(
+                worker_bus.publish, job_id, {"type": "segment", "segment_id": "s1", "status": "ready"}
+            )
+            worker_bus.publish("other-job", {"type": "job", "status": "complete"})
+            first = await subscription.next(timeout=5)
+            second = await subscription.next(timeout=0.2)
+            # Only channels of jobs with local subscribers are subscribed.
+            numsub = dict(client.pubsub_numsub(f"px:events:{job_id}", "px:events:other-job"))
+        return first, second, numsub
+
+    first, second, numsub = asyncio.run(receive())
+    assert first == {"job_id": job_id, "type": "segment", "segment_id": "s1", "status": "ready"}
+    assert second is None
+    assert numsub == {f"px:events:{job_id}": 1, "px:events:other-job": 0}
+
+    # The last subscriber leaving drops the channel.
+    deadline = time.time() + 5
+    while client.pubsub_numsub(f"px:events:{job_id}")[0][1] and time.time() < deadline:
+        time.sleep(0.05)
+    assert client.pubsub_numsub(f"px:events:{job_id}")[0][1] == 0
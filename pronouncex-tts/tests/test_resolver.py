@@ -1,9 +1,15 @@
 import json
+import os
+from dataclasses import replace
 from pathlib import Path
 
 import pytest
 
+from core.compiled_dict import CompiledPack, compiled_path_for, write_compiled_pack
 from core.config import Settings
+from core.fallback_espeak import EspeakError
+from core.ipa_compile import compile_packs
+from core.learner import DictLearner, journal_path_for
 from core.resolver import PronunciationResolver
 
 
@@ -30,13 +36,20 @@ def _build_settings(
             model_id_quality="dummy",
             model_allowlist=["dummy"],
             phoneme_mode="espeak",
+            resolve_batch_scope="segment",
+            resolve_memo_size=50000,
             role="all",
             redis_url=None,
+            work_unit="job",
+            queue_backend="list",
+            job_store_layout="json",
+            priority_head_segments=2,
             enable_autolearn=enable_autolearn,
             autolearn_on_miss=autolearn_on_miss,
             autolearn_path=autolearn_path,
             autolearn_flush_seconds=1,
             autolearn_min_len=3,
+            cache_key_dict_scope="segment",
             dict_dir=dict_dir,
             compiled_dir=compiled_dir,
             cache_dir=cache_dir,
@@ -47,15 +60,26 @@ def _build_settings(
             compiler_version="1.0.0",
             public_segment_base_url="/api/tts",
             parallel_encode=False,
+            audio_encoder="auto",
+            encode_workers=2,
             max_workers=2,
             per_job_workers=1,
             max_text_chars=20000,
             max_segments=120,
             max_active_jobs=10,
             max_concurrent_segments=2,
+            synth_concurrency="instance",
+            synth_threads=0,
+            synth_executor="thread",
+            synth_coalesce_seconds=60.0,
             min_segment_chars=1,
             require_workers=False,
             jobs_ttl_seconds=24 * 3600,
+            segment_max_retries=2,
+            segment_stale_seconds=300,
+            stale_queued_seconds=3600,
+            stale_queued_require_workers=True,
+            stale_queued_abandoned_seconds=86400,
             chunk_target_chars=120,
             chunk_max_chars=240,
             gpu=False,
@@ -72,7 +96,9 @@ def test_phrase_override_longest_match_wins(monkeypatch, tmp_path):
         {"gojo satoru": "PHRASE", "gojo": "SHORT"},
     )
 
-    monkeypatch.setattr("core.resolver.phonemize_espeak", lambda text, language="en-us": None)
+    monkeypatch.setattr(
+        "core.resolver.phonemize_espeak_batch", lambda texts, language="en-us": [None] * len(texts)
+    )
     resolver = PronunciationResolver(settings)
 
     result = resolver.resolve_text("Gojo Satoru arrives.")
@@ -107,7 +133,7 @@ def test_autolearn_persists_and_is_lower_priority(monkeypatch, tmp_path):
         {"kira": "local"},
     )
 
-    def fake_espeak(text, language="en-us"):
+    def fake_espeak(text, language="en-us", strict=False):
         return f"ph-{text.lower()}"
 
     monkeypatch.setattr("core.resolver.phonemize_espeak", fake_espeak)
@@ -139,7 +165,9 @@ def test_autolearn_persists_and_is_lower_priority(monkeypatch, tmp_path):
 
 def test_espeak_fallback_returns_phonemes(monkeypatch, tmp_path):
     settings = _build_settings(tmp_path, enable_autolearn=False)
-    monkeypatch.setattr("core.resolver.phonemize_espeak", lambda text, language="en-us": "PHON")
+    monkeypatch.setattr(
+        "core.resolver.phonemize_espeak", lambda text, language="en-us", strict=False: "PHON"
+    )
     resolver = PronunciationResolver(settings)
 
     phonemes, source = resolver.resolve_word("Unknown")
@@ -160,7 +188,9 @@ def test_semver_selects_highest_pack(tmp_path):
 
 def test_autolearn_on_miss_writes_metadata(monkeypatch, tmp_path):
     settings = _build_settings(tmp_path, enable_autolearn=True, autolearn_on_miss=True)
-    monkeypatch.setattr("core.resolver.phonemize_espeak", lambda text, language="en-us": "PH")
+    monkeypatch.setattr(
+        "core.resolver.phonemize_espeak_batch", lambda texts, language="en-us": ["PH"] * len(texts)
+    )
     resolver = PronunciationResolver(settings)
 
     result = resolver.resolve_text("Gojo")
@@ -171,3 +201,350 @@ def test_autolearn_on_miss_writes_metadata(monkeypatch, tmp_path):
     entry = payload["entries"]["gojo"]
     assert entry["phonemes"] == "PH"
     assert entry["count"] >= 1
+
+
+def test_resolve_texts_batches_espeak_misses(monkeypatch, tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=False)
+    _write_pack(settings.dict_dir / "en_core_v1.0.0.json", "en_core", "1.0.0", {"the": "DH"})
+    calls = []
+
+    def fake_batch(texts, language="en-us"):
+        calls.append(list(texts))
+        return [f"ph-{text.lower()}" for text in texts]
+
+    monkeypatch.setattr("core.resolver.phonemize_espeak_batch", fake_batch)
+    resolver = PronunciationResolver(settings)
+
+    results = resolver.resolve_texts(["The Gojo smiled.", "gojo and the Yuta."])
+
+    assert calls == [["Gojo", "smiled", "and", "Yuta"]]
+    assert results[0].phoneme_text == "DH ph-gojo ph-smiled."
+    assert results[1].phoneme_text == "ph-gojo ph-and DH ph-yuta."
+    assert results[0].source_counts == {"en_core": 1, "espeak": 2}
+    assert results[1].espeak_words == 3
+    assert results[1].espeak_calls == 1
+
+
+def test_word_memo_skips_repeat_espeak_and_caches_misses(monkeypatch, tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=False)
+    calls = []
+
+    def fake_batch(texts, language="en-us"):
+        calls.append(list(texts))
+        return [None if text == "Zzz" else f"ph-{text.lower()}" for text in texts]
+
+    monkeypatch.setattr("core.resolver.phonemize_espeak_batch", fake_batch)
+    resolver = PronunciationResolver(settings)
+
+    resolver.resolve_text("Gojo Zzz")
+    result = resolver.resolve_text("gojo Zzz")
+
+    assert calls == [["Gojo", "Zzz"]]
+    assert result.phoneme_text == "ph-gojo Zzz"
+    assert result.source_counts == {"espeak": 1}
+    stats = resolver.memo_stats()
+    assert stats.size == 2
+    assert stats.hits == 2
+
+
+def test_espeak_failure_is_not_memoized_as_a_miss(monkeypatch, tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=False)
+    healthy = []
+
+    def flaky_batch(texts, language="en-us"):
+        if not healthy:
+            raise EspeakError("backend died")
+        return [f"ph-{text.lower()}" for text in texts]
+
+    monkeypatch.setattr("core.resolver.phonemize_espeak_batch", flaky_batch)
+    resolver = PronunciationResolver(settings)
+
+    assert resolver.resolve_text("Yuta").phoneme_text is None
+    healthy.append(True)
+    assert resolver.resolve_text("Yuta").phoneme_text == "ph-yuta"
+
+
+def test_batch_autolearn_memoizes_under_the_new_fingerprint(monkeypatch, tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=True, autolearn_on_miss=True)
+    monkeypatch.setattr(
+        "core.resolver.phonemize_espeak_batch",
+        lambda texts, language="en-us": [f"ph-{text.lower()}" for text in texts],
+    )
+    resolver = PronunciationResolver(settings)
+    resolver.resolve_texts(["Yuta smiled."])
+    assert resolver.lookup_key("yuta") == ("auto_learn", "ph-yuta")
+
+    hits = resolver.memo_stats().hits
+    resolver.resolve_texts(["Yuta"])
+    assert resolver.memo_stats().hits == hits + 1
+
+
+def test_autolearn_skips_words_in_any_curated_pack(tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=True, autolearn_on_miss=True)
+    _write_pack(settings.dict_dir / "en_core_v1.0.0.json", "en_core", "1.0.0", {"kira": "K"})
+    resolver = PronunciationResolver(settings)
+    resolver.store_phonemes("kira", "K-auto")
+
+    # auto_learn wins the lookup, but en_core still holds the curated entry.
+    assert resolver.lookup_key("kira") == ("auto_learn", "K-auto")
+    assert not resolver._should_autolearn("Kira", "K2")
+    assert resolver._should_autolearn("Yuta", "Y")
+
+
+def test_word_memo_invalidated_by_refresh(monkeypatch, tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=False)
+    monkeypatch.setattr(
+        "core.resolver.phonemize_espeak_batch", lambda texts, language="en-us": ["ESPEAK"] * len(texts)
+    )
+    resolver = PronunciationResolver(settings)
+    assert resolver.resolve_text("Kira").phoneme_text == "ESPEAK"
+
+    _write_pack(
+        settings.dict_dir / "local_overrides_v1.0.0.json",
+        "local_overrides",
+        "1.0.0",
+        {"kira": "local"},
+    )
+    resolver.refresh()
+
+    assert resolver.resolve_text("Kira").phoneme_text == "local"
+
+
+def test_word_memo_evicts_least_recent(tmp_path):
+    settings = replace(_build_settings(tmp_path, enable_autolearn=False), resolve_memo_size=2)
+    _write_pack(
+        settings.dict_dir / "en_core_v1.0.0.json",
+        "en_core",
+        "1.0.0",
+        {"a": "A", "b": "B", "c": "C"},
+    )
+    resolver = PronunciationResolver(settings)
+
+    resolver.resolve_word("a")
+    resolver.resolve_word("b")
+    resolver.resolve_word("a")
+    resolver.resolve_word("c")
+
+    stats = resolver.memo_stats()
+    assert stats.size == 2
+    assert stats.evictions == 1
+    assert resolver.word_memo.get(resolver._memo_key("a")) == ("A", "en_core")
+    assert resolver.word_memo.get(resolver._memo_key("b")) is None
+
+
+def test_phrase_override_prefers_higher_priority_pack(monkeypatch, tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=False)
+    _write_pack(
+        settings.dict_dir / "local_overrides_v1.0.0.json",
+        "local_overrides",
+        "1.0.0",
+        {"gojo satoru": "LOCAL"},
+    )
+    _write_pack(
+        settings.dict_dir / "anime_en_v1.0.0.json",
+        "anime_en",
+        "1.0.0",
+        {"gojo satoru sensei": "ANIME", "satoru sensei": "TAIL"},
+    )
+    monkeypatch.setattr(
+        "core.resolver.phonemize_espeak_batch", lambda texts, language="en-us": [None] * len(texts)
+    )
+    resolver = PronunciationResolver(settings)
+
+    result = resolver.resolve_text("Gojo  Satoru sensei, satoru sensei.")
+
+    assert result.phoneme_text == "LOCAL sensei, TAIL."
+    assert result.source_counts == {"local_overrides": 1, "anime_en": 1}
+
+
+def test_phrase_override_requires_whitespace_between_words(monkeypatch, tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=False)
+    _write_pack(
+        settings.dict_dir / "anime_en_v1.0.0.json",
+        "anime_en",
+        "1.0.0",
+        {"gojo satoru": "PHRASE"},
+    )
+    monkeypatch.setattr(
+        "core.resolver.phonemize_espeak_batch", lambda texts, language="en-us": [None] * len(texts)
+    )
+    resolver = PronunciationResolver(settings)
+
+    assert resolver.resolve_text("Gojo, Satoru").phoneme_text is None
+    resolver.store_phonemes("Gojo Satoru", "LEARNED")
+    assert resolver.resolve_text("Gojo Satoru").phoneme_text == "LEARNED"
+
+
+def test_set_entry_updates_index_without_refresh(tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=False)
+    _write_pack(settings.dict_dir / "anime_en_v1.0.0.json", "anime_en", "1.0.0", {"kira": "anime"})
+    resolver = PronunciationResolver(settings)
+    assert resolver.resolve_word("Kira") == ("anime", "anime_en")
+
+    resolver.set_entry("local_overrides", "Kira", "local", "1.0.1")
+
+    assert resolver.resolve_word("Kira") == ("local", "local_overrides")
+    assert resolver.lookup_key("kira") == ("local_overrides", "local")
+    assert resolver.dict_versions() == {"anime_en": "1.0.0", "local_overrides": "1.0.1"}
+
+    resolver.set_entry("en_core", "kira", "core", "2.0.0")
+    assert resolver.resolve_word("Kira") == ("local", "local_overrides")
+
+
+def test_compiled_pack_roundtrip(tmp_path):
+    path = write_compiled_pack(
+        tmp_path / "pack.pxdict",
+        name="anime_en",
+        version="1.0.0",
+        entries={"gojo": "ˈɡoʊdʒoʊ", "gojo satoru": "PHRASE", "a": "A"},
+    )
+    pack = CompiledPack(path)
+
+    assert pack.name == "anime_en"
+    assert pack.version == "1.0.0"
+    assert len(pack) == 3
+    assert pack.get("gojo") == "ˈɡoʊdʒoʊ"
+    assert pack.get("missing") is None
+    assert "a" in pack
+    assert pack.phrase_items() == [("gojo satoru", "PHRASE")]
+
+    pack["yuta"] = "Y"
+    assert pack.get("yuta") == "Y"
+    assert dict(pack.items())["yuta"] == "Y"
+
+
+def test_resolver_uses_compiled_packs(monkeypatch, tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=False)
+    _write_pack(
+        settings.dict_dir / "en_core_v1.0.0.json",
+        "en_core",
+        "1.0.0",
+        {"kira": "core", "read": "ɹiːd"},
+    )
+    _write_pack(
+        settings.dict_dir / "anime_en_v1.0.0.json",
+        "anime_en",
+        "1.0.0",
+        {"kira": "anime", "gojo satoru": "PHRASE"},
+    )
+    compile_packs(settings.dict_dir, settings.compiled_dir, "dummy", "1.0.0")
+    monkeypatch.setattr(
+        "core.resolver.phonemize_espeak_batch", lambda texts, language="en-us": [None] * len(texts)
+    )
+
+    resolver = PronunciationResolver(settings)
+
+    assert isinstance(resolver.packs["en_core"].entries, CompiledPack)
+    assert resolver.resolve_word("Kira") == ("anime", "anime_en")
+    assert resolver.resolve_word("read") == ("ɹiːd", "en_core")
+    assert resolver.resolve_text("Gojo Satoru").phoneme_text == "PHRASE"
+
+    resolver.set_entry("local_overrides", "kira", "local", "1.0.1")
+    assert resolver.resolve_word("Kira") == ("local", "local_overrides")
+
+
+def test_stale_compiled_pack_falls_back_to_json(tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=False)
+    source = settings.dict_dir / "en_core_v1.0.0.json"
+    _write_pack(source, "en_core", "1.0.0", {"read": "old"})
+    compile_packs(settings.dict_dir, settings.compiled_dir, "dummy", "1.0.0")
+    assert compiled_path_for(source, settings.compiled_dir).exists()
+
+    _write_pack(source, "en_core", "1.0.0", {"read": "new value"})
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    resolver = PronunciationResolver(settings)
+
+    assert isinstance(resolver.packs["en_core"].entries, dict)
+    assert resolver.resolve_word("read") == ("new value", "en_core")
+
+
+def test_autolearn_flush_appends_to_journal(tmp_path):
+    path = tmp_path / "auto_learn.json"
+    learner = DictLearner(path, flush_seconds=60)
+    learner.learn("Gojo", "G1")
+    learner.flush()
+    snapshot = path.read_text(encoding="utf-8")
+
+    learner.learn("Yuta", "Y1")
+    learner.learn("gojo", "G2")
+    learner.flush()
+
+    assert path.read_text(encoding="utf-8") == snapshot
+    journal = journal_path_for(path).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["key"] for line in journal] == ["yuta", "gojo"]
+
+    reloaded = DictLearner(path, flush_seconds=60)
+    assert reloaded.phoneme_entries() == {"gojo": "G2", "yuta": "Y1"}
+    assert reloaded.version() == learner.version()
+
+    reloaded.compact()
+    assert not journal_path_for(path).exists()
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    assert payload["entries"]["gojo"]["phonemes"] == "G2"
+
+
+def test_segment_fingerprint_tracks_only_entries_in_segment(tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=True)
+    _write_pack(settings.dict_dir / "anime_en_v1.0.0.json", "anime_en", "1.0.0", {"yuta": "Y"})
+    resolver = PronunciationResolver(settings)
+    resolver.store_phonemes("gojo", "G1")
+    resolver.store_phonemes("gojo satoru", "GS")
+    before_yuta = resolver.segment_fingerprint("Yuta smiled.")
+    before_gojo = resolver.segment_fingerprint("Gojo Satoru smiled.")
+
+    resolver.store_phonemes("satoru", "S1")
+    resolver.store_phonemes("gojo satoru", "GS2")
+
+    assert resolver.segment_fingerprint("Yuta smiled.") == before_yuta
+    assert resolver.segment_fingerprint("Gojo Satoru smiled.") != before_gojo
+
+    resolver.set_entry("local_overrides", "yuta", "Y2", "1.0.1")
+    assert resolver.segment_fingerprint("Yuta smiled.") != before_yuta
+
+
+def test_segment_fingerprint_hashes_misses_without_espeak(monkeypatch, tmp_path):
+    settings = _build_settings(tmp_path, enable_autolearn=True)
+
+    def no_espeak(*args, **kwargs):
+        raise AssertionError("fingerprinting must not call espeak")
+
+    monkeypatch.setattr("core.resolver.phonemize_espeak", no_espeak)
+    monkeypatch.setattr("core.resolver.phonemize_espeak_batch", no_espeak)
+    resolver = PronunciationResolver(settings)
+    before = resolver.segment_fingerprint("Gojo smiled.")
+    assert before != resolver.segment_fingerprint("Yuta smiled.")
+
+    resolver.set_entry("local_overrides", "yuta", "Y", "1.0.1")
+    assert resolver.segment_fingerprint("Gojo smiled.") == before
+
+    resolver.store_phonemes("gojo", "G1")
+    assert resolver.segment_fingerprint("Gojo smiled.") != before
+
+
+def test_autolearn_journal_survives_torn_line_and_other_writers(tmp_path):
+    path = tmp_path / "auto_learn.json"
+    first = DictLearner(path, flush_seconds=60)
+    first.learn("Gojo", "G1")
+    first.flush()
+    version = first.version()
+
+    # Relearning the same phonemes does not version the pack.
+    first.learn("gojo", "G1")
+    first.flush()
+    assert first.version() == version
+
+    journal = journal_path_for(path)
+    with journal.open("a", encoding="utf-8") as handle:
+        handle.write('{"key": "torn", "phon')
+    second = DictLearner(path, flush_seconds=60)
+    second.learn("Yuta", "Y1")
+    second.flush()
+    records = [json.loads(line) for line in journal.read_text(encoding="utf-8").splitlines()]
+    assert [record["key"] for record in records] == ["gojo", "yuta"]
+
+    # Compacting from the first learner keeps the line the second appended.
+    first.compact()
+    assert not journal.exists()
+    assert DictLearner(path, flush_seconds=60).phoneme_entries() == {"gojo": "G1", "yuta": "Y1"}
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from core.synth_process import ProcessSynthesizer
+
+
+class FakeSynthesizer:
+    def __init__(self, model_id, voice_id=None, gpu=False):
+        self.model_id = model_id
+        self.voice_id = voice_id
+        self.supports_phonemes = True
+
+    def supports_speaker_selection(self):
+        return False
+
+    def effective_voice_id(self):
+        return None
+
+    def synthesize(self, text, phoneme_text):
+        if text == "boom":
+            raise ValueError("Kernel size can't be greater than actual input size")
+        audio = np.linspace(-1.0, 1.0, num=len(text) * 1000, dtype=np.float32)
+        return audio.tolist(), 16000, bool(phoneme_text)
+
+
+def test_process_synthesizer_returns_audio_through_shared_memory():
+    synth = ProcessSynthesizer(
+        "dummy", voice_id="voice_a", buffer_samples=100, synth_factory=FakeSynthesizer
+    )
+    try:
+        assert synth.alive
+        assert synth.supports_phonemes is True
+        assert synth.effective_voice_id() is None
+
+        # Larger than the initial buffer, so the child has to ask for a bigger one.
+        audio, sample_rate, used_phonemes = synth.synthesize("hello", "həˈloʊ")
+        assert sample_rate == 16000
+        assert used_phonemes is True
+        assert np.allclose(audio, np.linspace(-1.0, 1.0, num=5000, dtype=np.float32))
+
+        audio, _, used_phonemes = synth.synthesize("hi", None)
+        assert len(audio) == 2000
+        assert used_phonemes is False
+
+        with pytest.raises(RuntimeError, match="Kernel size"):
+            synth.synthesize("boom", None)
+        assert synth.alive
+    finally:
+        synth.close()
+    assert not synth.alive